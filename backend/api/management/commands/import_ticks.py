@@ -0,0 +1,37 @@
+"""
+Django management command to download bid/ask ticks into the TickStore used by tick replay
+Run with: python manage.py import_ticks EURUSD GBPUSD --user alice --days 7
+Schedule it (e.g. cron) to keep the stored ticks current; each run appends only newer ticks.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from api.models import TradingAccount
+from trading.tick_replay import TickStore
+
+
+class Command(BaseCommand):
+    help = "Downloads MT5 ticks for the given symbols into trading_data/ticks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('symbols', nargs='+')
+        parser.add_argument('--user', required=True, help="Username whose active MT5 account is used")
+        parser.add_argument('--days', type=float, default=7, help="History to download when nothing is stored yet")
+
+    def handle(self, *args, **options):
+        account = TradingAccount.objects.filter(user__username=options['user'], is_active=True).first()
+        if account is None:
+            raise CommandError(f"No active MT5 account for user {options['user']}")
+
+        from trading.user_mt5_manager import UserMT5Manager
+        mt5m = UserMT5Manager(account.user.id, account)
+        try:
+            mt5m.connect()
+        except Exception as e:
+            raise CommandError(str(e))
+        try:
+            for symbol in options['symbols']:
+                store = TickStore(symbol)
+                imported = store.sync_mt5(days=options['days'])
+                self.stdout.write(f"{store.symbol}: {imported} new ticks, {len(store)} stored")
+        finally:
+            mt5m.shutdown()
@@ -0,0 +1,40 @@
+"""
+Django management command to cache MT5 contract specs (symbol_info) for money management
+Run with: python manage.py refresh_symbol_specs EURUSD XAUUSD --user alice
+Builds also refresh the built symbol's specs whenever they fetch bars from MT5.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from api.models import TradingAccount
+from trading.money_management import SymbolSpecs
+
+
+class Command(BaseCommand):
+    help = "Snapshots MT5 symbol_info for the given symbols into trading_data/symbol_specs.json"
+
+    def add_arguments(self, parser):
+        parser.add_argument('symbols', nargs='+')
+        parser.add_argument('--user', required=True, help="Username whose active MT5 account is used")
+
+    def handle(self, *args, **options):
+        account = TradingAccount.objects.filter(user__username=options['user'], is_active=True).first()
+        if account is None:
+            raise CommandError(f"No active MT5 account for user {options['user']}")
+
+        from trading.user_mt5_manager import UserMT5Manager
+        mt5m = UserMT5Manager(account.user.id, account)
+        try:
+            mt5m.connect()
+        except Exception as e:
+            raise CommandError(str(e))
+        try:
+            updated = SymbolSpecs().refresh_from_mt5(options['symbols'])
+        finally:
+            mt5m.shutdown()
+
+        for symbol in options['symbols']:
+            if symbol.upper() in updated:
+                spec = updated[symbol.upper()]
+                self.stdout.write(f"{symbol.upper()}: contract {spec['contract_size']}, tick value {spec['tick_value']} {spec['account_currency']}")
+            else:
+                self.stderr.write(f"{symbol.upper()}: not found in the terminal; its previous specs stay in use")
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_auto_20260116_1323'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robotbuildreport',
+            name='walk_forward',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
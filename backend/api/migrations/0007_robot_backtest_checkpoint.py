@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_robotbuildreport_walk_forward'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robot',
+            name='backtest_checkpoint',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
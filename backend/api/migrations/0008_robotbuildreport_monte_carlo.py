@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-17 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_robot_backtest_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robotbuildreport',
+            name='monte_carlo',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
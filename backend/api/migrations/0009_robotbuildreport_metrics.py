@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_robotbuildreport_monte_carlo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robotbuildreport',
+            name='metrics',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.19 on 2026-10-17 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_robotbuildreport_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robotbuildreport',
+            name='cache_hits',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='robotbuildreport',
+            name='cache_misses',
+            field=models.IntegerField(default=0),
+        ),
+    ]
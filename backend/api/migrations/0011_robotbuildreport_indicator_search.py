@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_robotbuildreport_cache_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robotbuildreport',
+            name='indicator_search',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-17 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_robotbuildreport_indicator_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robotbuildreport',
+            name='cross_validation',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-17 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_robotbuildreport_cross_validation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='strategyversion',
+            name='backtest_artifact',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+    ]
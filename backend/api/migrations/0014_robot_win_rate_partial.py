@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-17 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_strategyversion_backtest_artifact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robot',
+            name='win_rate_partial',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_robot_win_rate_partial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robot',
+            name='rescore',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.19 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_robot_rescore'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tradelog',
+            name='slippage',
+            field=models.FloatField(blank=True, help_text='Slippage in pips, positive when adverse', null=True),
+        ),
+        migrations.AlterField(
+            model_name='tradelog',
+            name='spread',
+            field=models.FloatField(blank=True, help_text='Spread at execution in pips (MT5 reports points)', null=True),
+        ),
+    ]
@@ -54,6 +54,7 @@ class Robot(models.Model):
     indicators = models.JSONField(default=list)
     risk_settings = models.JSONField(default=dict) # {lot: 0.01, sl: 30, tp: 60, max_daily_loss: 5, max_concurrent: 3}
     win_rate = models.FloatField(default=0.0)
+    win_rate_partial = models.BooleanField(default=False) # win_rate covers only the bars a CPU-budgeted backtest reached
     mql5_code = models.TextField(blank=True, null=True)
     python_code = models.TextField(blank=True, null=True)
     version = models.IntegerField(default=1)
@@ -81,6 +82,8 @@ class Robot(models.Model):
         ('NONE', 'Not Trained')
     ]
     training_data_source = models.CharField(max_length=20, choices=DATA_SOURCE_CHOICES, default='NONE')
+    backtest_checkpoint = models.JSONField(default=dict, blank=True) # Backtester.checkpoint() for incremental re-scoring
+    rescore = models.JSONField(default=dict, blank=True) # Latest in-sample resume metrics from the rescore action
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -112,6 +115,13 @@ class RobotBuildReport(models.Model):
     
     errors = models.JSONField(default=list)   # List of structured error objects
     warnings = models.JSONField(default=list) # List of structured warning objects
+    walk_forward = models.JSONField(default=dict, blank=True) # Per-window in/out-of-sample results
+    metrics = models.JSONField(default=dict, blank=True) # Backtester.compute_metrics() of the build backtest
+    cache_hits = models.IntegerField(default=0)   # Backtest result cache lookups served from disk
+    cache_misses = models.IntegerField(default=0)
+    monte_carlo = models.JSONField(default=dict, blank=True) # Drawdown / ruin percentiles from trade resampling
+    indicator_search = models.JSONField(default=dict, blank=True) # Indicator subset search stats and top candidates
+    cross_validation = models.JSONField(default=dict, blank=True) # Purged k-fold test metrics and their dispersion
     
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -139,6 +149,7 @@ class StrategyVersion(models.Model):
     risk_settings = models.JSONField()
     mql5_code = models.TextField(blank=True, null=True)
     python_code = models.TextField(blank=True, null=True)
+    backtest_artifact = models.BinaryField(blank=True, null=True, editable=False) # Compressed trade ledger + equity curve (BacktestArtifact)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -193,8 +204,8 @@ class TradeLog(models.Model):
     
     # Metrics
     latency = models.FloatField(null=True, blank=True, help_text="Execution latency in ms")
-    slippage = models.FloatField(null=True, blank=True, help_text="Slippage in pips")
-    spread = models.FloatField(null=True, blank=True)
+    slippage = models.FloatField(null=True, blank=True, help_text="Slippage in pips, positive when adverse")
+    spread = models.FloatField(null=True, blank=True, help_text="Spread at execution in pips (MT5 reports points)")
     failure_reason = models.TextField(blank=True)
     
     # Timings
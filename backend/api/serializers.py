@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from trading.backtest_artifact import BacktestArtifact
 from .models import (
     TradingAccount, Robot, AppVisit, Profile, TradeLog, 
     RobotBuildTask, StrategyVersion, AccountGuardrail, 
@@ -58,9 +59,17 @@ class RobotBuildTaskSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class StrategyVersionSerializer(serializers.ModelSerializer):
+    metrics = serializers.SerializerMethodField()
+
     class Meta:
         model = StrategyVersion
-        fields = '__all__'
+        exclude = ('backtest_artifact',)
+
+    def get_metrics(self, obj):
+        # Read from the stored artifact header only; None for versions saved without one
+        if not obj.backtest_artifact:
+            return None
+        return BacktestArtifact.read_metrics(obj.backtest_artifact)
 
 class AccountGuardrailSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,3 +1,94 @@
+import numpy as np
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from trading.backtest_artifact import BacktestArtifact
+from trading.trade_ledger import TradeLedger
+
+from .models import Robot, RobotBuildReport, StrategyVersion
+
+
+class RiskSimulateTests(TestCase):
+    url = '/api/robots/risk_simulate/'
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='x')
+        self.other = User.objects.create_user('other', password='x')
+        self.robot = Robot.objects.create(user=self.owner, symbol='EURUSD', method='winrate')
+        for drawdown in (0.0010, 0.0050):
+            RobotBuildReport.objects.create(
+                robot=self.robot, status='SUCCESS', data_source='MT5', metrics={'max_drawdown': drawdown}
+            )
+        self.client = APIClient()
+
+    def simulate(self, user):
+        self.client.force_authenticate(user)
+        return self.client.post(self.url, {'symbol': 'EURUSD', 'lot': 1, 'robot_id': self.robot.id}, format='json')
+
+    def test_uses_the_latest_report(self):
+        response = self.simulate(self.owner)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('50.0 pips', response.data['drawdown_est'])
+
+    def test_other_users_robot_is_not_read(self):
+        response = self.simulate(self.other)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['drawdown_est'], "N/A (no backtest)")
+
+
+class VersionDiffTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='x')
+        self.robot = Robot.objects.create(
+            user=self.owner, symbol='EURUSD', method='winrate', version=3, indicators={'rsi': {'buy': 45}}
+        )
+        for number, profits in ((1, None), (2, [1.0, -0.5]), (3, [1.0, 2.0])):
+            artifact = None
+            if profits is not None:
+                trades = TradeLedger.from_columns(
+                    entry_time=[10, 30], exit_time=[20, 40], side=[1, 1], profit=profits, closed=[True, True],
+                    entry_price=np.ones(2), exit_price=np.ones(2),
+                )
+                artifact = BacktestArtifact(trades, {'total_profit': sum(profits)}).to_bytes()
+            StrategyVersion.objects.create(
+                robot=self.robot, version_number=number, indicators={'rsi': {'buy': 30 + number}},
+                risk_settings={}, backtest_artifact=artifact
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def url(self, action):
+        return f'/api/robots/{self.robot.id}/{action}/'
+
+    def test_version_diff(self):
+        response = self.client.get(self.url('version_diff'), {'base': 2, 'other': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['base'], response.data['other']), (2, 3))
+        self.assertEqual(response.data['metrics']['total_profit']['delta'], 2.5)
+        self.assertEqual(response.data['trades']['changed'], 1)
+
+        # `other` defaults to the robot's current version
+        self.assertEqual(self.client.get(self.url('version_diff'), {'base': 2}).data['other'], 3)
+
+    def test_version_diff_without_artifact(self):
+        response = self.client.get(self.url('version_diff'), {'base': 1, 'other': 3})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('artifact', response.data['error'])
+        self.assertEqual(self.client.get(self.url('version_diff'), {'base': 9}).status_code, 404)
+
+    def test_rollback_reports_the_diff(self):
+        response = self.client.post(self.url('rollback'), {'version_number': 2}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['diff']['metrics']['total_profit']['delta'], -2.5)
+        self.robot.refresh_from_db()
+        self.assertEqual((self.robot.version, self.robot.indicators), (2, {'rsi': {'buy': 32}}))
+
+    def test_rollback_without_artifact(self):
+        # Rolling back to a version built before artifacts existed still works, just without a diff
+        response = self.client.post(self.url('rollback'), {'version_number': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['diff'])
+        self.robot.refresh_from_db()
+        self.assertEqual((self.robot.version, self.robot.indicators), (1, {'rsi': {'buy': 31}}))
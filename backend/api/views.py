@@ -26,6 +26,21 @@ from .serializers import (
 )
 from trading.mt5_connector import MT5Connector
 from trading.backtester import Backtester
+from trading.parameter_sweep import ParameterSweep
+from trading.columnar import tolerance_report
+from trading.optimizer import ParameterOptimizer
+from trading.walk_forward import WalkForwardRunner
+from trading.cross_validation import PurgedKFoldRunner
+from trading.intrabar import IntrabarExitEngine
+from trading.monte_carlo import MonteCarloAnalyzer
+from trading.result_cache import BacktestResultCache
+from trading.scheduler import default_scheduler
+from trading.backtest_artifact import BacktestArtifact
+from trading.cost_model import TransactionCostModel
+from trading.money_management import MoneyManager
+from trading.rule_compiler import rules_from_indicators
+from trading.indicator_search import IndicatorSubsetSearch
+from trading.tick_replay import TickReplayEngine, TickStore
 from trading.robot_generator import RobotGenerator
 from trading.robot_generator import RobotGenerator
 from trading.strategy_analyzer import StrategyAnalyzer
@@ -351,9 +366,7 @@ class RobotViewSet(viewsets.ModelViewSet):
                 print(f"DEBUG: Build Thread - Robot: {r.name}, Symbol: {r.symbol}, Timeframe: {timeframe}")
 
                 # Build rules
-                rules = {}
-                if 'rsi' in indicators: rules['rsi'] = request_data.get('rsi_settings', {'buy': 30, 'sell': 70, 'period': 14})
-                if 'ma' in indicators: rules['ma'] = request_data.get('ma_settings', {'period': 50, 'type': 'MODE_SMA'})
+                rules = rules_from_indicators(indicators, request_data)
                 
                 # Data Fetching Strategy
                 hist_config = request_data.get('historical', {})
@@ -408,14 +421,201 @@ class RobotViewSet(viewsets.ModelViewSet):
                          raise Exception(msg)
                      raise e
 
+                # Optional indicator subset search: let the data pick the indicator combination
+                search_config = request_data.get('indicator_search')
+                if search_config:
+                    t.progress = 25
+                    t.log = "Searching indicator combinations..."
+                    t.save()
+                    search_config = search_config if isinstance(search_config, dict) else {}
+                    search = IndicatorSubsetSearch(
+                        df,
+                        grids=search_config.get('grids'),
+                        families=search_config.get('families') or IndicatorSubsetSearch.DEFAULT_GRIDS.keys(),
+                        max_indicators=int(search_config.get('max_indicators', 3)),
+                        metric=request_data.get('sweep_metric', 'win_rate'),
+                        min_trades=int(search_config.get('min_trades', 5)),
+                        max_drawdown=search_config.get('max_drawdown'),
+                        time_budget=float(search_config.get('time_budget', 60))
+                    )
+                    search_report = search.run()
+                    report.indicator_search = search.summary(search_report)
+                    report.save()
+                    if search_report['results']:
+                        rules = dict(search_report['results'][0]['rules'])
+                        # In place, so the sweep filter and the saved version see the chosen set
+                        indicators[:] = list(rules)
+                        r.indicators = indicators
+                        r.save()
+                        print(f"DEBUG: Indicator search selected rules {rules}")
+
+                # Optional parameter sweep: pick the best configuration before generating code
+                sweep_grid = request_data.get('sweep')
+                if sweep_grid:
+                    t.progress = 30
+                    t.log = "Optimizing strategy parameters..."
+                    t.save()
+                    grid = {k: v for k, v in sweep_grid.items() if k in indicators}
+                    sweep = ParameterSweep(df, grid, metric=request_data.get('sweep_metric', 'win_rate'))
+                    if request_data.get('sweep_halving'):
+                        # Successive halving: only promising combinations get the full history
+                        halving = default_scheduler().successive_halving(
+                            df, sweep.combinations(), metric=sweep.metric, min_trades=sweep.min_trades
+                        )
+                        ranked = [res for res in halving['results'] if res['status'] == 'DONE']
+                        best_rules = ranked[0]['rules'] if ranked and ranked[0]['metrics'].get('total_trades') else None
+                    elif request_data.get('compute_dtype') == 'float32':
+                        # Half-size sweep matrix; the winner is re-checked against float64 before it is used
+                        sweep = ParameterSweep(
+                            HistoricalDataService.to_columns(df, 'float32'), grid, metric=sweep.metric
+                        )
+                        best_rules = sweep.best_rules()
+                        check = tolerance_report(df, {**rules, **(best_rules or {})})
+                        if not check['ok']:
+                            report.warnings = report.warnings + [{
+                                'code': 'FLOAT32_TOLERANCE_EXCEEDED',
+                                'message': f"float32 sweep differs from float64 beyond tolerance ({check['measured']}); re-ran it in float64"
+                            }]
+                            best_rules = ParameterSweep(df, grid, metric=sweep.metric).best_rules()
+                    else:
+                        best_rules = sweep.best_rules()
+                    if best_rules:
+                        rules.update(best_rules)
+                        print(f"DEBUG: Sweep selected rules {rules}")
+
+                # Optional TPE optimization over rule and SL/TP parameters (resumable by study name)
+                opt_config = request_data.get('optimize')
+                if opt_config and opt_config.get('space'):
+                    t.progress = 35
+                    t.log = "Optimizing strategy and risk parameters..."
+                    t.save()
+                    space = {k: v for k, v in opt_config['space'].items() if k in indicators or k == 'risk'}
+                    optimizer = ParameterOptimizer(
+                        df, space,
+                        metric=request_data.get('sweep_metric', 'win_rate'),
+                        trials=int(opt_config.get('trials', 100)),
+                        study=opt_config.get('study'),
+                        symbol=symbol,
+                        sub_bars=HistoricalDataService.load_m1_history(symbol) if 'risk' in space else None
+                    )
+                    best_params = optimizer.best_params()
+                    if optimizer.store is not None and optimizer.store.name != opt_config.get('study'):
+                        report.warnings = report.warnings + [{
+                            'code': 'STUDY_DATA_CHANGED',
+                            'message': f"Study '{opt_config.get('study')}' was run on another search or data set; continued as '{optimizer.store.name}'"
+                        }]
+                    if best_params:
+                        risk.update(best_params.pop('risk', {}))
+                        r.risk_settings = risk
+                        r.save()
+                        for family, params in best_params.items():
+                            rules[family] = {**rules.get(family, {}), **params}
+                        print(f"DEBUG: Optimizer selected rules {rules}, risk {risk}")
+
                 t.progress = 40
                 t.log = "Running backtest..."
                 t.save()
                 print("DEBUG: Starting backtest...")
 
-                bt = Backtester(df, rules)
-                trades = bt.run()
-                metrics = bt.compute_metrics(trades)
+                # Resolve the robot's SL/TP inside each bar from stored M1 history
+                stops = None
+                if risk.get('sl') or risk.get('tp'):
+                    stops = IntrabarExitEngine.for_frame(df, symbol, risk)
+                    if stops.coverage['covered_bars'] < stops.coverage['bars']:
+                        report.warnings = report.warnings + [{
+                            'code': 'M1_PARTIAL_COVERAGE',
+                            'message': f"M1 history covers {stops.coverage['covered_bars']} of {stops.coverage['bars']} bars; SL/TP on the rest is resolved on the bars' own high/low"
+                        }]
+
+                # Charge spread/slippage measured on this symbol's past executions
+                costs = TransactionCostModel.for_symbol(symbol) if request_data.get('costs', True) else None
+
+                # Lot sizing and account-currency P&L from the robot's risk settings, when the
+                # symbol's specs allow converting it; price-unit metrics otherwise
+                try:
+                    money = MoneyManager(symbol, risk, initial_equity=float(request_data.get('initial_equity', 10000))).check()
+                except ValueError as e:
+                    money = None
+                    report.warnings = report.warnings + [{
+                        'code': 'MONEY_MANAGEMENT_SKIPPED',
+                        'message': f"{e}; metrics are in price units without lot sizing"
+                    }]
+
+                bt = Backtester(df, rules, stops=stops, costs=costs, money=money)
+                result_cache = BacktestResultCache()
+                # Runs as a budgeted job on the shared scheduler so concurrent builds share the CPU
+                cpu_budget = request_data.get('cpu_budget')
+                trades, metrics = result_cache.run(
+                    bt, scheduler=default_scheduler(),
+                    cpu_budget=float(cpu_budget) if cpu_budget else None
+                )
+                backtest_partial = bool(metrics.get('partial'))
+                win_rate_partial = backtest_partial
+                if backtest_partial:
+                    report.warnings = report.warnings + [{
+                        'code': 'BACKTEST_BUDGET_EXHAUSTED',
+                        'message': f"CPU budget reached after {metrics['bars_tested']} of {len(df)} bars; metrics cover those bars only"
+                    }]
+                report.cache_hits = result_cache.hits
+                report.cache_misses = result_cache.misses
+
+                # Robustness: resample the trade sequence to estimate drawdown / ruin odds
+                report.metrics = {**metrics, **(money.summary(trades) if money is not None else {})}
+                if stops is not None:
+                    report.metrics['m1_coverage'] = stops.coverage
+                report.monte_carlo = MonteCarloAnalyzer(trades, paths=int(request_data.get('mc_paths', 10000))).run()
+                report.save()
+
+                # Validation re-selects the rules from the sweep grid on each training range
+                search_grid = dict(rules)
+                search_grid.update({k: v for k, v in (sweep_grid or {}).items() if k in rules})
+                tuned = bool(request_data.get('indicator_search') or sweep_grid or (opt_config and opt_config.get('space')))
+
+                # Optional purged k-fold validation: publish the mean test-fold win rate instead
+                cv_config = request_data.get('cross_validation')
+                if cv_config:
+                    t.progress = 50
+                    t.log = "Running cross-validation..."
+                    t.save()
+                    cv_config = cv_config if isinstance(cv_config, dict) else {}
+                    embargo = cv_config.get('embargo')
+                    cv_runner = PurgedKFoldRunner(
+                        df, search_grid,
+                        folds=int(cv_config.get('folds', 5)),
+                        embargo=int(embargo) if embargo is not None else None,
+                        metric=request_data.get('sweep_metric', 'win_rate')
+                    )
+                    cv = cv_runner.run()
+                    report.cross_validation = cv
+                    if len(cv_runner.sweep.combinations()) > 1 or not tuned:
+                        metrics['win_rate'] = cv['win_rate']
+                        win_rate_partial = False
+                    else:
+                        # Rules tuned on the whole history without a grid to re-tune per fold:
+                        # every test fold was part of their selection sample
+                        report.warnings = report.warnings + [{
+                            'code': 'CROSS_VALIDATION_IN_SAMPLE',
+                            'message': "Rules were selected on the full history, so test folds are in-sample; win rate not replaced"
+                        }]
+                    report.save()
+
+                # Optional walk-forward validation: publish the out-of-sample win rate instead
+                wf_config = request_data.get('walk_forward')
+                if wf_config:
+                    t.progress = 55
+                    t.log = "Running walk-forward validation..."
+                    t.save()
+                    wf_config = wf_config if isinstance(wf_config, dict) else {}
+                    wf = WalkForwardRunner(
+                        df, search_grid,
+                        windows=int(wf_config.get('windows', 4)),
+                        in_sample_ratio=int(wf_config.get('in_sample_ratio', 3)),
+                        metric=request_data.get('sweep_metric', 'win_rate')
+                    ).run()
+                    report.walk_forward = wf
+                    report.save()
+                    metrics['win_rate'] = wf['out_of_sample'].get('win_rate', 0)
+                    win_rate_partial = False
                 
                 t.progress = 70
                 t.log = "Generating MQL5 code..."
@@ -424,19 +624,27 @@ class RobotViewSet(viewsets.ModelViewSet):
                 mql5_code = RobotGenerator.generate_mql5(r.id, name, symbol, timeframe, rules, risk)
                 
                 r.win_rate = metrics['win_rate']
+                r.win_rate_partial = win_rate_partial
                 r.mql5_code = mql5_code
+                # A budget-cut run stops mid-history, so there is no end state for rescore to resume from
+                r.backtest_checkpoint = {} if backtest_partial else {
+                    **bt.checkpoint(trades), 'timeframe': timeframe, 'lookback': lookback_months,
+                    'costs': costs is not None,
+                    'money': {'initial_equity': money.initial_equity} if money is not None else None
+                }
                 r.save()
 
                 # Versioning
                 StrategyVersion.objects.create(
                     robot=r, version_number=1, 
                     indicators=indicators, risk_settings=risk, 
-                    mql5_code=mql5_code
+                    mql5_code=mql5_code,
+                    backtest_artifact=BacktestArtifact(trades, report.metrics).to_bytes()
                 )
                 
                 t.progress = 100
                 t.status = 'COMPLETE'
-                t.log = "Robot built successfully."
+                t.log = "Robot built successfully." if not win_rate_partial else "Robot built; win rate covers a partial backtest (CPU budget reached)."
                 t.save()
                 print(f"DEBUG: Robot {robot_id} build COMPLETE.")
             except Exception as e:
@@ -592,9 +800,8 @@ class RobotViewSet(viewsets.ModelViewSet):
         try:
             from api.security import decrypt
             
-            rules = {}
-            if 'rsi' in robot.indicators: rules['rsi'] = {'buy': 30, 'sell': 70, 'period': 14}
-            if 'ma' in robot.indicators: rules['ma'] = {'period': 50, 'type': 'MODE_SMA'}
+            # Deploy the rules the robot was backtested with
+            rules = (robot.backtest_checkpoint or {}).get('rules') or rules_from_indicators(robot.indicators)
             
             python_code = RobotGenerator.generate_python(
                 robot_name=f"Bot_{robot.id}",
@@ -635,6 +842,8 @@ class RobotViewSet(viewsets.ModelViewSet):
             # Creating a user manager context
             mt5m = UserMT5Manager(account.user.id, account)
             mt5m.connect()
+            # The live contract specs back money management in later builds and rescores
+            HistoricalDataService.refresh_specs(robot.symbol)
             
             # For now, we assume success if we can connect and chart opens.
             # Real deployment would involve attaching EA, but we might skip complex EAManager for this fix
@@ -720,6 +929,8 @@ class RobotViewSet(viewsets.ModelViewSet):
         
         try:
             version = StrategyVersion.objects.get(robot=robot, version_number=version_number)
+            current = StrategyVersion.objects.filter(robot=robot, version_number=robot.version).first()
+            diff = self._version_diff(current, version) if current else None
             robot.indicators = version.indicators
             robot.risk_settings = version.risk_settings
             robot.mql5_code = version.mql5_code
@@ -737,26 +948,187 @@ class RobotViewSet(viewsets.ModelViewSet):
             return Response({
                 "status": "rolled_back",
                 "version": version_number,
-                "robot": RobotSerializer(robot).data
+                "robot": RobotSerializer(robot).data,
+                "diff": diff
             })
         except StrategyVersion.DoesNotExist:
             return Response({"error": "Version not found"}, status=status.HTTP_404_NOT_FOUND)
 
+    @staticmethod
+    def _version_diff(base, other):
+        """Performance diff of two versions from their stored artifacts (None if either has none)."""
+        if not base.backtest_artifact or not other.backtest_artifact:
+            return None
+        return BacktestArtifact.from_bytes(base.backtest_artifact).diff(
+            BacktestArtifact.from_bytes(other.backtest_artifact)
+        )
+
+    @action(detail=True, methods=['get'])
+    def version_diff(self, request, pk=None):
+        """Compares two versions' stored backtests: ?base=<version_number>&other=<version_number>"""
+        robot = self.get_object()
+        try:
+            base = robot.versions.get(version_number=request.query_params.get('base'))
+            other = robot.versions.get(version_number=request.query_params.get('other', robot.version))
+        except (StrategyVersion.DoesNotExist, ValueError):
+            return Response({"error": "Version not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        diff = self._version_diff(base, other)
+        if diff is None:
+            return Response(
+                {"error": "Both versions need a stored backtest artifact; rebuild the older one"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({"base": base.version_number, "other": other.version_number, **diff})
+
+    @action(detail=True, methods=['post'])
+    def rescore(self, request, pk=None):
+        """
+        Re-scores the build backtest over bars that arrived since, resuming from its checkpoint
+        with the build's stops, costs and money management. The in-sample result goes to
+        robot.rescore; win_rate keeps the build's (possibly out-of-sample) figure.
+        """
+        robot = self.get_object()
+        checkpoint = robot.backtest_checkpoint
+        if not checkpoint:
+            return Response({"error": "No backtest checkpoint, rebuild the robot first"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            df, _ = HistoricalDataService.fetch_data(
+                robot.symbol, checkpoint.get('timeframe', 'H1'), checkpoint.get('lookback', 1),
+                account=TradingAccount.objects.filter(user=robot.user).first()
+            )
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        new_bars = df[df['time'] > pd.Timestamp(checkpoint['last_time'])]
+        if new_bars.empty:
+            return Response({"status": "up_to_date", "rescore": robot.rescore, "new_bars": 0})
+
+        # The build's configuration: stored M1 stops, measured costs and the sizing it ran with
+        risk = robot.risk_settings or {}
+        stops_factory = None
+        if risk.get('sl') or risk.get('tp'):
+            stops_factory = lambda frame: IntrabarExitEngine.for_frame(frame, robot.symbol, risk)
+
+        costs = TransactionCostModel.for_symbol(robot.symbol) if checkpoint.get('costs') else None
+        money = None
+        if checkpoint.get('money'):
+            totals = checkpoint['totals']
+            equity = totals.get('equity', checkpoint['money']['initial_equity'] + totals.get('pnl', 0.0))
+            try:
+                money = MoneyManager(robot.symbol, risk, initial_equity=equity).check()
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        trades, metrics, new_checkpoint = Backtester.resume(
+            checkpoint, new_bars, stops_factory=stops_factory, costs=costs, money=money
+        )
+        new_checkpoint.update({key: checkpoint.get(key) for key in ('timeframe', 'lookback', 'costs', 'money')})
+        robot.rescore = {
+            'metrics': metrics,
+            'last_time': new_checkpoint['last_time'],
+            'new_bars': (robot.rescore or {}).get('new_bars', 0) + len(new_bars),
+            'in_sample': True,
+        }
+        robot.backtest_checkpoint = new_checkpoint
+        robot.save()
+
+        return Response({
+            "status": "rescored",
+            "win_rate": robot.win_rate,
+            "rescore": robot.rescore,
+            "new_bars": len(new_bars),
+            "new_trades": len(trades),
+            "trades": trades.to_columns()
+        })
+
+    @action(detail=True, methods=['post'])
+    def tick_replay(self, request, pk=None):
+        """Backtests the robot's rules on stored bid/ask ticks with live-like market order fills."""
+        robot = self.get_object()
+        store = TickStore(robot.symbol)
+        if not len(store):
+            return Response(
+                {"error": f"No ticks stored for {robot.symbol}; download them with the import_ticks action first"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        checkpoint = robot.backtest_checkpoint or {}
+        rules = checkpoint.get('rules') or rules_from_indicators(robot.indicators)
+        risk = robot.risk_settings or {}
+        try:
+            engine = TickReplayEngine(
+                store, rules,
+                timeframe=request.data.get('timeframe', checkpoint.get('timeframe', 'H1')),
+                sl_points=risk.get('sl'), tp_points=risk.get('tp'),
+                latency_ms=float(request.data.get('latency_ms', 0)),
+                deviation=request.data.get('deviation')
+            )
+            trades = engine.run()
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            **engine.stats,
+            "metrics": Backtester.compute_metrics(trades),
+            "trades": trades.to_columns()
+        })
+
+    @action(detail=True, methods=['post'])
+    def import_ticks(self, request, pk=None):
+        """Downloads the robot symbol's bid/ask ticks from the owner's MT5 account into the TickStore."""
+        robot = self.get_object()
+        account = TradingAccount.objects.filter(user=robot.user, is_active=True).first()
+        if account is None:
+            return Response({"error": "No active MT5 account to download ticks from"}, status=status.HTTP_400_BAD_REQUEST)
+
+        store = TickStore(robot.symbol)
+        try:
+            from trading.user_mt5_manager import UserMT5Manager
+            mt5m = UserMT5Manager(account.user.id, account)
+            mt5m.connect()
+            try:
+                imported = store.sync_mt5(days=float(request.data.get('days', 7)))
+            finally:
+                mt5m.shutdown()
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"symbol": store.symbol, "imported": imported, "stored": len(store)})
+
     @action(detail=False, methods=['post'])
     def risk_simulate(self, request):
         symbol = request.data.get('symbol', 'EURUSD')
         lot = float(request.data.get('lot', 0.01))
         sl = float(request.data.get('sl', 30))
         
-        # Simplistic but informative simulation
-        pip_value = 10.0 # for 1.0 lot on EURUSD
+        # Pip value per lot from the symbol's contract specs (MT5 snapshot or static fallback)
+        try:
+            pip_value = MoneyManager(symbol).pip_value()
+        except (ValueError, TypeError, ZeroDivisionError):
+            pip_value = 10.0 # standard lot on a USD-quoted pair
         risk_amount = lot * sl * pip_value
+
+        # Use the robot's last backtest for the drawdown estimate when one is available
+        drawdown_est = "N/A (no backtest)"
+        robot_id = request.data.get('robot_id')
+        report = None
+        if robot_id:
+            # Latest build of one of the caller's own robots
+            report = RobotBuildReport.objects.filter(
+                robot_id=robot_id, robot__user=request.user
+            ).order_by('-created_at', '-id').first()
+        if report and report.metrics.get('max_drawdown') is not None:
+            pip_size = IntrabarExitEngine.default_point(symbol) * 10
+            dd_pips = report.metrics['max_drawdown'] / pip_size
+            drawdown_est = f"${dd_pips * pip_value * lot:.2f} ({dd_pips:.1f} pips, backtest max)"
         
         return Response({
             "pip_value": f"${pip_value * lot:.2f}",
             "risk_amount": f"${risk_amount:.2f}",
             "margin_usage": f"${lot * 1000 * 0.01:.2f} (approx)", # 1:100 leverage
-            "drawdown_est": "2.4% (historical avg)"
+            "drawdown_est": drawdown_est
         })
 
     @action(detail=True, methods=['get'])
@@ -840,10 +1212,17 @@ class RobotViewSet(viewsets.ModelViewSet):
              return Response({"error": f"Internal execution error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         status_msg = "FAILED"
+        spread = slippage = None
         
         if result and 'error' not in result and result.get('retcode') == mt5.TRADE_RETCODE_DONE:
              status_msg = "ORDER_PLACED"
              # Real trade successful
+             if result.get('price') and result.get('bid') and result.get('ask'):
+                 # Execution samples for the TransactionCostModel used by backtests
+                 spread, slippage = TransactionCostModel.execution_costs(
+                     robot.symbol, 1 if order_type_int == mt5.ORDER_TYPE_BUY else -1,
+                     result['bid'], result['ask'], result['requested_price'], result['price']
+                 )
         elif result and 'error' in result:
              status_msg = f"FAILED: {result['error']}"
         else:
@@ -863,7 +1242,10 @@ class RobotViewSet(viewsets.ModelViewSet):
             expiry_time=expiry,
             confidence_score=confidence,
             failure_reason="" if status_msg == "ORDER_PLACED" else status_msg,
-            initial_balance=0.0
+            initial_balance=0.0,
+            spread=spread,
+            slippage=slippage,
+            triggered_at=timezone.now() if status_msg == "ORDER_PLACED" else None
         )
         
         RobotEvent.objects.create(
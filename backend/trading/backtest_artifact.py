@@ -0,0 +1,158 @@
+"""
+Compact Backtest Artifacts
+A backtest's trade ledger and equity curve packed column by column into one compressed blob,
+small enough to live on StrategyVersion and diffed without re-running anything.
+"""
+
+import io
+import json
+
+import numpy as np
+
+from .trade_ledger import TRADE_DTYPE, TradeLedger
+
+# Bump when the stored layout changes; older blobs are still read field by field
+ARTIFACT_VERSION = 1
+
+# Metrics compared by diff()
+DIFF_METRICS = (
+    'win_rate', 'total_profit', 'total_trades', 'profit_factor', 'expectancy', 'sharpe',
+    'sortino', 'max_drawdown', 'max_drawdown_duration', 'exposure',
+)
+
+
+class BacktestArtifact:
+    """
+    trades: TradeLedger; equity_times / equity: cumulative closed profit at each exit (exit order);
+    metrics: Backtester.compute_metrics() of the run.
+
+    Each ledger field is stored as its own array inside an npz, so zlib sees runs of similar
+    values (monotonic times, small ints, booleans) instead of interleaved records.
+    """
+
+    def __init__(self, trades, metrics=None, equity_times=None, equity=None):
+        self.trades = TradeLedger.coerce(trades)
+        self.metrics = dict(metrics or {})
+        if equity is None:
+            closed = self.trades.closed()
+            order = np.argsort(closed['exit_time'], kind='stable')
+            equity_times = closed['exit_time'][order]
+            equity = np.cumsum(closed['profit'][order])
+        self.equity_times = np.asarray(equity_times, dtype=np.int64)
+        self.equity = np.asarray(equity, dtype=np.float64)
+
+    def to_bytes(self):
+        arr = self.trades.array
+        meta = {
+            'version': ARTIFACT_VERSION,
+            'metrics': self.metrics,
+            'datetime_index': self.trades.datetime_index,
+            'has_reasons': self.trades.has_reasons,
+        }
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            meta=np.frombuffer(json.dumps(meta, default=float).encode(), dtype=np.uint8),
+            equity_times=self.equity_times,
+            equity=self.equity,
+            **{f'trade_{name}': np.ascontiguousarray(arr[name]) for name in TRADE_DTYPE.names}
+        )
+        return buffer.getvalue()
+
+    @staticmethod
+    def _meta(payload):
+        return json.loads(payload['meta'].tobytes().decode())
+
+    @classmethod
+    def from_bytes(cls, blob):
+        with np.load(io.BytesIO(bytes(blob)), allow_pickle=False) as payload:
+            meta = cls._meta(payload)
+            stored = {name[len('trade_'):] for name in payload.files if name.startswith('trade_')}
+            n = len(payload['trade_entry_bar'])
+            arr = np.zeros(n, dtype=TRADE_DTYPE)
+            for name in TRADE_DTYPE.names:
+                if name in stored:
+                    arr[name] = payload[f'trade_{name}']
+            trades = TradeLedger.from_array(arr, meta['datetime_index'], meta['has_reasons'])
+            return cls(trades, meta['metrics'], payload['equity_times'], payload['equity'])
+
+    @classmethod
+    def read_metrics(cls, blob):
+        """Metrics only; np.load decompresses npz members lazily, so the ledger is never read."""
+        with np.load(io.BytesIO(bytes(blob)), allow_pickle=False) as payload:
+            return cls._meta(payload)['metrics']
+
+    def equity_at(self, times):
+        """Step-function equity (0 before the first exit) at each int64 time."""
+        if not len(self.equity):
+            return np.zeros(len(times))
+        idx = np.searchsorted(self.equity_times, times, side='right') - 1
+        return np.where(idx >= 0, self.equity[np.maximum(idx, 0)], 0.0)
+
+    def diff(self, other):
+        """
+        JSON-ready comparison of this (base) run with `other`: metric deltas, which trades the two
+        runs share (same entry time and side) and where their equity curves drift apart most.
+        """
+        metrics = {}
+        for name in DIFF_METRICS:
+            a, b = self.metrics.get(name), other.metrics.get(name)
+            if a is None and b is None:
+                continue
+            delta = None if a is None or b is None else round(float(b) - float(a), 6)
+            metrics[name] = {'base': a, 'other': b, 'delta': delta}
+
+        ta, tb = self.trades.array, other.trades.array
+        key_a = np.stack([ta['entry_time'], ta['side'].astype(np.int64)], axis=1)
+        key_b = np.stack([tb['entry_time'], tb['side'].astype(np.int64)], axis=1)
+        common, ia, ib = _intersect_rows(key_a, key_b)
+        changed = (
+            (ta['closed'][ia] != tb['closed'][ib])
+            | (ta['exit_time'][ia] != tb['exit_time'][ib])
+            | ~np.isclose(ta['profit'][ia], tb['profit'][ib])
+        )
+
+        grid = np.union1d(self.equity_times, other.equity_times)
+        equity = {
+            'final': {
+                'base': float(self.equity[-1]) if len(self.equity) else 0.0,
+                'other': float(other.equity[-1]) if len(other.equity) else 0.0,
+            },
+            'max_gap': 0.0,
+            'max_gap_time': None,
+        }
+        gap = other.equity_at(grid) - self.equity_at(grid)
+        if np.any(gap):
+            k = int(np.argmax(np.abs(gap)))
+            equity['max_gap'] = round(float(gap[k]), 6)
+            equity['max_gap_time'] = self._time_label(grid[k])
+
+        return {
+            'metrics': metrics,
+            'trades': {
+                'base': len(ta),
+                'other': len(tb),
+                'common': int(common),
+                'changed': int(np.count_nonzero(changed)),
+                'only_base': len(ta) - int(common),
+                'only_other': len(tb) - int(common),
+            },
+            'equity': equity,
+        }
+
+    def _time_label(self, value):
+        if self.trades.datetime_index:
+            return str(np.datetime64(int(value), 'ns'))
+        return int(value)
+
+
+def _intersect_rows(a, b):
+    """(count, index_in_a, index_in_b) of the rows two (n, 2) int64 key arrays share."""
+    if not len(a) or not len(b):
+        empty = np.empty(0, dtype=np.int64)
+        return 0, empty, empty
+    view = np.dtype([('t', np.int64), ('s', np.int64)])
+    ra = np.ascontiguousarray(a).view(view).ravel()
+    rb = np.ascontiguousarray(b).view(view).ravel()
+    _, ia, ib = np.intersect1d(ra, rb, assume_unique=False, return_indices=True)
+    return len(ia), ia, ib
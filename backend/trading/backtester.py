@@ -1,54 +1,225 @@
+import numpy as np
 import pandas as pd
-from .indicator_engine import IndicatorEngine
+from .indicator_graph import IndicatorGraph
+from .rule_compiler import FAMILIES, compile_rules, indicator_columns
+from .trade_ledger import EXIT_REASONS, TRADE_DTYPE, TradeLedger, index_times
 
 class Backtester:
-    def __init__(self, data, strategy_rules):
+    MODES = ('vectorized', 'reference')
+    INDICATOR_FAMILIES = FAMILIES
+    # Families the original bar loop understands
+    REFERENCE_FAMILIES = ('rsi', 'ma', 'macd')
+
+    def __init__(self, data, strategy_rules, mode='vectorized', stops=None, costs=None, money=None):
         """
         data: pd.DataFrame with OHLC
         strategy_rules: dict defining signals (e.g. {"rsi": {"buy": 30, "sell": 70}, "ma": {"period": 50}})
+        mode: 'vectorized' (NumPy engine) or 'reference' (original bar-by-bar loop)
+        stops: optional IntrabarExitEngine resolving risk SL/TP inside each bar (vectorized mode only)
+        costs: optional TransactionCostModel charging spread/slippage to every fill (vectorized mode only)
+        money: optional MoneyManager adding lot sizes and account-currency P&L (vectorized mode only)
         """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown backtest mode '{mode}', expected one of {self.MODES}")
+        if stops is not None and mode == 'reference':
+            raise ValueError("The reference loop does not simulate SL/TP exits")
+        if costs is not None and mode == 'reference':
+            raise ValueError("The reference loop does not charge transaction costs")
+        if money is not None and mode == 'reference':
+            raise ValueError("The reference loop does not size positions")
+        if mode == 'reference' and any(f not in self.REFERENCE_FAMILIES for f in strategy_rules):
+            raise ValueError(f"The reference loop only evaluates {self.REFERENCE_FAMILIES}")
         self.data = data
         self.rules = strategy_rules
+        self.mode = mode
+        self.stops = stops
+        self.costs = costs
+        self.money = money
 
     def run(self):
+        self._add_indicators()
+        if self.mode == 'reference':
+            return self._run_reference()
+        return self._run_vectorized()
+
+    def _add_indicators(self):
         # Calculate indicators as needed
-        if 'rsi' in self.rules:
-            self.data['rsi'] = IndicatorEngine.calculate_rsi(self.data, period=self.rules['rsi'].get('period', 14))
-        
-        if 'ma' in self.rules:
-            self.data['ma'] = IndicatorEngine.calculate_sma(self.data, period=self.rules['ma'].get('period', 50))
-            
-        if 'macd' in self.rules:
-            macd, signal = IndicatorEngine.calculate_macd(self.data)
-            self.data['macd'] = macd
-            self.data['macd_signal'] = signal
+        for name, values in compile_rules(self.rules).indicator_columns(self.data).items():
+            self.data[name] = values
+
+    @staticmethod
+    def indicator_columns(data, family, params, graph=None):
+        """Computes the indicator columns a rule family reads, keyed by column name."""
+        return indicator_columns(data, family, params, graph)
+
+    def _run_vectorized(self):
+        columns = {name: self.data[name].to_numpy() for name in self.data.columns}
+        trades = self.run_arrays(columns, self.rules, self.data.index, stops=self.stops)
+        if self.costs is not None:
+            self._charge_costs(self.costs, trades, self._bar_times(self.data))
+        if self.money is not None:
+            self.money.apply(trades)
+        return trades
+
+    @staticmethod
+    def _bar_times(data):
+        """int64 ns time of each bar (None when the frame carries no timestamps)."""
+        if 'time' in data.columns:
+            return data['time'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        if isinstance(data.index, pd.DatetimeIndex):
+            return index_times(data.index)[0]
+        return None
+
+    @staticmethod
+    def _charge_costs(costs, trades, bar_times, entry_cost=None):
+        """Applies a TransactionCostModel to a ledger whose entry/exit bars index bar_times."""
+        if bar_times is None:
+            return costs.apply(trades, entry_cost=entry_cost)
+        arr = trades.array
+        return costs.apply(
+            trades,
+            entry_times=bar_times[arr['entry_bar']] if entry_cost is None else None,
+            exit_times=bar_times[np.where(arr['closed'], arr['exit_bar'], 0)],
+            entry_cost=entry_cost
+        )
+
+    @staticmethod
+    def run_arrays(columns, rules, index=None, stops=None):
+        """
+        Vectorized engine over plain NumPy columns ('close' plus the indicator columns the rules read).
+        index maps bar positions to entry/exit times; bar positions are used when it is None.
+        stops: optional IntrabarExitEngine bound to the same bars; trades then also carry 'exit_reason'.
+        Returns a TradeLedger.
+        """
+        buy, sell = Backtester._signal_arrays(columns, rules)
+        return Backtester._build_trades(buy, sell, columns['close'], index, stops)
+
+    @staticmethod
+    def _build_trades(buy, sell, close, index=None, stops=None, times=None):
+        """
+        Writes the resolved positions straight into a TradeLedger, one column at a time.
+        times: precomputed index_times() result, for callers that already hold it.
+        """
+        positions = Backtester._resolve_positions(buy, sell, close, stops)
+        if times is None:
+            times = index_times(np.arange(len(close)) if index is None else index)
+        return Backtester._ledger(positions, close, times, has_reasons=stops is not None)
+
+    @staticmethod
+    def _ledger(positions, close, times, has_reasons=False):
+        """TradeLedger for a _resolve_positions() result; times is an index_times() pair."""
+        entries, exits, sides, exit_prices, reasons = positions
+        times, datetime_index = times
+        closed = exits >= 0
+        entry_prices = close[entries]
+        return TradeLedger.from_columns(
+            datetime_index=datetime_index,
+            has_reasons=has_reasons,
+            entry_bar=entries,
+            exit_bar=exits,
+            entry_time=times[entries],
+            exit_time=np.where(closed, times[exits], 0),
+            entry_price=entry_prices,
+            exit_price=exit_prices,
+            side=sides,
+            profit=np.where(closed, (exit_prices - entry_prices) * sides, 0.0),
+            closed=closed,
+            exit_reason=reasons
+        )
+
+    @staticmethod
+    def _signal_arrays(columns, rules):
+        """
+        Evaluates every rule over the whole series at once through the shared rule compiler.
+        Returns (buy, sell) boolean arrays with the same semantics as the reference loop:
+        all active conditions must agree, and bar 0 never signals.
+        """
+        return compile_rules(rules).signals(columns)
+
+    @staticmethod
+    def _resolve_positions(buy, sell, close, stops=None, monitor=None):
+        """
+        Resolves the flat/long/short state machine over the signal arrays.
+        Instead of visiting every bar it jumps between signal bars with binary search,
+        so the cost is O(trades * log(bars)).
+        With `stops`, each trade may instead close on an intrabar SL/TP touch before its signal exit.
+        Returns (entries, exits, sides, exit_prices, reasons) arrays; reasons are EXIT_REASONS codes,
+        exit is -1 and reason '' for a trade still open.
+        monitor: optional callable(profit, remaining_signal_bars) run after every closed trade;
+        returning True abandons the run and None is returned instead.
+        """
+        any_bars = np.flatnonzero(buy | sell)
+        buy_bars = np.flatnonzero(buy)
+        sell_bars = np.flatnonzero(sell)
+
+        entries, exits, sides, exit_prices, reasons = [], [], [], [], []
+        start = 0
+        while True:
+            k = np.searchsorted(any_bars, start)
+            if k == len(any_bars):
+                break
+            entry = any_bars[k]
+            # Buy takes priority when both fire on a flat bar
+            side = 1 if buy[entry] else -1
+            exit_bars = sell_bars if side == 1 else buy_bars
+            j = np.searchsorted(exit_bars, entry + 1)
+            exit_ = exit_bars[j] if j < len(exit_bars) else -1
+            exit_price = close[exit_] if exit_ >= 0 else np.nan
+            reason = 'signal' if exit_ >= 0 else ''
 
+            if stops is not None:
+                hit = stops.first_exit(entry, side, close[entry], exit_)
+                if hit is not None:
+                    exit_, exit_price, reason = hit
+
+            entries.append(entry)
+            sides.append(side)
+            exits.append(exit_)
+            exit_prices.append(exit_price)
+            reasons.append(EXIT_REASONS.index(reason))
+            if exit_ < 0:
+                break
+            start = exit_ + 1
+            if monitor is not None:
+                remaining = len(any_bars) - np.searchsorted(any_bars, start)
+                if monitor((exit_price - close[entry]) * side, remaining):
+                    return None
+
+        return (
+            np.asarray(entries, dtype=np.int64),
+            np.asarray(exits, dtype=np.int64),
+            np.asarray(sides, dtype=np.int64),
+            np.asarray(exit_prices, dtype=np.float64),
+            np.asarray(reasons, dtype=np.int8)
+        )
+
+    def _run_reference(self):
         trades = []
         position = None # None, 'long', 'short'
-        
+
         for i in range(1, len(self.data)):
             row = self.data.iloc[i]
             prev_row = self.data.iloc[i-1]
-            
+
             # Combine Signals
             buy_conditions = []
             sell_conditions = []
-            
+
             if 'rsi' in self.rules:
                 buy_conditions.append(row['rsi'] < self.rules['rsi'].get('buy', 30))
                 sell_conditions.append(row['rsi'] > self.rules['rsi'].get('sell', 70))
-                
+
             if 'ma' in self.rules:
                 buy_conditions.append(row['close'] > row['ma'])
                 sell_conditions.append(row['close'] < row['ma'])
-                
+
             if 'macd' in self.rules and 'macd' in row and 'macd_signal' in row:
                 buy_conditions.append(row['macd'] > row['macd_signal'] and prev_row['macd'] <= prev_row['macd_signal'])
                 sell_conditions.append(row['macd'] < row['macd_signal'] and prev_row['macd'] >= prev_row['macd_signal'])
 
             buy_signal = all(buy_conditions) if buy_conditions else False
             sell_signal = all(sell_conditions) if sell_conditions else False
-            
+
             # Entry / Exit
             if position is None:
                 if buy_signal:
@@ -57,15 +228,15 @@ class Backtester:
                 elif sell_signal:
                     position = 'short'
                     trades.append({'entry_time': row.name, 'entry_price': row['close'], 'type': 'sell'})
-            
+
             elif position == 'long':
                 # Exit if sell signal OR if stop loss/take profit hit (simplified here)
-                if sell_signal: 
+                if sell_signal:
                     self._close_trade(trades, row, 'long')
                     position = None
-            
+
             elif position == 'short':
-                if buy_signal: 
+                if buy_signal:
                     self._close_trade(trades, row, 'short')
                     position = None
 
@@ -80,20 +251,354 @@ class Backtester:
         else:
             trades[-1]['profit'] = trades[-1]['entry_price'] - trades[-1]['exit_price']
 
-    def compute_metrics(self, trades):
-        if not trades:
+    def _warmup_bars(self):
+        """Bars of history the rules need before a new bar can be evaluated exactly."""
+        return compile_rules(self.rules).warmup
+
+    def checkpoint(self, trades, totals=None, ema=None):
+        """
+        JSON-serializable end state of a finished run: the open position, the tail of bars the
+        rolling indicators need, the EMA state behind MACD and cumulative trade totals.
+        Backtester.resume() continues from it over appended bars only.
+        totals / ema: running totals and MACD EMA state to continue from (used by resume()).
+        """
+        data = self.data
+        tail = data.iloc[-self._warmup_bars():]
+        trades = TradeLedger.coerce(trades)
+        ledger = trades.array
+        profit = trades.profits()
+        totals = dict(totals or {'closed': 0, 'wins': 0, 'total_profit': 0.0, 'total_trades': 0})
+        totals['closed'] += len(profit)
+        totals['wins'] += int((profit > 0).sum())
+        totals['total_profit'] += float(profit.sum())
+        totals['total_trades'] += len(ledger)
+        # Account-currency P&L and sizing equity of a sized run, for resume(money=...)
+        totals['pnl'] = totals.get('pnl', 0.0) + float(trades.closed()['pnl'].sum())
+        if self.money is not None:
+            totals['equity'] = self.money.next_equity(trades)
+        # A trade carried over from the previous checkpoint was already counted there
+        if len(ledger) and ledger['carried'][0]:
+            totals['total_trades'] -= 1
+
+        position = None
+        if len(ledger) and not ledger['closed'][-1]:
+            open_trade = trades[-1]
+            position = {
+                'type': open_trade['type'],
+                'entry_time': _json_value(open_trade['entry_time']),
+                'entry_price': float(open_trade['entry_price']),
+                'entry_cost': float(ledger['cost'][-1]),
+            }
+
+        if ema is None and 'macd' in self.rules:
+            close = data['close']
+            macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+            ema = {
+                'fast': float(close.ewm(span=12, adjust=False).mean().iloc[-1]),
+                'slow': float(close.ewm(span=26, adjust=False).mean().iloc[-1]),
+                'signal': float(macd.ewm(span=9, adjust=False).mean().iloc[-1]),
+            }
+
+        return {
+            'rules': self.rules,
+            'last_time': str(data['time'].iloc[-1]) if 'time' in data.columns and len(data) else None,
+            'tail': {
+                col: [_json_value(v) for v in tail[col]]
+                for col in ('time', 'open', 'high', 'low', 'close') if col in tail.columns
+            },
+            'ema': ema,
+            'position': position,
+            'totals': totals,
+        }
+
+    @classmethod
+    def resume(cls, checkpoint, new_data, stops_factory=None, costs=None, money=None):
+        """
+        Continues a checkpointed run over `new_data` (bars after checkpoint['last_time']).
+        Returns (trades, metrics, new_checkpoint); trades only covers the new bars, starting with
+        the carried-over position (flagged 'carried') if there was one. metrics cover the whole history.
+        stops_factory: optional callable(frame) -> IntrabarExitEngine for the tail + new bars.
+        costs: optional TransactionCostModel, as for a full run.
+        money: optional MoneyManager, as for a full run but with initial_equity set to the
+        checkpoint's checkpoint['totals']['equity'].
+        """
+        rules = checkpoint['rules']
+        tail = pd.DataFrame(checkpoint['tail'])
+        if 'time' in tail.columns:
+            tail['time'] = pd.to_datetime(tail['time'])
+        k = len(tail)
+        frame = pd.concat([tail, new_data[list(tail.columns)]], ignore_index=True)
+        close = frame['close'].to_numpy(dtype=np.float64)
+
+        columns = {name: frame[name].to_numpy(dtype=np.float64) for name in ('close', 'high', 'low') if name in frame.columns}
+        ema = None
+        graph = IndicatorGraph(frame)
+        for family in compile_rules(rules).families:
+            if family == 'macd':
+                macd_columns, ema = cls._resume_macd(frame['close'], checkpoint['ema'], k)
+                columns.update(macd_columns)
+            else:
+                columns.update({n: np.asarray(v) for n, v in cls.indicator_columns(frame, family, rules[family], graph).items()})
+
+        buy, sell = cls._signal_arrays(columns, rules)
+        # Tail bars were already evaluated by the previous run
+        buy[:k] = False
+        sell[:k] = False
+        stops = stops_factory(frame) if stops_factory else None
+        # Bars of the resumed run are numbered from the first new bar; tail bars never trade
+        new_times, datetime_index = index_times(new_data.index)
+        times = np.concatenate([np.zeros(k, dtype=np.int64), new_times])
+
+        carried = None
+        position = checkpoint.get('position')
+        if position:
+            side = 1 if position['type'] == 'buy' else -1
+            exit_bars = np.flatnonzero(sell if side == 1 else buy)
+            exit_ = exit_bars[0] if len(exit_bars) else -1
+            exit_price = close[exit_] if exit_ >= 0 else np.nan
+            reason = 'signal' if exit_ >= 0 else ''
+            if stops is not None:
+                hit = stops.first_exit(k - 1, side, position['entry_price'], exit_)
+                if hit is not None:
+                    exit_, exit_price, reason = hit
+            entry_time = position['entry_time']
+            carried = TradeLedger(1, datetime_index, has_reasons=stops is not None)
+            carried.append(
+                -1, exit_,
+                pd.Timestamp(entry_time).value if isinstance(entry_time, str) else int(entry_time),
+                times[exit_] if exit_ >= 0 else 0,
+                position['entry_price'], exit_price, side,
+                (exit_price - position['entry_price']) * side if exit_ >= 0 else 0.0,
+                exit_ >= 0, reason, carried=True
+            )
+            if exit_ >= 0:
+                # Nothing can open until the carried position is flat again
+                buy[:exit_ + 1] = False
+                sell[:exit_ + 1] = False
+            else:
+                buy[:] = False
+                sell[:] = False
+
+        built = cls._build_trades(buy, sell, close, stops=stops, times=(times, datetime_index))
+        if costs is not None:
+            bar_times = cls._bar_times(frame)
+            if carried is not None:
+                cls._charge_costs(costs, carried, bar_times, entry_cost=position.get('entry_cost', 0.0))
+            cls._charge_costs(costs, built, bar_times)
+        trades = TradeLedger.concat([carried, built])
+        if money is not None:
+            money.apply(trades)
+        ledger = trades.array
+        ledger['entry_bar'][~ledger['carried']] -= k
+        ledger['exit_bar'][ledger['closed']] -= k
+
+        bt = cls(frame, rules, money=money)
+        new_checkpoint = bt.checkpoint(trades, totals=checkpoint['totals'], ema=ema)
+        return trades, cls.metrics_from_totals(new_checkpoint['totals']), new_checkpoint
+
+    @classmethod
+    def run_chunks(cls, chunks, rules, stops_factory=None, costs=None):
+        """
+        Out-of-core mode: backtests an iterator of consecutive OHLC frames (e.g. read_chunks())
+        by checkpointing after each chunk and resuming over the next, so only one chunk plus the
+        indicator warm-up tail is in memory at a time. Trades match a single in-memory run.
+        Returns (trades, metrics).
+        """
+        run = IncrementalBacktest(rules, stops_factory=stops_factory, costs=costs, backtester=cls)
+        for chunk in chunks:
+            run.feed(chunk)
+        return run.result()
+
+    @staticmethod
+    def read_chunks(path, chunk_size=500_000):
+        """Streams a time/OHLC CSV (as written by the data services) in fixed-size chunks."""
+        for chunk in pd.read_csv(path, chunksize=chunk_size, usecols=['time', 'open', 'high', 'low', 'close']):
+            chunk['time'] = pd.to_datetime(chunk['time'])
+            yield chunk
+
+    @staticmethod
+    def _resume_macd(close, ema, k):
+        """
+        MACD over tail + new bars, continuing the EMAs from the checkpointed state at bar k-1.
+        Returns (columns, ema_state_at_last_bar).
+        """
+        def seeded(values, span, seed):
+            series = pd.concat([pd.Series([seed]), pd.Series(values)], ignore_index=True)
+            return series.ewm(span=span, adjust=False).mean().iloc[1:].to_numpy()
+
+        new_close = close.iloc[k:].to_numpy()
+        if len(new_close) == 0:
+            fast, slow, signal = np.array([]), np.array([]), np.array([])
+        else:
+            fast = seeded(new_close, 12, ema['fast'])
+            slow = seeded(new_close, 26, ema['slow'])
+            signal = seeded(fast - slow, 9, ema['signal'])
+        macd = fast - slow
+        state = {
+            'fast': float(fast[-1]) if len(fast) else ema['fast'],
+            'slow': float(slow[-1]) if len(slow) else ema['slow'],
+            'signal': float(signal[-1]) if len(signal) else ema['signal'],
+        }
+
+        pad = np.full(k, np.nan)
+        pad[-1] = ema['fast'] - ema['slow']
+        signal_pad = np.full(k, np.nan)
+        signal_pad[-1] = ema['signal']
+        columns = {'macd': np.concatenate([pad, macd]), 'macd_signal': np.concatenate([signal_pad, signal])}
+        return columns, state
+
+    @staticmethod
+    def metrics_from_totals(totals):
+        """compute_metrics() equivalent for the running totals kept in a checkpoint."""
+        if not totals['total_trades']:
             return {"win_rate": 0, "total_profit": 0}
-            
-        closed_trades = [t for t in trades if 'profit' in t]
-        if not closed_trades:
+        if not totals['closed']:
+            return {"win_rate": 0, "total_profit": 0, "total_trades": totals['total_trades']}
+        metrics = {
+            "win_rate": round(totals['wins'] / totals['closed'] * 100, 2),
+            "total_profit": round(totals['total_profit'], 5),
+            "total_trades": totals['total_trades']
+        }
+        if totals.get('pnl'):
+            metrics["net_pnl"] = round(totals['pnl'], 2)
+        return metrics
+
+    @staticmethod
+    def compute_metrics(trades, datetime_index=False):
+        """
+        Single vectorized pass over the trade array: win rate and profit as before, plus the
+        closed-trade equity curve stats (max drawdown and its duration, Sharpe/Sortino per trade,
+        profit factor, expectancy, exposure and trade durations).
+        trades: TradeLedger, a TRADE_DTYPE array or a legacy trades list.
+        Durations are in hours for timestamp indexes and in bars for positional ones
+        (datetime_index tells which applies when a trade array is passed in directly).
+        """
+        is_datetime = datetime_index
+        if not isinstance(trades, np.ndarray):
+            ledger = TradeLedger.coerce(trades)
+            is_datetime = ledger.datetime_index
+            trades = ledger.array
+
+        if len(trades) == 0:
+            return {"win_rate": 0, "total_profit": 0}
+
+        closed = trades[trades['closed']]
+        if len(closed) == 0:
              return {"win_rate": 0, "total_profit": 0, "total_trades": len(trades)}
 
-        wins = [t for t in closed_trades if t['profit'] > 0]
-        win_rate = len(wins) / len(closed_trades)
-        total_profit = sum([t['profit'] for t in closed_trades])
-        
-        return {
-            "win_rate": round(win_rate * 100, 2),
-            "total_profit": round(total_profit, 5),
-            "total_trades": len(trades)
+        profit = closed['profit']
+        wins = profit > 0
+        total_profit = profit.sum()
+
+        equity = np.cumsum(profit)
+        peaks = np.maximum(np.maximum.accumulate(equity), 0)
+        drawdown = peaks - equity
+
+        # Time since the last equity peak (the start counts as a peak at zero)
+        unit = 3600 * 1e9 if is_datetime else 1
+        exit_time = closed['exit_time'].astype(np.float64)
+        entry_time = closed['entry_time'].astype(np.float64)
+        at_peak = drawdown == 0
+        peak_idx = np.maximum.accumulate(np.where(at_peak, np.arange(len(closed)), -1))
+        peak_time = np.where(peak_idx >= 0, exit_time[np.maximum(peak_idx, 0)], entry_time[0])
+        dd_duration = (exit_time - peak_time).max() / unit
+
+        gross_profit = profit[wins].sum()
+        gross_loss = -profit[profit < 0].sum()
+        std = profit.std(ddof=1) if len(profit) > 1 else 0.0
+        downside = np.sqrt(np.mean(np.minimum(profit, 0) ** 2))
+        durations = (exit_time - entry_time) / unit
+        span = (exit_time.max() - entry_time.min()) / unit
+        # Share of the traded span spent in a position; above 100% when trades overlap (portfolios)
+        exposure = durations.sum() / span if span > 0 else 0.0
+
+        metrics = {
+            "win_rate": round(float(wins.mean()) * 100, 2),
+            "total_profit": round(float(total_profit), 5),
+            "total_trades": len(trades),
+            "max_drawdown": round(float(drawdown.max()), 5),
+            "max_drawdown_duration": round(float(dd_duration), 2),
+            "sharpe": round(float(profit.mean() / std), 4) if std > 0 else 0.0,
+            "sortino": round(float(profit.mean() / downside), 4) if downside > 0 else 0.0,
+            "profit_factor": round(float(gross_profit / gross_loss), 4) if gross_loss > 0 else None,
+            "expectancy": round(float(profit.mean()), 6),
+            "avg_win": round(float(profit[wins].mean()), 6) if wins.any() else 0.0,
+            "avg_loss": round(float(profit[~wins].mean()), 6) if (~wins).any() else 0.0,
+            "exposure": round(float(exposure) * 100, 2),
+            "avg_trade_duration": round(float(durations.mean()), 2),
+            "max_trade_duration": round(float(durations.max()), 2),
+            "duration_unit": "hours" if is_datetime else "bars",
         }
+        if closed['lots'].any():
+            # Account-currency P&L of a sized run (see MoneyManager)
+            money = np.cumsum(closed['pnl'])
+            metrics["net_pnl"] = round(float(money[-1]), 2)
+            metrics["max_drawdown_money"] = round(float((np.maximum(np.maximum.accumulate(money), 0) - money).max()), 2)
+        return metrics
+
+def _json_value(value):
+    """Converts NumPy / pandas scalars into JSON-friendly Python values."""
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(pd.Timestamp(value))
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class IncrementalBacktest:
+    """
+    Backtester.run_chunks one frame at a time: feed() consecutive OHLC frames (bars after the
+    previous one) and read the trades so far at any point. State between frames is the
+    Backtester checkpoint, so a run can be paused between feeds for as long as needed.
+    """
+
+    def __init__(self, rules, stops_factory=None, costs=None, backtester=Backtester):
+        self.rules = rules
+        self.stops_factory = stops_factory
+        self.costs = costs
+        self.backtester = backtester
+        self.parts = []
+        self.checkpoint = None
+        self.bars = 0
+
+    def feed(self, chunk):
+        if chunk.empty:
+            return
+        cls = self.backtester
+        stops_factory, costs = self.stops_factory, self.costs
+        if self.checkpoint is None:
+            chunk = chunk.copy()
+            bt = cls(chunk, self.rules, stops=stops_factory(chunk) if stops_factory else None, costs=costs)
+            new_trades = bt.run()
+            self.checkpoint = bt.checkpoint(new_trades)
+        else:
+            new_trades, _, self.checkpoint = cls.resume(self.checkpoint, chunk, stops_factory=stops_factory, costs=costs)
+            ledger = new_trades.array
+            # Bar positions become global across chunks
+            ledger['entry_bar'][~ledger['carried']] += self.bars
+            ledger['exit_bar'][ledger['closed']] += self.bars
+            if len(ledger) and ledger['carried'][0]:
+                # The carried position replaces its still-open copy from the previous chunk
+                opened = self.parts[-1].array[-1:].copy()
+                self.parts[-1] = self.parts[-1][:-1]
+                if ledger['closed'][0]:
+                    closing = ledger[:1].copy()
+                    for field in ('entry_bar', 'entry_time', 'entry_price'):
+                        closing[field] = opened[field]
+                    closing['carried'] = False
+                else:
+                    closing = opened
+                new_trades = TradeLedger.concat([
+                    TradeLedger.from_array(closing, new_trades.datetime_index, new_trades.has_reasons),
+                    new_trades[1:]
+                ])
+        self.parts.append(new_trades)
+        self.bars += len(chunk)
+
+    def trades(self):
+        return TradeLedger.concat(self.parts)
+
+    def result(self):
+        """(trades, metrics) over every bar fed so far."""
+        trades = self.trades()
+        return trades, self.backtester.compute_metrics(trades)
@@ -0,0 +1,169 @@
+"""
+Columnar Compute Mode
+OHLC and indicator columns held as contiguous NumPy arrays of one compute dtype (float32 to halve
+memory and bandwidth in large sweeps), plus the tolerance check that tells whether a float32 run
+can stand in for the float64 one.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .backtester import Backtester
+from .rule_compiler import compile_rules
+
+COMPUTE_DTYPES = {'float64': np.float64, 'float32': np.float32}
+
+# Documented float32 tolerances, checked by tolerance_report():
+#   indicator: max |float32 - float64| of each indicator column, relative to the float64
+#              column's range (float32 keeps ~7 significant digits of the prices; diffs-based
+#              indicators such as RSI and MACD lose the most)
+#   signals:   share of bars whose buy or sell flag differs
+#   trades:    share of float64 trades without a float32 trade on the same entry bar and side
+#   profit:    |total_profit difference| relative to the float64 sum of |profit|
+FLOAT32_TOLERANCE = {'indicator': 1e-3, 'signals': 1e-3, 'trades': 1e-2, 'profit': 1e-3}
+
+
+def compute_dtype(name):
+    if name in (None, ''):
+        return np.dtype(np.float64)
+    if isinstance(name, str):
+        if name not in COMPUTE_DTYPES:
+            raise ValueError(f"Unknown compute dtype '{name}', expected one of {tuple(COMPUTE_DTYPES)}")
+        return np.dtype(COMPUTE_DTYPES[name])
+    return np.dtype(name)
+
+
+class ColumnarFrame:
+    """
+    The subset of the DataFrame interface IndicatorEngine, IndicatorGraph, Backtester and
+    ParameterSweep read (frame[name], columns, index, len, iloc), over contiguous NumPy columns.
+    Numeric columns are stored in `dtype`; time columns keep their own. frame[name] wraps the
+    stored array in a Series without copying, and assigned columns are converted to `dtype`, so
+    indicator columns a Backtester adds stay compact too. Indicator maths itself runs through
+    pandas, which accumulates rolling windows and EWMs in float64 whatever the input dtype.
+    """
+
+    def __init__(self, columns, index=None, dtype=np.float32):
+        self.dtype = compute_dtype(dtype)
+        self._columns = {}
+        length = len(next(iter(columns.values()))) if columns else 0
+        self.index = index if index is not None else pd.RangeIndex(length)
+        for name, values in columns.items():
+            self[name] = values
+
+    @classmethod
+    def from_frame(cls, data, dtype=np.float32):
+        return cls({name: data[name].to_numpy() for name in data.columns}, index=data.index, dtype=dtype)
+
+    def __setitem__(self, name, values):
+        values = np.asarray(values)
+        if values.dtype.kind in 'iuf':
+            values = values.astype(self.dtype, copy=False)
+        if len(values) != len(self.index):
+            raise ValueError(f"Column '{name}' has {len(values)} values for {len(self.index)} bars")
+        self._columns[name] = np.ascontiguousarray(values)
+
+    def __getitem__(self, name):
+        return pd.Series(self._columns[name], index=self.index, name=name, copy=False)
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def columns(self):
+        return pd.Index(list(self._columns))
+
+    @property
+    def empty(self):
+        return len(self.index) == 0
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self._columns.values())
+
+    @property
+    def iloc(self):
+        """Positional access as on a DataFrame: a row Series for an int, a ColumnarFrame otherwise."""
+        return _ILoc(self)
+
+    def to_numpy(self, name):
+        return self._columns[name]
+
+    def to_frame(self):
+        return pd.DataFrame(dict(self._columns), index=self.index)
+
+
+class _ILoc:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def __getitem__(self, key):
+        frame = self.frame
+        if isinstance(key, (int, np.integer)):
+            return pd.Series({name: values[key] for name, values in frame._columns.items()}, name=frame.index[key])
+        # Slices keep views of the stored columns, like DataFrame.iloc
+        return ColumnarFrame(
+            {name: values[key] for name, values in frame._columns.items()}, index=frame.index[key], dtype=frame.dtype
+        )
+
+
+def _scaled_error(a, b):
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    both = np.isfinite(a) & np.isfinite(b)
+    if not both.any():
+        return 0.0
+    scale = np.ptp(b[both]) or np.abs(b[both]).max() or 1.0
+    return float(np.abs(a[both] - b[both]).max() / scale)
+
+
+def tolerance_report(data, rules, dtype=np.float32, tolerance=None):
+    """
+    Backtests `rules` on `data` (a DataFrame) in float64 and in `dtype` and compares indicator
+    columns, signals, trades and profit against FLOAT32_TOLERANCE. JSON-ready; 'ok' tells
+    whether every measure is within tolerance.
+    """
+    tolerance = {**FLOAT32_TOLERANCE, **(tolerance or {})}
+    compiled = compile_rules(rules)
+    reduced = ColumnarFrame.from_frame(data[[c for c in data.columns if c in ('time', 'open', 'high', 'low', 'close')]], dtype)
+
+    columns64 = compiled.indicator_columns(data)
+    columns32 = compiled.indicator_columns(reduced)
+    indicator = {
+        name: _scaled_error(np.asarray(columns32[name], dtype=dtype), columns64[name])
+        for name in columns64
+    }
+
+    def run(frame, indicator_columns):
+        columns = {name: frame[name].to_numpy() for name in ('close', 'high', 'low') if name in frame.columns}
+        columns.update({name: np.asarray(values, dtype=columns['close'].dtype) for name, values in indicator_columns.items()})
+        buy, sell = compiled.signals(columns)
+        return buy, sell, Backtester.run_arrays(columns, rules).array
+
+    buy64, sell64, trades64 = run(data, columns64)
+    buy32, sell32, trades32 = run(reduced, columns32)
+    n = max(len(buy64), 1)
+    signals = float(np.count_nonzero((buy64 != buy32) | (sell64 != sell32)) / n)
+
+    key64 = set(zip(trades64['entry_bar'].tolist(), trades64['side'].tolist()))
+    key32 = set(zip(trades32['entry_bar'].tolist(), trades32['side'].tolist()))
+    trades = float(len(key64 - key32) / len(key64)) if key64 else float(bool(key32))
+
+    metrics64 = Backtester.compute_metrics(trades64)
+    metrics32 = Backtester.compute_metrics(trades32)
+    gross = float(np.abs(trades64['profit']).sum()) or 1.0
+    profit = abs(float(metrics32['total_profit']) - float(metrics64['total_profit'])) / gross
+
+    measured = {'indicator': max(indicator.values(), default=0.0), 'signals': signals, 'trades': trades, 'profit': profit}
+    return {
+        'dtype': np.dtype(dtype).name,
+        'indicator_errors': {name: float(f"{error:.3g}") for name, error in indicator.items()},
+        'measured': {name: float(f"{value:.3g}") for name, value in measured.items()},
+        'tolerance': tolerance,
+        'trades': {'float64': len(trades64), np.dtype(dtype).name: len(trades32)},
+        'win_rate': {'float64': metrics64['win_rate'], np.dtype(dtype).name: metrics32['win_rate']},
+        'ok': all(measured[name] <= tolerance[name] for name in measured),
+    }
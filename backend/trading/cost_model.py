@@ -0,0 +1,200 @@
+"""
+Empirical Transaction Cost Model
+Per-symbol, per-session spread and slippage distributions built from recorded executions
+(TradeLog), stored as small precomputed tables and charged to backtest fills in one pass.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from .intrabar import IntrabarExitEngine
+
+# UTC start hour of each trading session
+SESSIONS = (('asia', 0), ('london', 7), ('overlap', 12), ('new_york', 16), ('late', 21))
+SESSION_STARTS = np.array([hour for _, hour in SESSIONS])
+QUANTILES = np.linspace(0, 1, 21)
+
+
+class TransactionCostModel:
+    """
+    spread / slippage: (sessions x QUANTILES) tables in pips, spread_mean / slippage_mean the
+    per-session means, samples the number of executions behind each session row. Sessions with
+    fewer than MIN_SAMPLES executions use the symbol's pooled distribution instead.
+
+    Each fill pays half the spread plus the slippage (positive slippage is adverse), so a closed
+    trade is charged twice. quantile=None charges the session mean; e.g. quantile=0.9 charges the
+    90th percentile for a pessimistic estimate.
+    """
+
+    MIN_SAMPLES = 20
+
+    def __init__(self, symbol, spread, slippage, spread_mean, slippage_mean, samples,
+                 pip=None, quantile=None, source=(0, 0)):
+        self.symbol = symbol
+        self.spread = np.asarray(spread, dtype=np.float64)
+        self.slippage = np.asarray(slippage, dtype=np.float64)
+        self.spread_mean = np.asarray(spread_mean, dtype=np.float64)
+        self.slippage_mean = np.asarray(slippage_mean, dtype=np.float64)
+        self.samples = np.asarray(samples, dtype=np.int64)
+        self.pip = pip or IntrabarExitEngine.default_point(symbol) * 10
+        self.quantile = quantile
+        self.source = tuple(source)
+
+    @staticmethod
+    def session_of(times):
+        """Session row for each datetime64[ns]-compatible int64 time."""
+        hours = (np.asarray(times, dtype=np.int64) // 3_600_000_000_000) % 24
+        return np.searchsorted(SESSION_STARTS, hours, side='right') - 1
+
+    @classmethod
+    def from_executions(cls, symbol, times, spread, slippage, **kwargs):
+        """
+        Builds the tables from raw execution samples (times as datetime64[ns]-compatible values,
+        spread / slippage in pips; NaN marks a missing measurement).
+        """
+        times = np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+        spread = np.asarray(spread, dtype=np.float64)
+        slippage = np.asarray(slippage, dtype=np.float64)
+        sessions = cls.session_of(times)
+
+        def table(values):
+            rows = np.zeros((len(SESSIONS), len(QUANTILES)))
+            means = np.zeros(len(SESSIONS))
+            valid = ~np.isnan(values)
+            if not valid.any():
+                return rows, means, np.zeros(len(SESSIONS), dtype=np.int64)
+            pooled_rows = np.quantile(values[valid], QUANTILES)
+            pooled_mean = values[valid].mean()
+            counts = np.bincount(sessions[valid], minlength=len(SESSIONS))
+            for s in range(len(SESSIONS)):
+                picked = values[valid & (sessions == s)]
+                if len(picked) >= cls.MIN_SAMPLES:
+                    rows[s], means[s] = np.quantile(picked, QUANTILES), picked.mean()
+                else:
+                    rows[s], means[s] = pooled_rows, pooled_mean
+            return rows, means, counts
+
+        spread_rows, spread_mean, spread_counts = table(spread)
+        slippage_rows, slippage_mean, slippage_counts = table(slippage)
+        return cls(
+            symbol, spread_rows, slippage_rows, spread_mean, slippage_mean,
+            np.maximum(spread_counts, slippage_counts), **kwargs
+        )
+
+    @staticmethod
+    def execution_costs(symbol, side, bid, ask, requested, filled, pip=None):
+        """
+        (spread, slippage) in pips of one market execution, as TradeLog records them: the spread
+        is ask - bid of the quote the order was sent against, the slippage the fill's distance
+        from the requested price, positive when adverse (a long filled higher, a short lower).
+        A pip is 10 points, as for the model's tables; MT5's own symbol spread is in points.
+        """
+        pip = pip or IntrabarExitEngine.default_point(symbol) * 10
+        spread = (float(ask) - float(bid)) / pip
+        slippage = (float(filled) - float(requested)) / pip
+        return round(spread, 3), round(slippage if side > 0 else -slippage, 3)
+
+    @classmethod
+    def for_symbol(cls, symbol, quantile=None, cache_dir=None):
+        """
+        Model for a symbol from its TradeLog history, or None when nothing was recorded yet.
+        Tables are cached on disk and only rebuilt when new executions have been logged; the
+        executions' spread and slippage come from execution_costs() at order time.
+        """
+        from django.db.models import Count, Max
+        from api.models import TradeLog
+
+        logs = TradeLog.objects.filter(symbol=symbol).exclude(spread__isnull=True, slippage__isnull=True)
+        stats = logs.aggregate(count=Count('id'), last=Max('id'))
+        if not stats['count']:
+            return None
+        source = (stats['count'], stats['last'])
+
+        path = Path(cache_dir or cls.default_dir()) / f"{symbol.upper()}.npz"
+        cached = cls.load(path, quantile=quantile)
+        if cached is not None and cached.source == source:
+            return cached
+
+        rows = list(logs.values_list('triggered_at', 'timestamp', 'spread', 'slippage'))
+        model = cls.from_executions(
+            symbol,
+            [(triggered or created).replace(tzinfo=None) for triggered, created, _, _ in rows],
+            [np.nan if r[2] is None else r[2] for r in rows],
+            [np.nan if r[3] is None else r[3] for r in rows],
+            quantile=quantile, source=source
+        )
+        model.save(path)
+        return model
+
+    @staticmethod
+    def default_dir():
+        try:
+            from django.conf import settings
+            base_dir = Path(settings.BASE_DIR)
+        except Exception:
+            base_dir = Path(__file__).resolve().parent.parent
+        return base_dir / "trading_data" / "cost_tables"
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(
+                f, spread=self.spread, slippage=self.slippage, spread_mean=self.spread_mean,
+                slippage_mean=self.slippage_mean, samples=self.samples,
+                pip=np.float64(self.pip), source=np.array(self.source, dtype=np.int64)
+            )
+
+    @classmethod
+    def load(cls, path, quantile=None):
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as t:
+                return cls(
+                    path.stem, t['spread'], t['slippage'], t['spread_mean'], t['slippage_mean'],
+                    t['samples'], pip=float(t['pip']), quantile=quantile, source=t['source'].tolist()
+                )
+        except Exception as e:
+            print(f"DEBUG: Ignoring unreadable cost table {path.name}: {e}")
+            return None
+
+    def fill_costs(self):
+        """Cost of one fill in price units for each session row."""
+        if self.quantile is None:
+            spread, slippage = self.spread_mean, self.slippage_mean
+        else:
+            spread = np.array([np.interp(self.quantile, QUANTILES, row) for row in self.spread])
+            slippage = np.array([np.interp(self.quantile, QUANTILES, row) for row in self.slippage])
+        return (spread / 2 + slippage) * self.pip
+
+    def fill_cost_at(self, times):
+        """Per-fill cost for an int64 ns time array; None charges the pooled (all-session) mean."""
+        table = self.fill_costs()
+        if times is None:
+            weights = np.maximum(self.samples, 1)
+            return np.average(table, weights=weights)
+        return table[self.session_of(times)]
+
+    def apply(self, ledger, entry_times=None, exit_times=None, entry_cost=None):
+        """
+        Charges the fills of a TradeLedger in place: 'cost' gets the entry (plus exit, once closed)
+        cost and closed profits are reduced by it. Times are int64 ns per trade (None when the bars
+        carry no timestamps). entry_cost overrides the entry charge, e.g. for a carried position.
+        """
+        arr = ledger.array
+        if not len(arr):
+            return ledger
+        entry = self.fill_cost_at(entry_times) if entry_cost is None else entry_cost
+        exit_ = np.where(arr['closed'], self.fill_cost_at(exit_times), 0.0)
+        arr['cost'] = entry + exit_
+        arr['profit'] -= np.where(arr['closed'], arr['cost'], 0.0)
+        return ledger
+
+    def fingerprint(self):
+        return (
+            f"{self.symbol}:{self.quantile!r}:{self.pip!r}:"
+            + ",".join(repr(float(c)) for c in self.fill_costs())
+        )
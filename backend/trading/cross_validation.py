@@ -0,0 +1,146 @@
+"""
+Purged K-Fold Cross-Validation
+Scores a strategy on k contiguous test folds of the history. When a parameter grid is given, each
+fold's parameters are picked on the other folds after purging the trades that overlap the fold and
+embargoing the bars right after it, so the reported fold metrics never saw their own prices.
+"""
+
+import os
+
+import numpy as np
+
+from .backtester import Backtester
+from .parameter_sweep import ParameterSweep, shared_matrix, shared_matrix_pool
+from .rule_compiler import compile_rules
+from .walk_forward import _plain
+
+# Metrics summarized across folds
+DISPERSION_METRICS = ('win_rate', 'total_profit', 'profit_factor', 'sharpe', 'expectancy', 'max_drawdown')
+
+
+def _score_folds(task, matrix=None):
+    """
+    task: (jobs, folds, embargo). Resolves each job once over the whole series and splits its
+    trades per fold. Returns, per job, a list of (train_metrics, test_metrics) per fold.
+    """
+    jobs, folds, embargo = task
+    matrix = shared_matrix(matrix)
+    results = []
+    for rules, column_rows in jobs:
+        columns = {name: matrix[row] for name, row in column_rows.items()}
+        trades = Backtester.run_arrays(columns, rules).array
+        entry, exit_, closed = trades['entry_bar'], trades['exit_bar'], trades['closed']
+        scores = []
+        for start, end in folds:
+            test = (entry >= start) & (entry < end)
+            # Purge trades still open when the fold starts; embargo entries whose indicators read the fold
+            train = closed & ~test & ((exit_ < start) | (entry >= end + embargo))
+            scores.append((Backtester.compute_metrics(trades[train]), Backtester.compute_metrics(trades[test])))
+        results.append(scores)
+    return results
+
+
+class PurgedKFoldRunner:
+    """
+    Purged, embargoed k-fold cross-validation around the vectorized Backtester.
+
+    param_grid uses the ParameterSweep format; a grid with a single combination (e.g. a robot's
+    rules) just scores those rules on every fold. Indicator columns are computed once over the
+    full series into the shared matrix and every combination's positions are resolved once, so
+    folds only mask the resulting trades:
+      - test trades are the ones entered inside the fold,
+      - training trades exclude them, trades still open when the fold starts (purge) and trades
+        entered within `embargo` bars after it (default: the rules' indicator warm-up).
+    """
+
+    def __init__(self, data, param_grid, folds=5, embargo=None, metric='win_rate', workers=None,
+                 min_trades=1):
+        self.data = data
+        self.sweep = ParameterSweep(data, param_grid, metric=metric, workers=1, min_trades=min_trades)
+        self.folds = folds
+        self.embargo = embargo
+        self.metric = metric
+        self.workers = workers or os.cpu_count() or 1
+        self.min_trades = min_trades
+
+    def split_folds(self):
+        n = len(self.data)
+        size = n // self.folds
+        if self.folds < 2 or size < 2:
+            raise ValueError(f"Not enough bars ({n}) for {self.folds} cross-validation folds")
+        bounds = [k * size for k in range(self.folds)] + [n]
+        return [(bounds[k], bounds[k + 1]) for k in range(self.folds)]
+
+    def run(self):
+        combinations = self.sweep.combinations()
+        if not combinations:
+            raise ValueError("Empty parameter grid")
+        matrix, rows = self.sweep.build_matrix(combinations)
+        jobs = self.sweep.jobs(combinations, rows)
+        folds = self.split_folds()
+        embargo = self.embargo
+        if embargo is None:
+            embargo = max(compile_rules(rules).warmup for rules in combinations)
+
+        if self.workers <= 1 or len(jobs) < 2:
+            scores = _score_folds((jobs, folds, embargo), matrix)
+        else:
+            workers = min(self.workers, len(jobs))
+            chunk_size = -(-len(jobs) // workers)
+            chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+            scores = []
+            with shared_matrix_pool(matrix, workers) as pool:
+                for chunk_scores in pool.map(_score_folds, [(chunk, folds, embargo) for chunk in chunks]):
+                    scores.extend(chunk_scores)
+
+        return self.summarize(combinations, scores, folds, embargo)
+
+    def _select(self, scores, k):
+        """Job index with the best training metric for fold k (the only job for a single combination)."""
+        if len(scores) == 1:
+            return 0
+        eligible = [i for i, s in enumerate(scores) if s[k][0].get('total_trades', 0) >= self.min_trades]
+        if not eligible:
+            return None
+        return max(eligible, key=lambda i: scores[i][k][0].get(self.metric, 0))
+
+    def _time_at(self, position):
+        if 'time' in self.data.columns:
+            return str(self.data['time'].iloc[min(position, len(self.data) - 1)])
+        return int(position)
+
+    def summarize(self, combinations, scores, folds, embargo):
+        """JSON-ready report: per-fold rules/metrics plus the dispersion of the test metrics."""
+        report_folds = []
+        for k, (start, end) in enumerate(folds):
+            best = self._select(scores, k)
+            train, test = scores[best][k] if best is not None else ({}, {})
+            report_folds.append({
+                'test': [self._time_at(start), self._time_at(end - 1)],
+                'rules': combinations[best] if best is not None else None,
+                'train_metrics': _plain(train),
+                'test_metrics': _plain(test),
+            })
+
+        traded = [f['test_metrics'] for f in report_folds if f['test_metrics'].get('total_trades')]
+        dispersion = {}
+        for name in DISPERSION_METRICS:
+            values = np.array([m[name] for m in traded if m.get(name) is not None], dtype=np.float64)
+            values = values[np.isfinite(values)]
+            if len(values):
+                dispersion[name] = {
+                    'mean': round(float(values.mean()), 6),
+                    'std': round(float(values.std(ddof=1)), 6) if len(values) > 1 else 0.0,
+                    'min': round(float(values.min()), 6),
+                    'max': round(float(values.max()), 6),
+                }
+
+        return {
+            'metric': self.metric,
+            'embargo': int(embargo),
+            'folds': report_folds,
+            'folds_traded': len(traded),
+            'dispersion': dispersion,
+            'win_rate': dispersion.get('win_rate', {}).get('mean', 0),
+        }
+
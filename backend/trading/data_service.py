@@ -81,8 +81,39 @@ class HistoricalDataService:
             print(f"DEBUG: Error saving to forex_data: {e}")
 
     @staticmethod
-    def fetch_yfinance(symbol, timeframe, lookback_months):
-        """Ultra-resilient YFinance fetcher with local storage saving."""
+    def load_m1_history(symbol):
+        """
+        Loads locally stored M1 bars for a symbol, sorted by time.
+        Checks the MT5 history export first, then the yfinance dumps in forex_data/.
+        Returns a DataFrame with time/open/high/low/close or None if nothing is stored.
+        """
+        s = symbol.upper()
+        paths = [Path("backend/data/history") / f"{s}_M1.csv"]
+        paths += [Path("forex_data") / f"{c.replace('=', '_')}.csv" for c in HistoricalDataService.yfinance_candidates(s)]
+
+        for path in paths:
+            if not path.exists():
+                continue
+            try:
+                df = pd.read_csv(path)
+                df.columns = [str(c).lower() for c in df.columns]
+                # yfinance dumps keep the timestamp in the first (index) column and may carry
+                # extra 'Ticker'/'Datetime' header rows, which fail to parse and get dropped below
+                time_col = 'time' if 'time' in df.columns else df.columns[0]
+                df['time'] = pd.to_datetime(df[time_col], utc=True, errors='coerce').dt.tz_localize(None)
+                for col in ['open', 'high', 'low', 'close']:
+                    df[col] = pd.to_numeric(df[col], errors='coerce')
+                df = df.dropna(subset=['time', 'open', 'high', 'low', 'close'])
+                if df.empty:
+                    continue
+                return df[['time', 'open', 'high', 'low', 'close']].sort_values('time').reset_index(drop=True)
+            except Exception as e:
+                print(f"DEBUG: Could not load M1 history from {path}: {e}")
+        return None
+
+    @staticmethod
+    def yfinance_candidates(symbol):
+        """Ticker spellings to try on yfinance for a broker symbol."""
         s = symbol.upper()
         
         # Test both formats: standard and user-suggested
@@ -96,6 +127,12 @@ class HistoricalDataService:
         
         if 'BTC' in s: candidates = ['BTC-USD']
         if 'GOLD' in s or 'XAU' in s: candidates = ['GC=F']
+        return candidates
+
+    @staticmethod
+    def fetch_yfinance(symbol, timeframe, lookback_months):
+        """Ultra-resilient YFinance fetcher with local storage saving."""
+        candidates = HistoricalDataService.yfinance_candidates(symbol)
 
         interval_map = {
             'M1': '1m', 'M2': '2m', 'M5': '5m', 'M15': '15m', 
@@ -195,6 +232,34 @@ class HistoricalDataService:
         raise RuntimeError(f"YFinance failed for all candidates {candidates}. Last error: {last_error}")
 
 
+    @staticmethod
+    def to_columns(df, dtype='float32'):
+        """
+        Contiguous NumPy columns of `df` in the given compute dtype (see trading.columnar), for
+        IndicatorEngine, Backtester and ParameterSweep runs that trade precision for memory.
+        """
+        from .columnar import ColumnarFrame
+
+        return ColumnarFrame.from_frame(df, dtype=dtype)
+
+    @staticmethod
+    def fetch_columns(symbol, timeframe, lookback_months, dtype='float32', **kwargs):
+        """fetch_data() handing back a ColumnarFrame instead of a DataFrame."""
+        df, report = HistoricalDataService.fetch_data(symbol, timeframe, lookback_months, **kwargs)
+        return HistoricalDataService.to_columns(df, dtype), report
+
+    @staticmethod
+    def refresh_specs(symbol):
+        """
+        Caches the symbol's MT5 contract specs for MoneyManager while a session is connected.
+        A failure only leaves the previous snapshot (or symbol_specs.json) in use.
+        """
+        try:
+            from .money_management import SymbolSpecs
+            SymbolSpecs().refresh_from_mt5([symbol])
+        except Exception as e:
+            print(f"DEBUG: Symbol specs for {symbol} not refreshed: {e}")
+
     @staticmethod
     def fetch_data(symbol, timeframe, lookback_months, allow_fallback=True, account=None):
         """Orchestrator: Cache -> MT5 -> YFinance."""
@@ -232,6 +297,7 @@ class HistoricalDataService:
                         print("---------------------------------------\n")
                         
                     HistoricalDataService.save_cache(symbol, timeframe, df)
+                    HistoricalDataService.refresh_specs(symbol)
                     mt5m.shutdown()
                     return df, {"status": "SUCCESS", "data_source": "MT5", "candle_count": len(df)}
                 except Exception as e:
@@ -1,16 +1,165 @@
+import functools
+import hashlib
+import inspect
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 
+
+class IndicatorCache:
+    """
+    LRU memo of indicator results keyed by (frame fingerprint, indicator name, params), bounded
+    by the bytes of the cached values. The fingerprint hashes the frame's index and OHLC columns,
+    so a frame reloaded from the data cache hits the entries of an identical earlier load; it is
+    remembered per frame object, which makes repeated calls on the same frame free. Edits to price
+    values in place are not detected: call clear() after them.
+
+    Values go in and come out as copies, so callers may modify what they get.
+    """
+
+    PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("INDICATOR_CACHE_MB", "256")) * 2**20)
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _guard(data):
+        """Cheap identity of a frame's index and price buffers, to notice replaced columns."""
+        columns = tuple(
+            (name, data[name].to_numpy().__array_interface__['data'][0])
+            for name in IndicatorCache.PRICE_COLUMNS if name in data.columns
+        )
+        return len(data), id(data.index), columns
+
+    @staticmethod
+    def _digest(data):
+        h = hashlib.blake2b(digest_size=16)
+        index = data.index
+        if isinstance(index, pd.RangeIndex):
+            h.update(repr((index.start, index.stop, index.step)).encode())
+        elif index.dtype.kind in 'iufmM':
+            h.update(np.ascontiguousarray(index.to_numpy()).view(np.uint8))
+        else:
+            h.update(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+        for name in IndicatorCache.PRICE_COLUMNS:
+            if name in data.columns:
+                # The dtype too: pandas keeps float32 inputs in float32 for diffs and arithmetic
+                h.update(f"{name}:{data[name].dtype}".encode())
+                h.update(np.ascontiguousarray(data[name].to_numpy(dtype=np.float64)).view(np.uint8))
+        return h.hexdigest()
+
+    def fingerprint(self, data):
+        key = id(data)
+        guard = self._guard(data)
+        with self._lock:
+            known = self._frames.get(key)
+            if known is not None and known[0]() is data and known[1] == guard:
+                return known[2]
+        digest = self._digest(data)
+        with self._lock:
+            ref = weakref.ref(data, lambda _, key=key: self._frames.pop(key, None))
+            self._frames[key] = (ref, guard, digest)
+        return digest
+
+    @staticmethod
+    def _copy(value):
+        if isinstance(value, tuple):
+            return tuple(v.copy() for v in value)
+        return value.copy()
+
+    @staticmethod
+    def _size(value):
+        values = value if isinstance(value, tuple) else (value,)
+        return sum(int(getattr(v, 'nbytes', 0)) for v in values)
+
+    def memoize(self, data, key, compute):
+        """compute() for `data`, served from the cache when the same frame and key were seen."""
+        key = (self.fingerprint(data),) + tuple(key)
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(self.entries[key][0])
+            self.misses += 1
+
+        value = compute()
+        size = self._size(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if key not in self.entries:
+                self.entries[key] = (self._copy(value), size)
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    _, (_, evicted) = self.entries.popitem(last=False)
+                    self.bytes -= evicted
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self._frames.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+INDICATOR_CACHE = IndicatorCache()
+
+
+def _memoized(function):
+    """Serves an IndicatorEngine function from INDICATOR_CACHE, keyed by its bound arguments."""
+    signature = inspect.signature(function)
+
+    @functools.wraps(function)
+    def wrapper(data, *args, **kwargs):
+        bound = signature.bind(data, *args, **kwargs)
+        bound.apply_defaults()
+        params = tuple((name, value) for name, value in bound.arguments.items() if name != 'data')
+        return INDICATOR_CACHE.memoize(data, (function.__name__,) + params, lambda: function(data, *args, **kwargs))
+    return wrapper
+
+
 class IndicatorEngine:
+    cache = INDICATOR_CACHE
+
     @staticmethod
+    @_memoized
     def calculate_sma(data, period=14):
         return data['close'].rolling(window=period).mean()
 
     @staticmethod
+    @_memoized
     def calculate_ema(data, period=14):
         return data['close'].ewm(span=period, adjust=False).mean()
 
     @staticmethod
+    @_memoized
     def calculate_rsi(data, period=14):
         delta = data['close'].diff()
         gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
@@ -19,6 +168,7 @@ class IndicatorEngine:
         return 100 - (100 / (1 + rs))
 
     @staticmethod
+    @_memoized
     def calculate_macd(data, fast=12, slow=26, signal=9):
         exp1 = data['close'].ewm(span=fast, adjust=False).mean()
         exp2 = data['close'].ewm(span=slow, adjust=False).mean()
@@ -27,6 +177,7 @@ class IndicatorEngine:
         return macd, signal_line
 
     @staticmethod
+    @_memoized
     def calculate_bollinger_bands(data, period=20, std=2):
         sma = data['close'].rolling(window=period).mean()
         std_dev = data['close'].rolling(window=period).std()
@@ -35,6 +186,7 @@ class IndicatorEngine:
         return upper, sma, lower
 
     @staticmethod
+    @_memoized
     def calculate_atr(data, period=14):
         high_low = data['high'] - data['low']
         high_close = np.abs(data['high'] - data['close'].shift())
@@ -44,14 +196,20 @@ class IndicatorEngine:
         return true_range.rolling(window=period).mean()
 
     @staticmethod
-    def calculate_stochastic(data, k_period=14, d_period=3):
+    @_memoized
+    def calculate_stochastic(data, k_period=14, d_period=3, slowing=1):
         low_min = data['low'].rolling(window=k_period).min()
         high_max = data['high'].rolling(window=k_period).max()
-        k = 100 * (data['close'] - low_min) / (high_max - low_min)
+        if slowing > 1:
+            # MT5 %K slowing: ratio of the summed distances over the last `slowing` bars
+            k = 100 * (data['close'] - low_min).rolling(window=slowing).sum() / (high_max - low_min).rolling(window=slowing).sum()
+        else:
+            k = 100 * (data['close'] - low_min) / (high_max - low_min)
         d = k.rolling(window=d_period).mean()
         return k, d
 
     @staticmethod
+    @_memoized
     def calculate_adx(data, period=14):
         # simplified ADX
         plus_dm = data['high'].diff()
@@ -0,0 +1,280 @@
+"""
+Indicator Graph
+Lazy computation DAG over the IndicatorEngine formulas. Every indicator is broken into nodes
+(price diffs, true range, EMAs, rolling means / std / extremes) keyed by what they compute, so a
+node shared by several indicators or parameter variants is computed once per frame: ADX reuses
+the ATR, MACD the EMAs an EMA rule already has and Bollinger Bands the SMA.
+"""
+
+import re
+
+import pandas as pd
+import numpy as np
+
+from .indicator_engine import INDICATOR_CACHE
+
+CLOSE = ('col', 'close')
+HIGH = ('col', 'high')
+LOW = ('col', 'low')
+
+
+# Node kinds: each takes the node's arguments and returns (dependency keys, function of their values).
+# The formulas are IndicatorEngine's, operation for operation, so results are bitwise identical.
+
+def _col(name):
+    return [], None
+
+
+def _diff(src):
+    return [src], lambda s: s.diff()
+
+
+def _gain(src):
+    return [('diff', src)], lambda delta: delta.where(delta > 0, 0)
+
+
+def _loss(src):
+    return [('diff', src)], lambda delta: -delta.where(delta < 0, 0)
+
+
+def _sma(src, period):
+    return [src], lambda s: s.rolling(window=period).mean()
+
+
+def _rolling_sum(src, period):
+    return [src], lambda s: s.rolling(window=period).sum()
+
+
+def _rolling_std(src, period):
+    return [src], lambda s: s.rolling(window=period).std()
+
+
+def _rolling_min(src, period):
+    return [src], lambda s: s.rolling(window=period).min()
+
+
+def _rolling_max(src, period):
+    return [src], lambda s: s.rolling(window=period).max()
+
+
+def _ema(src, span):
+    return [src], lambda s: s.ewm(span=span, adjust=False).mean()
+
+
+def _true_range():
+    def true_range(high, low, close):
+        ranges = pd.concat([high - low, np.abs(high - close.shift()), np.abs(low - close.shift())], axis=1)
+        return np.max(ranges, axis=1)
+    return [HIGH, LOW, CLOSE], true_range
+
+
+def _plus_dm():
+    def plus_dm(high):
+        dm = high.diff()
+        dm[dm < 0] = 0
+        return dm
+    return [HIGH], plus_dm
+
+
+def _minus_dm():
+    def minus_dm(low):
+        dm = low.diff()
+        dm[dm > 0] = 0
+        return np.abs(dm)
+    return [LOW], minus_dm
+
+
+def _rsi(period):
+    def rsi(gain, loss):
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+    return [('sma', ('gain', CLOSE), period), ('sma', ('loss', CLOSE), period)], rsi
+
+
+def _macd(fast, slow):
+    return [('ema', CLOSE, fast), ('ema', CLOSE, slow)], lambda exp1, exp2: exp1 - exp2
+
+
+def _bands_upper(period, std):
+    return [('sma', CLOSE, period), ('rolling_std', CLOSE, period)], lambda sma, std_dev: sma + (std_dev * std)
+
+
+def _bands_lower(period, std):
+    return [('sma', CLOSE, period), ('rolling_std', CLOSE, period)], lambda sma, std_dev: sma - (std_dev * std)
+
+
+def _stoch_k(k_period, slowing):
+    distance, span = ('stoch_distance', k_period), ('stoch_span', k_period)
+    if slowing > 1:
+        # MT5 %K slowing: ratio of the summed distances over the last `slowing` bars
+        distance, span = ('rolling_sum', distance, slowing), ('rolling_sum', span, slowing)
+    return [distance, span], lambda distance, span: 100 * distance / span
+
+
+def _stoch_distance(k_period):
+    return [CLOSE, ('rolling_min', LOW, k_period)], lambda close, low: close - low
+
+
+def _stoch_span(k_period):
+    return [('rolling_max', HIGH, k_period), ('rolling_min', LOW, k_period)], lambda high, low: high - low
+
+
+def _plus_di(period):
+    return [('sma', ('plus_dm',), period), ('atr', period)], lambda dm, atr: 100 * (dm / atr)
+
+
+def _minus_di(period):
+    return [('sma', ('minus_dm',), period), ('atr', period)], lambda dm, atr: 100 * (dm / atr)
+
+
+def _atr(period):
+    return [('sma', ('true_range',), period)], lambda atr: atr
+
+
+def _dx(period):
+    def dx(plus_di, minus_di):
+        return 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return [('plus_di', period), ('minus_di', period)], dx
+
+
+def _adx(period):
+    return [('sma', ('dx', period), period)], lambda adx: adx
+
+
+NODES = {
+    'col': _col, 'diff': _diff, 'gain': _gain, 'loss': _loss, 'sma': _sma, 'rolling_sum': _rolling_sum,
+    'rolling_std': _rolling_std, 'rolling_min': _rolling_min, 'rolling_max': _rolling_max, 'ema': _ema,
+    'true_range': _true_range, 'plus_dm': _plus_dm, 'minus_dm': _minus_dm, 'rsi': _rsi, 'macd': _macd,
+    'bands_upper': _bands_upper, 'bands_lower': _bands_lower, 'stoch_k': _stoch_k,
+    'stoch_distance': _stoch_distance, 'stoch_span': _stoch_span, 'plus_di': _plus_di,
+    'minus_di': _minus_di, 'atr': _atr, 'dx': _dx, 'adx': _adx,
+}
+
+# Indicator requests: name -> (default arguments, output node keys in IndicatorEngine's return order)
+INDICATORS = {
+    'sma': ((14,), lambda period: [('sma', CLOSE, period)]),
+    'ema': ((14,), lambda period: [('ema', CLOSE, period)]),
+    'rsi': ((14,), lambda period: [('rsi', period)]),
+    'macd': ((12, 26, 9), lambda fast, slow, signal: [('macd', fast, slow), ('ema', ('macd', fast, slow), signal)]),
+    'bands': ((20, 2), lambda period, std: [
+        ('bands_upper', period, std), ('sma', CLOSE, period), ('bands_lower', period, std)
+    ]),
+    'atr': ((14,), lambda period: [('atr', period)]),
+    'stoch': ((14, 3, 1), lambda k_period, d_period, slowing: [
+        ('stoch_k', k_period, slowing), ('sma', ('stoch_k', k_period, slowing), d_period)
+    ]),
+    'adx': ((14,), lambda period: [('adx', period), ('plus_di', period), ('minus_di', period)]),
+}
+ALIASES = {'bollinger_bands': 'bands', 'stochastic': 'stoch'}
+
+_REQUEST = re.compile(r'\s*([A-Za-z_]+)\s*(?:\(([^)]*)\))?\s*(?:,|$)')
+
+
+def parse_request(spec):
+    """[(name, args)] for a request like "rsi(14), macd(12,26,9), bands(20,2), adx(14)"."""
+    requests = []
+    position = 0
+    spec = spec.strip()
+    while position < len(spec):
+        match = _REQUEST.match(spec, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Cannot parse indicator request at '{spec[position:]}'")
+        name = ALIASES.get(match.group(1).lower(), match.group(1).lower())
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{name}', expected some of {sorted(INDICATORS)}")
+        args = tuple(_number(a) for a in (match.group(2) or '').split(',') if a.strip())
+        requests.append((name, args))
+        position = match.end()
+    return requests
+
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and '.' not in text else value
+
+
+class IndicatorGraph:
+    """
+    Lazy, memoized indicator nodes over one OHLC frame. value(key) computes a node and, first,
+    whatever it depends on; every node is computed at most once for the life of the graph, so
+    reusing one graph across all the indicators and parameter variants of a frame computes each
+    shared intermediate once. Keep a graph only as long as its frame is unchanged.
+
+    Nodes are also looked up in `cache` (the IndicatorEngine LRU by default, None to skip it),
+    so graphs built later over the same frame or an identical reload reuse them too.
+    computed / hits count node computations and reuses within this graph.
+    """
+
+    def __init__(self, data, cache=INDICATOR_CACHE):
+        self.data = data
+        self.cache = cache
+        self.values = {}
+        self.computed = 0
+        self.hits = 0
+
+    @staticmethod
+    def dependencies(key):
+        return NODES[key[0]](*key[1:])[0]
+
+    @staticmethod
+    def outputs(name, args=()):
+        """Output node keys of one indicator request, missing arguments taking their defaults."""
+        name = ALIASES.get(name, name)
+        defaults, outputs = INDICATORS[name]
+        if len(args) > len(defaults):
+            raise ValueError(f"{name} takes at most {len(defaults)} arguments")
+        return outputs(*(tuple(args) + defaults[len(args):]))
+
+    @classmethod
+    def plan(cls, requests):
+        """
+        Every node the requests need, each listed once and after its dependencies. requests: a
+        request string or [(name, args)].
+        """
+        if isinstance(requests, str):
+            requests = parse_request(requests)
+        order, seen = [], set()
+
+        def visit(key):
+            if key in seen:
+                return
+            seen.add(key)
+            for dependency in cls.dependencies(key):
+                visit(dependency)
+            order.append(key)
+
+        for name, args in requests:
+            for key in cls.outputs(name, args):
+                visit(key)
+        return order
+
+    def value(self, key):
+        if key in self.values:
+            self.hits += 1
+            return self.values[key]
+        kind = key[0]
+        if kind == 'col':
+            result = self.data[key[1]]
+        else:
+            result = self._compute(key) if self.cache is None else self.cache.memoize(self.data, key, lambda: self._compute(key))
+        self.values[key] = result
+        return result
+
+    def _compute(self, key):
+        dependencies, compute = NODES[key[0]](*key[1:])
+        self.computed += 1
+        return compute(*(self.value(dependency) for dependency in dependencies))
+
+    def indicator(self, name, *args):
+        """The indicator's series, shaped like the IndicatorEngine function's return value."""
+        outputs = [self.value(key) for key in self.outputs(name, args)]
+        return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+    def evaluate(self, requests):
+        """{label: series or tuple of series} for a request string or [(name, args)]."""
+        if isinstance(requests, str):
+            requests = parse_request(requests)
+        return {
+            f"{name}({', '.join(str(a) for a in args)})": self.indicator(name, *args)
+            for name, args in requests
+        }
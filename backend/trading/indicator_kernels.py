@@ -0,0 +1,127 @@
+"""
+Multi-Period Indicator Kernels
+Batched versions of the period-driven IndicatorEngine series for parameter sweeps: one call takes
+a vector of periods and returns a (bars x periods) array. Rolling means come from a single
+cumulative sum, so RSI or SMA for periods 2..50 costs about as much as a couple of single calls.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+
+def _periods(periods):
+    periods = np.atleast_1d(np.asarray(periods, dtype=np.int64))
+    if np.any(periods < 1):
+        raise ValueError("Periods must be positive")
+    return periods
+
+
+def _prefix_sums(values):
+    """
+    Compensated cumulative sums of a finite series taken around its first value: the sums, the
+    rounding error of each step (Knuth's TwoSum) cumulated on the side, and a running count of
+    non-zero values so windows of zeros can be made exactly zero.
+    """
+    ref = values[0]
+    centered = values - ref
+    running = np.cumsum(centered)
+    previous = np.concatenate([[0.0], running[:-1]])
+    added = running - previous
+    errors = (previous - (running - added)) + (centered - added)
+    return (
+        ref,
+        np.concatenate([[0.0], running]),
+        np.concatenate([[0.0], np.cumsum(errors)]),
+        np.concatenate([[0], np.cumsum(values != 0)]),
+    )
+
+
+def _window_mean(prefix, period):
+    """Means of every full window of `period` values (bars period-1 onwards)."""
+    ref, sums, compensation, nonzero = prefix
+    mean = sums[period:] - sums[:-period]
+    mean += compensation[period:] - compensation[:-period]
+    mean /= period
+    mean += ref
+    mean[nonzero[period:] == nonzero[:-period]] = 0.0
+    return mean
+
+
+def rolling_mean_matrix(values, periods):
+    """
+    (bars x periods) rolling means of a finite 1-D series, NaN until each window is full like
+    rolling(period).mean(). Window sums are differences of one compensated cumulative sum, so
+    they stay as accurate as pandas' own running sums over long histories; windows of all zeros
+    come out exactly zero, as they do in pandas.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    periods = _periods(periods)
+    n = len(values)
+    # Row per period internally, so each column of the result is contiguous for the sweep matrix
+    out = np.full((len(periods), n), np.nan)
+    if n == 0:
+        return out.T
+    prefix = _prefix_sums(values)
+    for j, period in enumerate(periods):
+        if period <= n:
+            out[j, period - 1:] = _window_mean(prefix, period)
+    return out.T
+
+
+def ewm_matrix(values, alphas):
+    """
+    (bars x alphas) recursive filter y[t] = (1 - a) * y[t-1] + a * x[t] from y[0] = x[0], i.e.
+    ewm(alpha=a, adjust=False).mean(); EMA is alpha = 2 / (period + 1) and Wilder smoothing
+    alpha = 1 / period. Each alpha is one pass in C (scipy's lfilter, else pandas).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    alphas = np.atleast_1d(np.asarray(alphas, dtype=np.float64))
+    out = np.empty((len(alphas), len(values)))
+    if len(values) == 0:
+        return out.T
+    for j, alpha in enumerate(alphas):
+        if lfilter is not None:
+            out[j, 0] = values[0]
+            out[j, 1:] = lfilter([alpha], [1.0, alpha - 1.0], values[1:], zi=[(1.0 - alpha) * values[0]])[0]
+        else:
+            out[j] = pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out.T
+
+
+def sma_matrix(data, periods):
+    """calculate_sma for every period at once."""
+    return rolling_mean_matrix(data['close'].to_numpy(dtype=np.float64), periods)
+
+
+def ema_matrix(data, periods):
+    """calculate_ema for every period at once."""
+    return ewm_matrix(data['close'].to_numpy(dtype=np.float64), 2.0 / (_periods(periods) + 1.0))
+
+
+def rsi_matrix(data, periods):
+    """calculate_rsi for every period at once: gains and losses are cumulated a single time."""
+    close = data['close'].to_numpy(dtype=np.float64)
+    periods = _periods(periods)
+    n = len(close)
+    out = np.full((len(periods), n), np.nan)
+    if n == 0:
+        return out.T
+    delta = np.diff(close, prepend=close[:1])
+    gains = _prefix_sums(np.where(delta > 0, delta, 0.0))
+    losses = _prefix_sums(np.where(delta < 0, -delta, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j, period in enumerate(periods):
+            if period > n:
+                continue
+            rsi = _window_mean(gains, period)
+            rsi /= _window_mean(losses, period)
+            rsi += 1
+            np.divide(100, rsi, out=rsi)
+            np.subtract(100, rsi, out=rsi)
+            out[j, period - 1:] = rsi
+    return out.T
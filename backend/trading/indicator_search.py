@@ -0,0 +1,167 @@
+"""
+Indicator Subset Search
+Looks for the best combination of indicator families (and their parameter grids) for a winrate
+robot, reusing cached per-family signal masks and abandoning hopeless candidates early.
+"""
+
+import itertools
+import json
+import time
+
+import numpy as np
+
+from .backtester import Backtester
+from .indicator_graph import IndicatorGraph
+from .parameter_sweep import PRICE_ROWS, ParameterSweep
+from .rule_compiler import FAMILIES, compile_rules, indicator_columns
+
+
+class IndicatorSubsetSearch:
+    """
+    grids: {family: {param: [values]}} per family (DEFAULT_GRIDS for families left out).
+    Every subset of `families` with up to max_indicators members is tried, crossed with each
+    member's grid. Each indicator column is computed once and each family/parameter variant's
+    (buy, sell) masks once; a candidate's signals are the AND of its members' masks, which is
+    exactly what the compiled multi-family rules evaluate.
+
+    A candidate is aborted while positions are resolved when
+      - it can no longer reach min_trades trades,
+      - its running equity drawdown exceeds max_drawdown (price units), or
+      - for metric='win_rate', even winning every remaining possible trade would not beat the
+        best completed candidate.
+    time_budget (seconds) stops the search and keeps the results found so far.
+    """
+
+    DEFAULT_GRIDS = {
+        'rsi': {'period': [7, 14, 21], 'buy': [25, 30, 35], 'sell': [65, 70, 75]},
+        'ma': {'period': [20, 50, 100]},
+        'macd': {},
+        'bands': {'period': [20], 'dev': [2.0, 2.5]},
+        'stoch': {'buy': [20, 30], 'sell': [70, 80]},
+    }
+
+    def __init__(self, data, grids=None, families=FAMILIES, max_indicators=3, metric='win_rate',
+                 min_trades=5, max_drawdown=None, time_budget=None):
+        unknown = [f for f in families if f not in FAMILIES]
+        if unknown:
+            raise ValueError(f"Unknown indicator families {unknown}, expected some of {FAMILIES}")
+        self.data = data
+        self.grids = {**self.DEFAULT_GRIDS, **(grids or {})}
+        self.families = tuple(families)
+        self.max_indicators = max_indicators
+        self.metric = metric
+        self.min_trades = min_trades
+        self.max_drawdown = max_drawdown
+        self.time_budget = time_budget
+        self.prices = {name: data[name].to_numpy(dtype=np.float64) for name in PRICE_ROWS}
+        self.graph = IndicatorGraph(data)
+        self._columns = {}
+        self._masks = {}
+
+    def variants(self, family):
+        """Parameter dicts for one family's grid."""
+        grid = self.grids.get(family) or {}
+        return [combo[family] for combo in ParameterSweep(self.data, {family: grid}).combinations()]
+
+    def mask(self, family, params):
+        """Cached (buy, sell) masks of a single family variant."""
+        key = (family, json.dumps(params, sort_keys=True, default=str))
+        if key not in self._masks:
+            variant = ParameterSweep.variant_key(family, params)
+            if variant not in self._columns:
+                self._columns[variant] = {
+                    name: np.asarray(values, dtype=np.float64)
+                    for name, values in indicator_columns(self.data, family, params, self.graph).items()
+                }
+            columns = {**self.prices, **self._columns[variant]}
+            self._masks[key] = compile_rules({family: params}).signals(columns)
+        return self._masks[key]
+
+    def candidates(self):
+        """Rules dicts, smallest subsets first so early winners tighten the win-rate bound."""
+        variants = {family: self.variants(family) for family in self.families}
+        for size in range(1, self.max_indicators + 1):
+            for subset in itertools.combinations(self.families, size):
+                for combo in itertools.product(*(variants[f] for f in subset)):
+                    yield dict(zip(subset, combo))
+
+    def evaluate(self, rules, best=None):
+        """Returns (metrics, None) for a completed candidate or (None, abort_reason)."""
+        buy, sell = None, None
+        for family, params in rules.items():
+            family_buy, family_sell = self.mask(family, params)
+            buy = family_buy.copy() if buy is None else buy & family_buy
+            sell = family_sell.copy() if sell is None else sell & family_sell
+
+        # Every trade needs an entry signal bar and every closed one an exit bar too
+        if (np.count_nonzero(buy | sell) + 1) // 2 < self.min_trades:
+            return None, 'trades'
+
+        state = {'closed': 0, 'wins': 0, 'equity': 0.0, 'peak': 0.0, 'reason': None}
+
+        def monitor(profit, remaining):
+            state['closed'] += 1
+            state['wins'] += profit > 0
+            state['equity'] += profit
+            state['peak'] = max(state['peak'], state['equity'])
+            possible = remaining // 2
+            if state['closed'] + (remaining + 1) // 2 < self.min_trades:
+                state['reason'] = 'trades'
+            elif self.max_drawdown is not None and state['peak'] - state['equity'] > self.max_drawdown:
+                state['reason'] = 'drawdown'
+            elif self.metric == 'win_rate' and best is not None:
+                bound = (state['wins'] + possible) / (state['closed'] + possible) * 100
+                if round(bound, 2) <= best:
+                    state['reason'] = 'dominated'
+            return state['reason'] is not None
+
+        close = self.prices['close']
+        positions = Backtester._resolve_positions(buy, sell, close, monitor=monitor)
+        if positions is None:
+            return None, state['reason']
+        times = (np.arange(len(close), dtype=np.int64), False)
+        return Backtester.compute_metrics(Backtester._ledger(positions, close, times)), None
+
+    def run(self):
+        """
+        Returns {'results': [{'rules', 'metrics'}] ranked best first, 'evaluated', 'completed',
+        'aborted': {reason: count}, 'timed_out', 'elapsed'}.
+        """
+        started = time.monotonic()
+        results, aborted = [], {}
+        best = None
+        evaluated = 0
+        timed_out = False
+        for rules in self.candidates():
+            if self.time_budget is not None and time.monotonic() - started > self.time_budget:
+                timed_out = True
+                break
+            evaluated += 1
+            metrics, reason = self.evaluate(rules, best)
+            if metrics is None:
+                aborted[reason] = aborted.get(reason, 0) + 1
+                continue
+            if metrics.get('total_trades', 0) < self.min_trades:
+                continue
+            results.append({'rules': rules, 'metrics': metrics})
+            score = metrics.get(self.metric) or 0
+            if best is None or score > best:
+                best = score
+
+        results.sort(key=lambda r: r['metrics'].get(self.metric) or 0, reverse=True)
+        return {
+            'results': results,
+            'evaluated': evaluated,
+            'completed': len(results),
+            'aborted': aborted,
+            'timed_out': timed_out,
+            'elapsed': round(time.monotonic() - started, 3),
+        }
+
+    def summary(self, report, top=5):
+        """JSON-ready excerpt of a run() report for storing on the build report."""
+        return {
+            **{k: v for k, v in report.items() if k != 'results'},
+            'metric': self.metric,
+            'top': report['results'][:top],
+        }
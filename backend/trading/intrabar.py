@@ -0,0 +1,159 @@
+"""
+Intrabar Stop-Loss / Take-Profit Resolution
+Finds the first SL/TP touch inside higher-timeframe bars using M1 sub-bars.
+"""
+
+import numpy as np
+
+
+class IntrabarExitEngine:
+    """
+    Bound to one backtest frame. For a trade opened at the close of bar `entry`, scans the
+    sub-bars that follow (located with np.searchsorted on the sorted sub-bar times) for the
+    first SL or TP touch. When SL and TP fall inside the same sub-bar the SL is assumed to
+    have been hit first, which keeps the estimate conservative. Bars the sub-bars do not cover
+    should be passed in as their own sub-bar (see with_frame_bars), or no exit is found in them.
+
+    sl_points / tp_points follow risk_settings (MQL5 points, i.e. multiples of `point`).
+    """
+
+    def __init__(self, bar_times, sub_bars, sl_points, tp_points, point):
+        self.bar_times = self._to_ns(bar_times)
+        # Sub-bars past the last bar's close are outside the backtest (e.g. the rest of the M1 file)
+        bar_span = int(np.median(np.diff(self.bar_times))) if len(self.bar_times) > 1 else 0
+        self.data_end = self.bar_times[-1] + bar_span if len(self.bar_times) else 0
+        self.times = self._to_ns(sub_bars['time'])
+        self.open = np.asarray(sub_bars['open'], dtype=np.float64)
+        self.high = np.asarray(sub_bars['high'], dtype=np.float64)
+        self.low = np.asarray(sub_bars['low'], dtype=np.float64)
+        self.sl_dist = float(sl_points or 0) * point
+        self.tp_dist = float(tp_points or 0) * point
+
+    @staticmethod
+    def _to_ns(times):
+        return np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+
+    @staticmethod
+    def default_point(symbol):
+        s = symbol.upper()
+        if 'JPY' in s:
+            return 0.001
+        if 'XAU' in s or 'GOLD' in s or 'BTC' in s:
+            return 0.01
+        return 0.00001
+
+    @classmethod
+    def with_frame_bars(cls, df, sub_bars):
+        """
+        Sub-bars for a backtest frame: the given M1 bars plus every frame bar that has no M1 bar
+        inside it, which is then resolved at bar level. M1 history is usually much shorter than
+        the frame (yfinance keeps about a week), so most bars of a long backtest take this path.
+        Returns (sub_bars, coverage) with coverage describing how many frame bars M1 resolves.
+        """
+        bar_times = cls._to_ns(df['time'])
+        n = len(bar_times)
+        columns = ('open', 'high', 'low')
+        if sub_bars is None or len(sub_bars) == 0:
+            times = np.array([], dtype=np.int64)
+            covered = np.zeros(n, dtype=bool)
+        else:
+            times = cls._to_ns(sub_bars['time'])
+            bar_span = int(np.median(np.diff(bar_times))) if n > 1 else 0
+            ends = np.concatenate([bar_times[1:], bar_times[-1:] + bar_span])
+            covered = np.searchsorted(times, ends, side='left') > np.searchsorted(times, bar_times, side='left')
+
+        missing = ~covered
+        merged_times = np.concatenate([times, bar_times[missing]])
+        order = np.argsort(merged_times, kind='stable')
+        merged = {'time': merged_times[order].astype('datetime64[ns]')}
+        for name in columns:
+            own = np.asarray(sub_bars[name], dtype=np.float64) if len(times) else np.array([])
+            merged[name] = np.concatenate([own, np.asarray(df[name], dtype=np.float64)[missing]])[order]
+
+        coverage = {
+            'm1_bars': int(len(times)),
+            'm1_start': str(times[0].astype('datetime64[ns]')) if len(times) else None,
+            'm1_end': str(times[-1].astype('datetime64[ns]')) if len(times) else None,
+            'bars': int(n),
+            'covered_bars': int(covered.sum()),
+            'coverage_pct': round(float(covered.mean()) * 100, 2) if n else 0.0,
+        }
+        return merged, coverage
+
+    @classmethod
+    def for_frame(cls, df, symbol, risk, point=None, sub_bars=None):
+        """
+        Builds the engine for a backtest frame from stored M1 history (or the given sub_bars).
+        Frame bars outside the M1 data are resolved on their own high/low; engine.coverage tells
+        how much of the frame M1 covers.
+        """
+        if sub_bars is None:
+            from .data_service import HistoricalDataService
+
+            sub_bars = HistoricalDataService.load_m1_history(symbol)
+        sub_bars, coverage = cls.with_frame_bars(df, sub_bars)
+        engine = cls(
+            df['time'], sub_bars,
+            risk.get('sl'), risk.get('tp'),
+            point or cls.default_point(symbol)
+        )
+        engine.coverage = coverage
+        return engine
+
+    def rebind(self, bar_times):
+        """The same SL/TP settings and sub-bars bound to another frame (e.g. one chunk of it)."""
+        engine = object.__new__(type(self))
+        engine.__dict__.update(self.__dict__)
+        engine.bar_times = self._to_ns(bar_times)
+        bar_span = int(np.median(np.diff(engine.bar_times))) if len(engine.bar_times) > 1 else 0
+        engine.data_end = engine.bar_times[-1] + bar_span if len(engine.bar_times) else 0
+        return engine
+
+    def first_exit(self, entry, side, entry_price, until=-1):
+        """
+        entry / until are bar positions in the bound frame; until is the bar whose close
+        triggers a signal exit (-1 when the trade would otherwise stay open).
+        Returns (exit_bar, exit_price, reason) for the first SL/TP touch before that, or None.
+        """
+        if self.sl_dist <= 0 and self.tp_dist <= 0:
+            return None
+
+        n = len(self.bar_times)
+        if entry + 1 >= n:
+            return None
+        start = self.bar_times[entry + 1]
+        end = self.bar_times[until + 1] if 0 <= until < n - 1 else self.data_end
+
+        lo = np.searchsorted(self.times, start, side='left')
+        hi = np.searchsorted(self.times, end, side='left')
+        if lo >= hi:
+            return None
+
+        high = self.high[lo:hi]
+        low = self.low[lo:hi]
+        if side == 1:
+            sl_level = entry_price - self.sl_dist
+            tp_level = entry_price + self.tp_dist
+            sl_hit = low <= sl_level if self.sl_dist > 0 else np.zeros(hi - lo, dtype=bool)
+            tp_hit = high >= tp_level if self.tp_dist > 0 else np.zeros(hi - lo, dtype=bool)
+        else:
+            sl_level = entry_price + self.sl_dist
+            tp_level = entry_price - self.tp_dist
+            sl_hit = high >= sl_level if self.sl_dist > 0 else np.zeros(hi - lo, dtype=bool)
+            tp_hit = low <= tp_level if self.tp_dist > 0 else np.zeros(hi - lo, dtype=bool)
+
+        hit = sl_hit | tp_hit
+        if not hit.any():
+            return None
+
+        k = int(np.argmax(hit))
+        opened = self.open[lo + k]
+        if sl_hit[k]:
+            reason = 'sl'
+            # A gap through the stop fills at the sub-bar open, not at the stop level
+            price = min(sl_level, opened) if side == 1 else max(sl_level, opened)
+        else:
+            reason = 'tp'
+            price = tp_level
+        exit_bar = int(np.searchsorted(self.bar_times, self.times[lo + k], side='right') - 1)
+        return exit_bar, price, reason
@@ -0,0 +1,217 @@
+"""
+Money Management
+Converts backtest price differences into account-currency P&L with per-symbol contract specs,
+sizes every trade from the robot's risk_settings and compounds equity, all over whole ledger
+columns.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from .intrabar import IntrabarExitEngine
+
+ACCOUNT_CURRENCY = 'USD'
+FALLBACK_SPECS = Path(__file__).resolve().with_name("symbol_specs.json")
+
+
+class SymbolSpecs:
+    """
+    Contract specs per symbol (contract_size, tick_size, tick_value, point, currency_base,
+    currency_profit, volume_min / volume_max / volume_step and a reference price). A snapshot
+    taken from MT5 symbol_info is cached under trading_data/ and wins over the static
+    symbol_specs.json shipped with the code; unknown 6-letter FX symbols get standard-lot
+    defaults.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = Path(cache_path) if cache_path else self.default_path()
+        self.specs = {}
+        for path in (FALLBACK_SPECS, self.cache_path):
+            if path.exists():
+                try:
+                    with open(path) as f:
+                        self.specs.update({k: v for k, v in json.load(f).items() if not k.startswith('_')})
+                except Exception as e:
+                    print(f"DEBUG: Ignoring unreadable symbol specs {path.name}: {e}")
+
+    @staticmethod
+    def default_path():
+        try:
+            from django.conf import settings
+            base_dir = Path(settings.BASE_DIR)
+        except Exception:
+            base_dir = Path(__file__).resolve().parent.parent
+        return base_dir / "trading_data" / "symbol_specs.json"
+
+    def get(self, symbol):
+        s = symbol.upper()
+        if s in self.specs:
+            return dict(self.specs[s])
+        point = IntrabarExitEngine.default_point(s)
+        spec = {
+            'contract_size': 100000, 'tick_size': point, 'tick_value': None, 'point': point,
+            'currency_base': s[:3], 'currency_profit': s[3:6] if len(s) >= 6 else ACCOUNT_CURRENCY,
+            'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01, 'price': None,
+        }
+        return spec
+
+    def refresh_from_mt5(self, symbols):
+        """Snapshots symbol_info for the given symbols from the connected terminal into the cache."""
+        from .mt5_connector import mt5
+
+        if mt5 is None:
+            raise RuntimeError("MT5 library not found")
+        account = mt5.account_info()
+        updated = {}
+        for symbol in symbols:
+            info = mt5.symbol_info(symbol)
+            if info is None:
+                continue
+            updated[symbol.upper()] = {
+                'contract_size': info.trade_contract_size,
+                'tick_size': info.trade_tick_size,
+                'tick_value': info.trade_tick_value,
+                'point': info.point,
+                'currency_base': info.currency_base,
+                'currency_profit': info.currency_profit,
+                'volume_min': info.volume_min,
+                'volume_max': info.volume_max,
+                'volume_step': info.volume_step,
+                'price': info.bid,
+                'account_currency': account.currency if account else ACCOUNT_CURRENCY,
+            }
+
+        cached = {}
+        if self.cache_path.exists():
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        cached.update(updated)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_path, "w") as f:
+            json.dump(cached, f, indent=2, sort_keys=True)
+        self.specs.update(updated)
+        return updated
+
+
+class MoneyManager:
+    """
+    risk: the robot's risk_settings. Trades are sized with risk['risk_percent'] percent of the
+    equity at entry lost at the stop (needs risk['sl'] in points) when given, else with the fixed
+    risk['lot']. Lots are rounded down to the symbol's volume step and clipped to its limits.
+
+    Price differences become account currency by the symbol's quote currency:
+      - quoted in the account currency: diff * contract_size
+      - account currency is the base (e.g. USDJPY on a USD account): divided by the exit price
+      - crosses: diff / tick_size * tick_value
+    Compounding follows ledger order, which is execution order for a single strategy. With
+    risk_percent each trade's return on equity does not depend on the equity level, so the curve
+    is one cumulative product; lot rounding is then applied against that curve.
+    """
+
+    def __init__(self, symbol, risk=None, initial_equity=10000.0, account_currency=None, spec=None):
+        risk = risk or {}
+        self.symbol = symbol.upper()
+        self.spec = spec or SymbolSpecs().get(symbol)
+        self.account_currency = account_currency or self.spec.get('account_currency') or ACCOUNT_CURRENCY
+        self.initial_equity = float(initial_equity)
+        self.lot = float(risk.get('lot', 0.01))
+        self.risk_percent = float(risk['risk_percent']) if risk.get('risk_percent') else None
+        self.point = self.spec.get('point') or IntrabarExitEngine.default_point(symbol)
+        self.sl_dist = float(risk.get('sl') or 0) * self.point
+        if self.risk_percent and self.sl_dist <= 0:
+            raise ValueError("risk_percent sizing needs a stop loss (risk_settings['sl'])")
+
+    def value_per_lot(self, price_diff, price=None):
+        """Account-currency value of a price move for one lot (price: quote at conversion time)."""
+        price_diff = np.asarray(price_diff, dtype=np.float64)
+        spec = self.spec
+        if spec['currency_profit'] == self.account_currency:
+            return price_diff * spec['contract_size']
+        if spec['currency_base'] == self.account_currency:
+            price = spec.get('price') if price is None else np.asarray(price, dtype=np.float64)
+            if price is None:
+                raise ValueError(f"No reference price to convert {self.symbol}; refresh specs from MT5")
+            return price_diff * spec['contract_size'] / price
+        if spec.get('tick_value'):
+            return price_diff / spec['tick_size'] * spec['tick_value']
+        raise ValueError(f"No tick value for {self.symbol} in {self.account_currency}; refresh specs from MT5")
+
+    def check(self):
+        """Raises ValueError now, rather than mid-backtest, when P&L cannot be converted."""
+        self.value_per_lot(0.0, price=1.0)
+        return self
+
+    def pip_value(self, lots=1.0):
+        """Account-currency value of one pip (10 points) at the spec's reference price."""
+        return float(self.value_per_lot(self.point * 10)) * lots
+
+    def _round_lots(self, lots):
+        step = self.spec.get('volume_step') or 0.01
+        lots = np.floor(np.asarray(lots) / step + 1e-9) * step
+        return np.clip(lots, self.spec.get('volume_min') or step, self.spec.get('volume_max') or np.inf)
+
+    def _per_lot(self, arr):
+        closed = arr['closed']
+        return np.where(closed, self.value_per_lot(arr['profit'], np.where(closed, arr['exit_price'], 1.0)), 0.0)
+
+    def _growth(self, arr, per_lot):
+        """(cumulative equity growth after each trade, risk per lot) of a risk_percent run."""
+        risk_per_lot = np.abs(self.value_per_lot(self.sl_dist, arr['entry_price']))
+        # Return on equity of each closed trade, independent of the equity level
+        returns = np.where(arr['closed'], self.risk_percent / 100 * per_lot / risk_per_lot, 0.0)
+        return np.cumprod(1 + returns), risk_per_lot
+
+    def apply(self, ledger):
+        """Fills the ledger's 'lots' and 'pnl' (account currency, closed trades only) in place."""
+        arr = ledger.array
+        if not len(arr):
+            return ledger
+        per_lot = self._per_lot(arr)
+
+        if self.risk_percent is None:
+            lots = np.full(len(arr), self._round_lots(self.lot))
+        else:
+            growth, risk_per_lot = self._growth(arr, per_lot)
+            equity_before = self.initial_equity * np.concatenate([[1.0], growth[:-1]])
+            lots = self._round_lots(equity_before * self.risk_percent / 100 / risk_per_lot)
+
+        arr['lots'] = lots
+        arr['pnl'] = per_lot * lots
+        return ledger
+
+    def next_equity(self, ledger):
+        """
+        Equity the trade after `ledger` is sized from: the initial_equity for a MoneyManager
+        continuing the run (see Backtester.resume).
+        """
+        arr = ledger.array
+        if self.risk_percent is None or not len(arr):
+            return self.initial_equity + float(ledger.closed()['pnl'].sum())
+        growth, _ = self._growth(arr, self._per_lot(arr))
+        return self.initial_equity * float(growth[-1])
+
+    def equity_curve(self, ledger):
+        """Account equity after each closed trade."""
+        return self.initial_equity + np.cumsum(ledger.closed()['pnl'])
+
+    def summary(self, ledger):
+        equity = self.equity_curve(ledger)
+        final = float(equity[-1]) if len(equity) else self.initial_equity
+        curve = np.concatenate([[self.initial_equity], equity])
+        peaks = np.maximum.accumulate(curve)
+        return {
+            'account_currency': self.account_currency,
+            'initial_equity': round(self.initial_equity, 2),
+            'final_equity': round(final, 2),
+            'return_pct': round((final / self.initial_equity - 1) * 100, 2),
+            'max_drawdown_pct': round(float(((peaks - curve) / peaks).max()) * 100, 2),
+        }
+
+    def fingerprint(self):
+        return json.dumps({
+            'symbol': self.symbol, 'spec': self.spec, 'currency': self.account_currency,
+            'equity': self.initial_equity, 'lot': self.lot, 'risk_percent': self.risk_percent,
+            'sl': self.sl_dist,
+        }, sort_keys=True, default=str)
@@ -0,0 +1,91 @@
+"""
+Monte Carlo Robustness Analysis
+Resamples the closed-trade P&L sequence of a backtest to estimate how bad drawdowns can get.
+"""
+
+import numpy as np
+
+from .trade_ledger import TradeLedger
+
+
+class MonteCarloAnalyzer:
+    """
+    profits: closed-trade P&L in execution order (a TradeLedger or trades list is accepted too).
+
+    method='bootstrap' draws trades with replacement, method='shuffle' permutes the original
+    sequence (same total, different ordering). All paths of a block are simulated as one 2D
+    array: cumulative sum along axis 1, then a running maximum for the drawdown.
+
+    Ruin is an equity drawdown of at least initial_balance * ruin_fraction; without an
+    initial_balance the report only gives drawdown percentiles and the chance of exceeding
+    the backtest's own max drawdown.
+    """
+
+    PERCENTILES = (5, 25, 50, 75, 95, 99)
+    BLOCK_ELEMENTS = 4_000_000  # caps a block at ~32MB of float64 regardless of path count
+
+    def __init__(self, profits, paths=10000, method='bootstrap', initial_balance=None,
+                 ruin_fraction=0.5, seed=None):
+        if method not in ('bootstrap', 'shuffle'):
+            raise ValueError(f"Unknown Monte Carlo method '{method}'")
+        if isinstance(profits, TradeLedger):
+            profits = profits.profits()
+        elif len(profits) and isinstance(profits[0], dict):
+            profits = [t['profit'] for t in profits if 'profit' in t]
+        self.profits = np.asarray(profits, dtype=np.float64)
+        self.paths = paths
+        self.method = method
+        self.initial_balance = initial_balance
+        self.ruin_fraction = ruin_fraction
+        self.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def max_drawdowns(pnl):
+        """Max drawdown of each row of a (paths x trades) P&L matrix, measured from a zero start."""
+        equity = np.cumsum(pnl, axis=1)
+        peaks = np.maximum.accumulate(equity, axis=1)
+        np.maximum(peaks, 0, out=peaks)
+        return (peaks - equity).max(axis=1)
+
+    def _sample(self, rows):
+        n = len(self.profits)
+        if self.method == 'bootstrap':
+            return self.profits[self.rng.integers(0, n, size=(rows, n))]
+        return self.rng.permuted(np.broadcast_to(self.profits, (rows, n)), axis=1)
+
+    def run(self):
+        n = len(self.profits)
+        if n == 0:
+            return {"paths": 0, "trades": 0}
+
+        block = max(1, self.BLOCK_ELEMENTS // n)
+        drawdowns = np.empty(self.paths)
+        finals = np.empty(self.paths)
+        for start in range(0, self.paths, block):
+            rows = min(block, self.paths - start)
+            pnl = self._sample(rows)
+            drawdowns[start:start + rows] = self.max_drawdowns(pnl)
+            finals[start:start + rows] = pnl.sum(axis=1)
+
+        historical_dd = float(self.max_drawdowns(self.profits[None, :])[0])
+        report = {
+            "paths": self.paths,
+            "trades": n,
+            "method": self.method,
+            "historical_max_drawdown": round(historical_dd, 5),
+            "max_drawdown_percentiles": self._percentiles(drawdowns),
+            "final_pnl_percentiles": self._percentiles(finals),
+            "prob_worse_drawdown": round(float((drawdowns > historical_dd).mean()), 4),
+            "prob_loss": round(float((finals < 0).mean()), 4),
+        }
+        if self.initial_balance:
+            ruin_level = self.initial_balance * self.ruin_fraction
+            ruined = drawdowns >= ruin_level
+            report["ruin_level"] = round(ruin_level, 5)
+            report["ruin_probability"] = round(float(ruined.mean()), 4)
+            report["max_drawdown_pct_percentiles"] = self._percentiles(drawdowns / self.initial_balance * 100)
+        return report
+
+    def _percentiles(self, values):
+        points = np.percentile(values, self.PERCENTILES)
+        return {f"p{p}": round(float(v), 5) for p, v in zip(self.PERCENTILES, points)}
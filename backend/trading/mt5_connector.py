@@ -327,7 +327,8 @@ class MT5Connector:
             result = mt5.order_send(request)
             if result is None:
                 return {"error": str(mt5.last_error())}
-            return result._asdict()
+            # The quote the order was sent against, for recording spread and slippage
+            return {**result._asdict(), "bid": tick.bid, "ask": tick.ask, "requested_price": fill_price}
         except Exception as e:
             return {"error": str(e)}
 
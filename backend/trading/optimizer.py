@@ -0,0 +1,340 @@
+"""
+Parameter Optimizer
+Sample-efficient search over rule and risk parameters: a TPE-style sampler proposes batches of
+candidates that are backtested in parallel, and every finished trial is appended to a study file
+so an interrupted optimization resumes where it stopped.
+"""
+
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .backtester import Backtester
+from .indicator_engine import INDICATOR_CACHE
+from .indicator_graph import IndicatorGraph
+from .intrabar import IntrabarExitEngine
+from .parameter_sweep import PRICE_ROWS, ParameterSweep
+from .rule_compiler import FAMILIES, indicator_columns
+from .walk_forward import _plain
+
+RISK_PARAMS = ('sl', 'tp')
+
+# Worker-side evaluator, set up once per process by _init_worker
+_worker = {}
+
+
+def _init_worker(data, sub_bars, point, costs):
+    _worker['evaluator'] = TrialEvaluator(data, sub_bars, point, costs)
+
+
+def _evaluate_trial(params):
+    return _worker['evaluator'](params)
+
+
+class TrialEvaluator:
+    """
+    Backtests one parameter set ({family: params, 'risk': {'sl', 'tp'}}) and returns its metrics.
+    Indicator columns are cached per variant and SL/TP engines per (sl, tp), so a process only
+    computes each of them once however many trials it runs.
+    """
+
+    def __init__(self, data, sub_bars=None, point=0.00001, costs=None):
+        self.data = data
+        self.sub_bars = sub_bars
+        self.point = point
+        self.costs = costs
+        self.prices = {name: data[name].to_numpy(dtype=np.float64) for name in PRICE_ROWS}
+        self.bar_times = Backtester._bar_times(data)
+        self.graph = IndicatorGraph(data)
+        self._columns = {}
+        self._stops = {}
+
+    def columns(self, rules):
+        columns = dict(self.prices)
+        for family, params in rules.items():
+            key = ParameterSweep.variant_key(family, params)
+            if key not in self._columns:
+                self._columns[key] = {
+                    name: np.asarray(values, dtype=np.float64)
+                    for name, values in indicator_columns(self.data, family, params, self.graph).items()
+                }
+            columns.update(self._columns[key])
+        return columns
+
+    def stops(self, risk):
+        key = (risk.get('sl') or 0, risk.get('tp') or 0)
+        if not any(key):
+            return None
+        if key not in self._stops:
+            if not self._stops:
+                # Frame bars outside the sub-bars (or all of them without any) resolve at bar level
+                self.sub_bars, _ = IntrabarExitEngine.with_frame_bars(self.data, self.sub_bars)
+            self._stops[key] = IntrabarExitEngine(self.data['time'], self.sub_bars, key[0], key[1], self.point)
+        return self._stops[key]
+
+    def __call__(self, params):
+        rules = {family: p for family, p in params.items() if family != 'risk'}
+        trades = Backtester.run_arrays(self.columns(rules), rules, stops=self.stops(params.get('risk') or {}))
+        if self.costs is not None:
+            Backtester._charge_costs(self.costs, trades, self.bar_times)
+        return _plain(Backtester.compute_metrics(trades))
+
+
+class StudyStore:
+    """
+    One JSON-lines file per study under trading_data/studies: a header line describing the search,
+    then one line per finished trial. Trials are appended as each batch completes, so an
+    interrupted run loses at most the batch in flight.
+    """
+
+    def __init__(self, name, root=None):
+        self.name = name
+        self.path = Path(root or self.default_dir()) / f"{name}.jsonl"
+
+    @staticmethod
+    def default_dir():
+        try:
+            from django.conf import settings
+            base_dir = Path(settings.BASE_DIR)
+        except Exception:
+            base_dir = Path(__file__).resolve().parent.parent
+        return base_dir / "trading_data" / "studies"
+
+    def load(self):
+        """(header, trials); (None, []) for a new study. A truncated last line is ignored."""
+        if not self.path.exists():
+            return None, []
+        header, trials = None, []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if header is None:
+                    header = record
+                else:
+                    trials.append(record)
+        return header, trials
+
+    def create(self, header):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            f.write(json.dumps(header, sort_keys=True) + "\n")
+
+    def append(self, trials):
+        with open(self.path, "a") as f:
+            for trial in trials:
+                f.write(json.dumps(trial, sort_keys=True) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class ParameterOptimizer:
+    """
+    space: {family: {param: [values]}} in the ParameterSweep format, plus an optional
+    'risk': {'sl': [...], 'tp': [...]} (points, as in risk_settings). Scalars and single-value
+    lists are fixed parameters.
+
+    The first n_startup trials are drawn uniformly; after that each batch is proposed by a
+    Tree-structured Parzen Estimator over the discrete choices: trials are split into the best
+    `gamma` fraction and the rest, each dimension gets a smoothed categorical density for both
+    groups, and the unseen candidates with the highest good/bad density ratio are evaluated.
+    Trials with fewer than min_trades trades rank below every scored trial.
+
+    study: name of a StudyStore; finished trials are reloaded from it so a rerun only evaluates
+    the remaining ones. The study header fingerprints the data, so a study made for another
+    symbol or date range is never resumed: the run continues under a derived name instead.
+    SL/TP are resolved on sub_bars (e.g. stored M1 history) and on the frame's own bars where those
+    do not reach; costs is an optional TransactionCostModel charged to every trial.
+    """
+
+    CANDIDATES_PER_TRIAL = 24
+
+    def __init__(self, data, space, metric='win_rate', trials=100, batch_size=None, workers=None,
+                 min_trades=5, n_startup=None, gamma=0.25, seed=0, study=None, symbol=None,
+                 sub_bars=None, costs=None):
+        unknown = [family for family in space if family not in FAMILIES and family != 'risk']
+        if unknown:
+            raise ValueError(f"Unknown parameter families {unknown}, expected some of {FAMILIES} or 'risk'")
+        bad_risk = [p for p in (space.get('risk') or {}) if p not in RISK_PARAMS]
+        if bad_risk:
+            raise ValueError(f"Unknown risk parameters {bad_risk}, expected some of {RISK_PARAMS}")
+
+        self.data = data
+        self.space = space
+        self.metric = metric
+        self.trials = trials
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size or self.workers
+        self.min_trades = min_trades
+        self.n_startup = n_startup if n_startup is not None else max(10, 2 * self.batch_size)
+        self.gamma = gamma
+        self.seed = seed
+        self.store = StudyStore(study) if study else None
+        self.symbol = symbol
+        self.point = IntrabarExitEngine.default_point(symbol) if symbol else 0.00001
+        self.sub_bars = sub_bars
+        self.costs = costs
+
+        self.fixed = {}
+        self.dimensions = []
+        for family, params in space.items():
+            self.fixed[family] = {}
+            for name, values in (params or {}).items():
+                values = list(values) if isinstance(values, (list, tuple)) else [values]
+                if len(values) == 1:
+                    self.fixed[family][name] = values[0]
+                else:
+                    self.dimensions.append((family, name, values))
+        self.sizes = np.array([len(values) for _, _, values in self.dimensions], dtype=np.int64)
+
+    @property
+    def space_size(self):
+        return int(np.prod(self.sizes)) if len(self.sizes) else 1
+
+    def params_of(self, choice):
+        """Nested parameter dict for a vector of value indexes (one per dimension)."""
+        params = {family: dict(fixed) for family, fixed in self.fixed.items()}
+        for (family, name, values), index in zip(self.dimensions, choice):
+            params[family][name] = values[int(index)]
+        return params
+
+    def score(self, metrics):
+        if metrics.get('total_trades', 0) < self.min_trades:
+            return None
+        return metrics.get(self.metric, 0)
+
+    def _uniform(self, rng, count, seen):
+        if self.space_size <= count * 4 + len(seen):
+            # Small space: enumerate what is left instead of rejection sampling
+            remaining = [
+                c for c in np.ndindex(*self.sizes) if c not in seen
+            ] if len(self.sizes) else ([()] if () not in seen else [])
+            rng.shuffle(remaining)
+            return [tuple(int(i) for i in c) for c in remaining[:count]]
+
+        picked = []
+        while len(picked) < count:
+            choice = tuple(int(i) for i in rng.integers(0, self.sizes))
+            if choice not in seen:
+                seen.add(choice)
+                picked.append(choice)
+        return picked
+
+    def suggest(self, trials, count, rng):
+        """Up to `count` unseen choice vectors for the next batch."""
+        seen = {tuple(t['choice']) for t in trials}
+        if len(trials) < self.n_startup or not len(self.sizes):
+            return self._uniform(rng, count, set(seen))
+
+        ranked = sorted(trials, key=lambda t: -math.inf if t['score'] is None else t['score'], reverse=True)
+        choices = np.array([t['choice'] for t in ranked], dtype=np.int64)
+        n_good = max(1, int(math.ceil(self.gamma * len(ranked))))
+        good, bad = choices[:n_good], choices[n_good:]
+
+        samples = np.empty((count * self.CANDIDATES_PER_TRIAL, len(self.sizes)), dtype=np.int64)
+        log_ratio = np.zeros(len(samples))
+        for d, size in enumerate(self.sizes):
+            # Laplace-smoothed categorical densities of the good and the bad group
+            l = (np.bincount(good[:, d], minlength=size) + 1) / (len(good) + size)
+            g = (np.bincount(bad[:, d], minlength=size) + 1) / (len(bad) + size)
+            samples[:, d] = rng.choice(size, size=len(samples), p=l)
+            log_ratio += np.log(l[samples[:, d]]) - np.log(g[samples[:, d]])
+
+        picked = []
+        for i in np.argsort(-log_ratio, kind='stable'):
+            choice = tuple(int(v) for v in samples[i])
+            if choice not in seen:
+                seen.add(choice)
+                picked.append(choice)
+                if len(picked) == count:
+                    return picked
+        # The good region is exhausted; explore elsewhere
+        return picked + self._uniform(rng, count - len(picked), seen)
+
+    def _header(self):
+        data = self.data
+        times = data['time'] if 'time' in data.columns and len(data) else None
+        return json.loads(json.dumps({
+            'space': self.space, 'metric': self.metric, 'min_trades': self.min_trades,
+            'symbol': self.symbol, 'bars': len(data),
+            'start': str(times.iloc[0]) if times is not None else None,
+            'end': str(times.iloc[-1]) if times is not None else None,
+            # Same prices too: equal bar counts over another range or symbol must not resume
+            'data': INDICATOR_CACHE.fingerprint(data),
+        }, sort_keys=True, default=str))
+
+    def _open_study(self):
+        """
+        Loads the study's finished trials. A study of the same name made for another search or
+        data set is left alone and this one continues under a name derived from its header.
+        """
+        header = self._header()
+        stored, trials = self.store.load()
+        if stored is not None and stored != header:
+            digest = hashlib.blake2b(json.dumps(header, sort_keys=True).encode(), digest_size=5).hexdigest()
+            print(f"DEBUG: Study '{self.store.name}' belongs to another search or data set, using '{self.store.name}-{digest}'")
+            self.store = StudyStore(f"{self.store.name}-{digest}", root=self.store.path.parent)
+            stored, trials = self.store.load()
+        if stored is None:
+            self.store.create(header)
+        return trials
+
+    def run(self):
+        trials = self._open_study() if self.store is not None else []
+        resumed = len(trials)
+
+        # Seeded by the trial count as well, so a resumed study does not replay its first batch
+        rng = np.random.default_rng([self.seed, resumed])
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.data, self.sub_bars, self.point, self.costs)
+            )
+        evaluator = None if pool else TrialEvaluator(self.data, self.sub_bars, self.point, self.costs)
+
+        try:
+            while len(trials) < min(self.trials, self.space_size):
+                choices = self.suggest(trials, min(self.batch_size, self.trials - len(trials)), rng)
+                if not choices:
+                    break
+                batch = [self.params_of(c) for c in choices]
+                results = list(pool.map(_evaluate_trial, batch)) if pool else [evaluator(p) for p in batch]
+                finished = [
+                    {'number': len(trials) + i, 'choice': list(c), 'params': p, 'metrics': m, 'score': self.score(m)}
+                    for i, (c, p, m) in enumerate(zip(choices, batch, results))
+                ]
+                if self.store is not None:
+                    self.store.append(finished)
+                trials.extend(finished)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        return self.summarize(trials, resumed)
+
+    def summarize(self, trials, resumed=0, top=5):
+        """JSON-ready report: the best trials plus how much of the space was searched."""
+        scored = sorted((t for t in trials if t['score'] is not None), key=lambda t: t['score'], reverse=True)
+        return {
+            'metric': self.metric,
+            'best': scored[0] if scored else None,
+            'top': scored[:top],
+            'trials': len(trials),
+            'resumed': resumed,
+            'study': self.store.name if self.store is not None else None,
+            'space_size': self.space_size,
+        }
+
+    def best_params(self):
+        """Parameters of the best trial, or None when nothing reached min_trades."""
+        best = self.run()['best']
+        return best['params'] if best else None
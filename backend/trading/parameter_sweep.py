@@ -0,0 +1,181 @@
+"""
+Parallel Parameter Sweep for Rule-Based Strategies
+Runs every combination of a parameter grid through the vectorized Backtester on a process pool.
+"""
+
+import itertools
+import os
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .backtester import Backtester
+from .indicator_graph import IndicatorGraph
+from .rule_compiler import VARIANT_PARAMS, batched_indicator_columns
+
+# Price rows every job can read, ahead of the indicator variants
+PRICE_ROWS = ('close', 'high', 'low')
+
+# Worker-side view of the shared column matrix, set up once per process by _init_worker
+_shared = {}
+
+
+def _init_worker(shm_name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _shared['shm'] = shm
+    _shared['matrix'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def shared_matrix(matrix=None):
+    """The column matrix inside a pool worker, or the given matrix when running inline."""
+    return _shared['matrix'] if matrix is None else matrix
+
+
+def evaluate_jobs(jobs, matrix=None, start=0, end=None):
+    """
+    jobs: list of (rules, {column_name: matrix_row}) pairs. Returns metrics per job.
+    start/end restrict the backtest to a bar range of the precomputed columns.
+    """
+    matrix = shared_matrix(matrix)
+    results = []
+    for rules, column_rows in jobs:
+        columns = {name: matrix[row, start:end] for name, row in column_rows.items()}
+        trades = Backtester.run_arrays(columns, rules)
+        results.append(Backtester.compute_metrics(trades))
+    return results
+
+
+@contextmanager
+def shared_matrix_pool(matrix, workers):
+    """
+    Process pool whose workers see `matrix` through shared memory (read it with shared_matrix()).
+    The matrix is copied into the segment once instead of being pickled to every task.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+    try:
+        shared = np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=shm.buf)
+        shared[:] = matrix
+        del shared
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shm.name, matrix.shape, matrix.dtype)
+        ) as pool:
+            yield pool
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+class ParameterSweep:
+    """
+    param_grid: {family: {param: [values]}}, e.g.
+        {"rsi": {"period": [7, 14, 21], "buy": [25, 30], "sell": [70, 75]}, "ma": {"period": [20, 50]}}
+    Scalars are accepted in place of single-value lists.
+
+    OHLC and every distinct indicator variant are computed once in the parent and written into one
+    shared-memory matrix, so workers only threshold columns and resolve positions. dtype sets the
+    matrix dtype (default: the ColumnarFrame's compute dtype, else float64); float32 halves its
+    memory, see columnar.tolerance_report for how far results may move.
+    """
+
+    def __init__(self, data, param_grid, metric='total_profit', workers=None, min_trades=1, dtype=None):
+        self.data = data
+        self.dtype = np.dtype(dtype or getattr(data, 'dtype', np.float64))
+        self.param_grid = param_grid
+        self.metric = metric
+        self.workers = workers or os.cpu_count() or 1
+        self.min_trades = min_trades
+
+    def combinations(self):
+        """Expands the grid into a list of rules dicts."""
+        families = []
+        for family, params in self.param_grid.items():
+            if family not in VARIANT_PARAMS:
+                raise ValueError(f"Indicator '{family}' is not supported by the backtester")
+            names = list(params.keys())
+            values = [v if isinstance(v, (list, tuple)) else [v] for v in params.values()]
+            families.append([(family, dict(zip(names, combo))) for combo in itertools.product(*values)])
+
+        return [dict(combo) for combo in itertools.product(*families)]
+
+    @staticmethod
+    def variant_key(family, params):
+        return (family,) + tuple(params.get(p) for p in VARIANT_PARAMS[family])
+
+    def build_matrix(self, combinations):
+        """
+        Computes the price rows (see PRICE_ROWS) and each distinct indicator variant once.
+        Returns (matrix, rows) where rows maps variant_key -> {column_name: matrix_row}.
+
+        RSI and MA periods are computed together by the multi-period kernels; the other variants
+        share one IndicatorGraph, so e.g. bands with different devs share their SMA and std.
+        """
+        variants = {}
+        for rules in combinations:
+            for family, params in rules.items():
+                variants.setdefault(self.variant_key(family, params), (family, params))
+        batched = batched_indicator_columns(self.data, list(variants.values()))
+
+        columns = [np.asarray(self.data[name].to_numpy(), dtype=self.dtype) for name in PRICE_ROWS]
+        rows = {}
+        graph = IndicatorGraph(self.data)
+        for i, (key, (family, params)) in enumerate(variants.items()):
+            rows[key] = {}
+            family_columns = batched.get(i) or Backtester.indicator_columns(self.data, family, params, graph)
+            for name, values in family_columns.items():
+                rows[key][name] = len(columns)
+                columns.append(np.asarray(values, dtype=self.dtype))
+        return np.vstack(columns), rows
+
+    def jobs(self, combinations, rows):
+        jobs = []
+        for rules in combinations:
+            column_rows = {name: row for row, name in enumerate(PRICE_ROWS)}
+            for family, params in rules.items():
+                column_rows.update(rows[self.variant_key(family, params)])
+            jobs.append((rules, column_rows))
+        return jobs
+
+    def run(self):
+        """Evaluates every combination and returns [{'rules', 'metrics'}] ranked best first by self.metric."""
+        combinations = self.combinations()
+        if not combinations:
+            return []
+
+        matrix, rows = self.build_matrix(combinations)
+        jobs = self.jobs(combinations, rows)
+
+        if self.workers <= 1 or len(jobs) < 2:
+            metrics = evaluate_jobs(jobs, matrix)
+        else:
+            metrics = self._run_pool(matrix, jobs)
+
+        return self.rank(combinations, metrics)
+
+    def _run_pool(self, matrix, jobs):
+        # A few chunks per worker keeps the pool busy without paying per-job IPC overhead
+        chunk_size = max(1, len(jobs) // (self.workers * 4))
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+        metrics = []
+        with shared_matrix_pool(matrix, self.workers) as pool:
+            for chunk_metrics in pool.map(evaluate_jobs, chunks):
+                metrics.extend(chunk_metrics)
+        return metrics
+
+    def rank(self, combinations, metrics):
+        results = [
+            {'rules': rules, 'metrics': m}
+            for rules, m in zip(combinations, metrics)
+            if m.get('total_trades', 0) >= self.min_trades
+        ]
+        results.sort(key=lambda r: r['metrics'].get(self.metric, 0), reverse=True)
+        return results
+
+    def best_rules(self):
+        """Rules of the top-ranked combination, or None when nothing traded."""
+        results = self.run()
+        return results[0]['rules'] if results else None
@@ -0,0 +1,186 @@
+"""
+Multi-Symbol Portfolio Backtester
+Generates per-symbol trades in parallel worker processes, converts them to account currency,
+then replays them on one time axis under the account guardrails (max concurrent positions,
+correlation exposure).
+"""
+
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .backtester import Backtester
+from .money_management import MoneyManager
+from .trade_ledger import TradeLedger
+
+
+def _symbol_trades(task):
+    """
+    Worker: runs the vectorized backtest for one symbol, with entry/exit times in nanoseconds
+    and 'lots' / 'pnl' filled in account currency by the symbol's MoneyManager.
+    """
+    symbol, data, rules, money = task
+    data = data.reset_index(drop=True)
+    trades = Backtester(data, rules, money=money).run()
+    times = data['time'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    ledger = trades.array
+    ledger['entry_time'] = times[ledger['entry_bar']]
+    ledger['exit_time'] = np.where(ledger['closed'], times[ledger['exit_bar']], 0)
+    trades.datetime_index = True
+    return symbol, trades
+
+
+class PortfolioBacktester:
+    """
+    frames: {symbol: DataFrame with time/OHLC}
+    rules: rules dict used for every symbol; symbol_rules: optional {symbol: rules} overrides
+    risk: risk_settings sizing every symbol through MoneyManager (default: its fixed 0.01 lot);
+    symbol_risk: optional {symbol: risk_settings} overrides. With risk_percent each symbol
+    compounds on its own track from initial_equity.
+    max_concurrent_positions / max_correlation_exposure mirror AccountGuardrail.
+
+    A new entry is skipped while the portfolio already holds max_concurrent_positions, or when
+    an open position's symbol has a return correlation above max_correlation_exposure in the
+    same effective direction (e.g. long EURUSD + long GBPUSD, or long EURUSD + short USDCHF).
+    The correlation is the trailing one over the last correlation_window bars up to the
+    candidate's entry bar, so the gate never sees returns after the entry; it stays open until a
+    full window of history exists.
+
+    Price differences of different symbols are in unrelated units, so the combined equity curve
+    and metrics are in account currency: every symbol's trades are converted by its MoneyManager
+    and the portfolio sums their 'pnl'. Per-symbol metrics keep price units plus their net_pnl.
+    run() returns the accepted trades as one TradeLedger in entry order, with 'symbols' aligned to it.
+    """
+
+    def __init__(self, frames, rules, symbol_rules=None, max_concurrent_positions=3,
+                 max_correlation_exposure=None, workers=None, risk=None, symbol_risk=None,
+                 initial_equity=10000.0, correlation_window=500):
+        self.frames = frames
+        self.rules = rules
+        self.symbol_rules = symbol_rules or {}
+        self.max_concurrent_positions = max_concurrent_positions
+        self.max_correlation_exposure = max_correlation_exposure
+        self.workers = workers or os.cpu_count() or 1
+        self.risk = risk or {}
+        self.symbol_risk = symbol_risk or {}
+        self.initial_equity = float(initial_equity)
+        self.correlation_window = correlation_window
+        self.account_currency = None
+
+    def money(self, symbol):
+        """MoneyManager for one symbol; raises ValueError before any backtest when P&L cannot be converted."""
+        risk = self.symbol_risk.get(symbol, self.risk)
+        return MoneyManager(symbol, risk, initial_equity=self.initial_equity).check()
+
+    def symbol_trades(self):
+        managers = {symbol: self.money(symbol) for symbol in self.frames}
+        currencies = {money.account_currency for money in managers.values()}
+        if len(currencies) > 1:
+            raise ValueError(f"Symbol specs disagree on the account currency: {sorted(currencies)}")
+        self.account_currency = currencies.pop() if currencies else None
+        tasks = [
+            (symbol, df, self.symbol_rules.get(symbol, self.rules), managers[symbol])
+            for symbol, df in self.frames.items()
+        ]
+        if self.workers <= 1 or len(tasks) < 2:
+            return dict(_symbol_trades(task) for task in tasks)
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+            return dict(pool.map(_symbol_trades, tasks))
+
+    def correlations(self):
+        """
+        Trailing pairwise correlation of bar returns over correlation_window bars, aligned on
+        time: a DataFrame indexed by bar time with a (symbol, other) column for each ordered pair.
+        A row only uses returns up to its own bar.
+        """
+        closes = pd.concat(
+            {symbol: df.set_index('time')['close'] for symbol, df in self.frames.items()},
+            axis=1
+        ).sort_index().ffill()
+        returns = closes.pct_change()
+        window = self.correlation_window
+        pairs = {}
+        for a in returns.columns:
+            for b in returns.columns:
+                if a < b:
+                    pairs[(a, b)] = returns[a].rolling(window, min_periods=window).corr(returns[b])
+                    pairs[(b, a)] = pairs[(a, b)]
+        corr = pd.DataFrame(pairs, index=returns.index)
+        corr.index = pd.DatetimeIndex(corr.index)
+        return corr
+
+    def run(self):
+        per_symbol = self.symbol_trades()
+        symbols = list(per_symbol)
+        merged = TradeLedger.concat(per_symbol[s] for s in symbols).array
+        codes = np.repeat(np.arange(len(symbols)), [len(per_symbol[s]) for s in symbols])
+        order = np.argsort(merged['entry_time'], kind='stable')
+
+        corr = corr_times = None
+        if self.max_correlation_exposure is not None and len(self.frames) > 1:
+            corr = self.correlations()
+            corr_times = corr.index.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+        # Open trades hold their slot until the end of the data
+        exit_times = np.where(merged['closed'], merged['exit_time'], np.iinfo(np.int64).max).tolist()
+        entry_times = merged['entry_time'].tolist()
+        sides = merged['side'].tolist()
+        accepted = np.zeros(len(merged), dtype=bool)
+        open_positions = []  # heap of (exit_time, sequence, symbol, side)
+        for i in order.tolist():
+            while open_positions and open_positions[0][0] <= entry_times[i]:
+                heapq.heappop(open_positions)
+
+            if len(open_positions) >= self.max_concurrent_positions:
+                continue
+
+            symbol = symbols[codes[i]]
+            if corr is not None:
+                # Correlation as of the entry bar, never later
+                row = int(np.searchsorted(corr_times, entry_times[i], side='right')) - 1
+                if row >= 0 and self._correlated(corr, row, symbol, sides[i], open_positions):
+                    continue
+
+            heapq.heappush(open_positions, (exit_times[i], i, symbol, sides[i]))
+            accepted[i] = True
+
+        taken = order[accepted[order]]
+        trades = TradeLedger.from_array(merged[taken], datetime_index=True)
+        return {
+            'trades': trades,
+            'symbols': [symbols[c] for c in codes[taken]],
+            'skipped': int(len(merged) - len(taken)),
+            'equity_curve': self.equity_curve(trades),
+            'metrics': self.account_metrics(trades),
+            'per_symbol': {s: Backtester.compute_metrics(t) for s, t in per_symbol.items()},
+        }
+
+    def account_metrics(self, trades):
+        """compute_metrics() over the trades' account-currency 'pnl' instead of price differences."""
+        arr = TradeLedger.coerce(trades).array.copy()
+        arr['profit'] = arr['pnl']
+        metrics = Backtester.compute_metrics(arr, datetime_index=True)
+        metrics['account_currency'] = self.account_currency
+        return metrics
+
+    def _correlated(self, corr, row, symbol, side, open_positions):
+        for _, _, other, other_side in open_positions:
+            if other == symbol:
+                continue
+            rho = corr[(symbol, other)].iat[row]
+            if not np.isnan(rho) and rho * side * other_side > self.max_correlation_exposure:
+                return True
+        return False
+
+    @staticmethod
+    def equity_curve(trades):
+        """Cumulative closed P&L in account currency ('pnl') as a Series indexed by exit time."""
+        closed = TradeLedger.coerce(trades).closed()
+        if not len(closed):
+            return pd.Series(dtype=np.float64)
+        order = np.argsort(closed['exit_time'], kind='stable')
+        times = closed['exit_time'][order].astype('datetime64[ns]')
+        return pd.Series(np.cumsum(closed['pnl'][order]), index=pd.DatetimeIndex(times), name='equity')
@@ -0,0 +1,158 @@
+"""
+Content-Addressed Backtest Result Cache
+Backtests keyed by a fingerprint of the OHLC input plus a canonical hash of the rules, so
+rebuilds, rollbacks and clones on unchanged data skip the engine entirely.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .trade_ledger import TradeLedger
+
+# Bump when engine semantics change so stale results are never served
+CACHE_VERSION = 4
+
+
+class BacktestResultCache:
+    """
+    Entries are compressed .npz files holding the raw trade ledger array (trade_ledger.TRADE_DTYPE)
+    and the metrics JSON. Reads touch the file's mtime; writes evict the least recently
+    used entries until the directory fits in max_bytes.
+    hits / misses count lookups made through this instance.
+    """
+
+    MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = Path(cache_dir) if cache_dir else self.default_dir()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes or self.MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def default_dir():
+        try:
+            from django.conf import settings
+            base_dir = Path(settings.BASE_DIR)
+        except Exception:
+            base_dir = Path(__file__).resolve().parent.parent
+        return base_dir / "trading_data" / "backtest_cache"
+
+    @staticmethod
+    def fingerprint(data):
+        """Hash of the time + OHLC columns as raw bytes."""
+        h = hashlib.sha256()
+        h.update(str(len(data)).encode())
+        if 'time' in data.columns:
+            h.update(np.ascontiguousarray(data['time'].to_numpy(dtype='datetime64[ns]')).tobytes())
+        else:
+            h.update(np.ascontiguousarray(data.index.to_numpy()).astype(str).tobytes())
+        for col in ('open', 'high', 'low', 'close'):
+            h.update(np.ascontiguousarray(data[col].to_numpy(dtype=np.float64)).tobytes())
+        return h.hexdigest()
+
+    @staticmethod
+    def _stops_fingerprint(stops):
+        h = hashlib.sha256()
+        h.update(f"{stops.sl_dist!r}:{stops.tp_dist!r}".encode())
+        for arr in (stops.bar_times, stops.times, stops.open, stops.high, stops.low):
+            h.update(np.ascontiguousarray(arr).tobytes())
+        return h.hexdigest()
+
+    def key(self, data, rules, stops=None, costs=None, money=None):
+        canonical_rules = json.dumps(rules, sort_keys=True, default=str)
+        parts = [str(CACHE_VERSION), self.fingerprint(data), canonical_rules]
+        if stops is not None:
+            parts.append(self._stops_fingerprint(stops))
+        if costs is not None:
+            parts.append(costs.fingerprint())
+        if money is not None:
+            parts.append(money.fingerprint())
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, key):
+        """Returns (trades, metrics) or None."""
+        path = self._path(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as payload:
+                ledger = payload['ledger']
+                meta = json.loads(payload['meta'].tobytes().decode())
+            os.utime(path)
+        except Exception as e:
+            print(f"DEBUG: Dropping unreadable backtest cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        trades = TradeLedger.from_array(ledger, meta['datetime_index'], meta['has_reasons'])
+        return trades, meta['metrics']
+
+    def put(self, key, trades, metrics):
+        trades = TradeLedger.coerce(trades)
+        meta = {
+            'metrics': metrics,
+            'datetime_index': trades.datetime_index,
+            'has_reasons': trades.has_reasons,
+        }
+        path = self._path(key)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(
+                f, ledger=trades.array,
+                meta=np.frombuffer(json.dumps(meta, default=float).encode(), dtype=np.uint8)
+            )
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for p in self.cache_dir.glob("*.npz"):
+            try:
+                st = p.stat()
+                entries.append((st.st_mtime, st.st_size, p))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+    def run(self, backtester, scheduler=None, cpu_budget=None):
+        """
+        Cached equivalent of `trades = bt.run(); metrics = bt.compute_metrics(trades)`.
+        With a BacktestScheduler the run is a budgeted job on its workers; a job stopped by
+        cpu_budget returns its partial result (metrics['partial']) and is not cached.
+        """
+        key = self.key(backtester.data, backtester.rules, backtester.stops, backtester.costs, backtester.money)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        if scheduler is None:
+            trades = backtester.run()
+            metrics = backtester.compute_metrics(trades)
+        else:
+            from .scheduler import BacktestJob
+
+            job = scheduler.run(BacktestJob.from_backtester(backtester, cpu_budget=cpu_budget))
+            if job.status == job.FAILED:
+                raise RuntimeError(f"Backtest job failed: {job.error}")
+            trades, metrics = job.result()
+            if job.status != job.DONE:
+                return trades, metrics
+        self.put(key, trades, metrics)
+        return trades, metrics
@@ -1,5 +1,15 @@
+import ast
+import inspect
 import json
 
+from .rule_compiler import compile_rules
+
+# What runtime_source() embeds in generated bots: the definitions reachable from these names in
+# these modules, minus the batch-only methods live bots never call
+RUNTIME_MODULES = ('streaming_indicators', 'rule_compiler')
+RUNTIME_ROOTS = ('compile_rules',)
+RUNTIME_EXCLUDED = {'CompiledRules': ('indicator_columns', 'evaluate', 'last_signal')}
+
 class RobotGenerator:
     @staticmethod
     def generate_mql5(robot_id, robot_name, symbol, timeframe, rules, risk):
@@ -8,6 +18,8 @@ class RobotGenerator:
         rules: dict of signals, e.g. {'rsi': {'buy': 30, 'sell': 70}, 'ma': {'period': 50, 'type': 'SMA'}}
         risk: dict with lot, sl, tp
         """
+        # Parameters with the rule compiler's defaults filled in, so the EA matches the backtest
+        params = compile_rules(rules).params
         
         # Initialize handles and variables
         init_code = ""
@@ -46,9 +58,9 @@ void SendHeartbeat()
 
         # RSI Implementation
         if 'rsi' in rules:
-            buy_mode = rules['rsi'].get('mode', 'level') # level or divergence
-            buy_val = rules['rsi'].get('buy', 30)
-            sell_val = rules['rsi'].get('sell', 70)
+            buy_mode = params['rsi']['mode'] # level or divergence
+            buy_val = params['rsi']['buy']
+            sell_val = params['rsi']['sell']
             
             logic = f"""
 bool CheckRSI(bool is_buy)
@@ -67,15 +79,15 @@ bool CheckRSI(bool is_buy)
 """
             add_indicator(
                 "RSI", "int handle_rsi;\n",
-                f"   handle_rsi = iRSI(_Symbol, _Period, {rules['rsi'].get('period', 14)}, PRICE_CLOSE);\n",
+                f"   handle_rsi = iRSI(_Symbol, _Period, {params['rsi']['period']}, PRICE_CLOSE);\n",
                 "   IndicatorRelease(handle_rsi);\n",
                 logic, "CheckRSI(true)", "CheckRSI(false)"
             )
 
         # Moving Average Implementation
         if 'ma' in rules:
-            ma_method = rules['ma'].get('type', 'MODE_SMA')
-            slope_needed = rules['ma'].get('slope_confirmation', False)
+            ma_method = params['ma']['type']
+            slope_needed = params['ma']['slope_confirmation']
             
             logic = f"""
 bool CheckMA(bool is_buy)
@@ -95,14 +107,14 @@ bool CheckMA(bool is_buy)
 """
             add_indicator(
                 "MA", "int handle_ma;\n",
-                f"   handle_ma = iMA(_Symbol, _Period, {rules['ma'].get('period', 50)}, 0, {ma_method}, PRICE_CLOSE);\n",
+                f"   handle_ma = iMA(_Symbol, _Period, {params['ma']['period']}, 0, {ma_method}, PRICE_CLOSE);\n",
                 "   IndicatorRelease(handle_ma);\n",
                 logic, "CheckMA(true)", "CheckMA(false)"
             )
 
         # Bollinger Bands Implementation
         if 'bands' in rules:
-             squeeze_check = rules['bands'].get('squeeze_detection', False)
+             squeeze_check = params['bands']['squeeze_detection']
              logic = f"""
 bool CheckBands(bool is_buy)
 {{
@@ -124,7 +136,7 @@ bool CheckBands(bool is_buy)
 """
              add_indicator(
                 "Bands", "int handle_bands;\n",
-                f"   handle_bands = iBands(_Symbol, _Period, {rules['bands'].get('period', 20)}, 0, {rules['bands'].get('dev', 2.0)}, PRICE_CLOSE);\n",
+                f"   handle_bands = iBands(_Symbol, _Period, {params['bands']['period']}, 0, {params['bands']['dev']}, PRICE_CLOSE);\n",
                 "   IndicatorRelease(handle_bands);\n",
                 logic, "CheckBands(true)", "CheckBands(false)"
             )
@@ -151,22 +163,23 @@ bool CheckMACD(bool is_buy)
 
         # Stochastic Implementation
         if 'stoch' in rules:
+            stoch = params['stoch']
             add_indicator(
                 "Stoch",
                 "int handle_stoch;\n",
-                f"   handle_stoch = iStochastic(_Symbol, _Period, 5, 3, 3, MODE_SMA, STO_LOWHIGH);\n"
+                f"   handle_stoch = iStochastic(_Symbol, _Period, {stoch['k_period']}, {stoch['d_period']}, {stoch['slowing']}, MODE_SMA, STO_LOWHIGH);\n"
                 "   if(handle_stoch == INVALID_HANDLE) return(INIT_FAILED);\n",
                 "   IndicatorRelease(handle_stoch);\n",
-                """
+                f"""
 bool CheckStoch(bool is_buy)
-{{
+{{{{
    double main_stoch[], signal_stoch[];
    CopyBuffer(handle_stoch, 0, 0, 2, main_stoch);
    CopyBuffer(handle_stoch, 1, 0, 2, signal_stoch);
    ArraySetAsSeries(main_stoch, true); ArraySetAsSeries(signal_stoch, true);
-   if(is_buy) return main_stoch[0] < 20 && main_stoch[0] > signal_stoch[0];
-   else return main_stoch[0] > 80 && main_stoch[0] < signal_stoch[0];
-}}
+   if(is_buy) return main_stoch[0] < {stoch['buy']} && main_stoch[0] > signal_stoch[0];
+   else return main_stoch[0] > {stoch['sell']} && main_stoch[0] < signal_stoch[0];
+}}}}
 """,
                 "CheckStoch(true)",
                 "CheckStoch(false)"
@@ -283,76 +296,23 @@ void TradeSell()
     def generate_python(robot_name, symbol, timeframe, rules, risk, account_id, password, server):
         """
         Generates Python code using MetaTrader5 library for the strategy.
-        Now includes logic for RSI, MA, MACD, Bollinger Bands, and Stochastic using pandas_ta.
+        Signals for RSI, MA, MACD, Bollinger Bands and Stochastic are evaluated by the embedded
+        rule compiler (see runtime_source), so the bot trades exactly what was backtested. The
+        indicators are seeded once from history and then updated per closed bar by a RuleStream.
         """
         
-        # 1. Build Indicator Calculations and Logic
-        calc_lines = []
-        buy_conds = []
-        sell_conds = []
-
-        # RSI
-        if 'rsi' in rules:
-            p = rules['rsi'].get('period', 14)
-            buy_val = rules['rsi'].get('buy', 30)
-            sell_val = rules['rsi'].get('sell', 70)
-            calc_lines.append(f"    # RSI\n    df['rsi'] = df.ta.rsi(length={p})")
-            buy_conds.append(f"(df['rsi'].iloc[-1] < {buy_val})")
-            sell_conds.append(f"(df['rsi'].iloc[-1] > {sell_val})")
-
-        # MA
-        if 'ma' in rules:
-            p = rules['ma'].get('period', 50)
-            # Default to SMA for simplicity in python script, could check 'type' maps to sma/ema
-            calc_lines.append(f"    # MA\n    df['ma'] = df.ta.sma(length={p})")
-            buy_conds.append("(df['close'].iloc[-1] > df['ma'].iloc[-1])")
-            sell_conds.append("(df['close'].iloc[-1] < df['ma'].iloc[-1])")
-
-        # MACD
-        if 'macd' in rules:
-            # macd(fast=12, slow=26, signal=9) returns columns: MACD_12_26_9, MACDh_12_26_9, MACDs_12_26_9
-            calc_lines.append("    # MACD\n    macd = df.ta.macd(fast=12, slow=26, signal=9)")
-            calc_lines.append("    df = pd.concat([df, macd], axis=1)")
-            # MQL5: buy if main > signal (crossover?) or main > signal 
-            # Simplified Logic: Buy if MACD line > Signal line
-            # Column names from pandas_ta usually: MACD_12_26_9 (Main), MACDs_12_26_9 (Signal)
-            buy_conds.append("(df.iloc[-1]['MACD_12_26_9'] > df.iloc[-1]['MACDs_12_26_9'])")
-            sell_conds.append("(df.iloc[-1]['MACD_12_26_9'] < df.iloc[-1]['MACDs_12_26_9'])")
-
-        # Bollinger Bands
-        if 'bands' in rules:
-            p = rules['bands'].get('period', 20)
-            d = rules['bands'].get('dev', 2.0)
-            # bbands returns BBL, BBM, BBU
-            calc_lines.append(f"    # Bands\n    bands = df.ta.bbands(length={p}, std={d})")
-            calc_lines.append("    df = pd.concat([df, bands], axis=1)")
-            # Columns: BBL_{p}_{d}, BBU_{p}_{d}
-            # Buy if price < Lower, Sell if price > Upper
-            low_col = f"BBL_{p}_{d}"
-            up_col = f"BBU_{p}_{d}"
-            buy_conds.append(f"(df['close'].iloc[-1] < df.iloc[-1]['{low_col}'])")
-            sell_conds.append(f"(df['close'].iloc[-1] > df.iloc[-1]['{up_col}'])")
-
-        # Stochastic
-        if 'stoch' in rules:
-            # stoch(k=5, d=3, smooth_k=3) returns STOCHk, STOCHd
-            calc_lines.append("    # Stoch\n    stoch = df.ta.stoch(k=5, d=3, smooth_k=3)")
-            calc_lines.append("    df = pd.concat([df, stoch], axis=1)")
-            # Columns: STOCHk_5_3_3, STOCHd_5_3_3
-            buy_conds.append("(df.iloc[-1]['STOCHk_5_3_3'] < 20 and df.iloc[-1]['STOCHk_5_3_3'] > df.iloc[-1]['STOCHd_5_3_3'])")
-            sell_conds.append("(df.iloc[-1]['STOCHk_5_3_3'] > 80 and df.iloc[-1]['STOCHk_5_3_3'] < df.iloc[-1]['STOCHd_5_3_3'])")
-
-        # Combine
-        calc_code = "\n".join(calc_lines) if calc_lines else "    pass"
-        buy_expr = " and ".join(buy_conds) if buy_conds else "False"
-        sell_expr = " and ".join(sell_conds) if sell_conds else "False"
+        # Signals come from the same compiled rules the backtester evaluates, embedded in the script
+        compiled = compile_rules(rules)
+        runtime_source = RobotGenerator.runtime_source()
+        rules_json = json.dumps(compiled.params)
 
         # Python script structure
         python_script = f"""
+import json
 import MetaTrader5 as mt5
 import time
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
 from datetime import datetime
 
 # Creds & Settings
@@ -366,6 +326,13 @@ SL_POINTS = {risk.get('sl', 30)}
 TP_POINTS = {risk.get('tp', 60)}
 MT5_PATH = r"C:\\Program Files\\XM Global MT5\\terminal64.exe"  # Update if using different MT5 installation
 
+# --- Streaming rule compiler shared with the backtester ---
+{runtime_source}
+
+RULES = json.loads({json.dumps(rules_json)})
+SIGNALS = compile_rules(RULES)
+HISTORY_BARS = {max(100, compiled.warmup * 2)}
+
 def connect():
     import os
     # Try to get path from environment variable, fallback to default
@@ -375,8 +342,13 @@ def connect():
         return False
     return True
 
-def get_data():
-    rates = mt5.copy_rates_from_pos(SYMBOL, TIMEFRAME, 0, 100)
+# Streaming rule state, seeded on the first call and then fed one closed bar at a time
+STREAM = None
+LAST_BAR = None
+
+def get_data(count=HISTORY_BARS):
+    # Closed bars only (position 1 onwards), like the backtester evaluating at bar close
+    rates = mt5.copy_rates_from_pos(SYMBOL, TIMEFRAME, 1, count)
     if rates is None:
         return None
     df = pd.DataFrame(rates)
@@ -384,17 +356,23 @@ def get_data():
     return df
 
 def signal_check(df):
-    if len(df) < 50: return None
-    
-{calc_code}
-    
-    # Logic Checks
-    if {buy_expr}:
-        return 'buy'
-    elif {sell_expr}:
-        return 'sell'
-        
-    return None
+    global STREAM, LAST_BAR
+    if STREAM is None:
+        if len(df) < SIGNALS.warmup: return None
+        STREAM = SIGNALS.stream(df.iloc[:-1])
+        new_bars = df.iloc[-1:]
+    elif df['time'].iloc[0] > LAST_BAR:
+        # Missed more bars than were fetched (e.g. after a disconnect): reseed on the next call
+        STREAM = None
+        return None
+    else:
+        new_bars = df[df['time'] > LAST_BAR]
+    sig = None
+    for bar in new_bars.to_dict('records'):
+        sig = STREAM.update(bar)
+    if len(new_bars):
+        LAST_BAR = new_bars['time'].iloc[-1]
+    return sig
 
 def execute_trade(signal):
     point = mt5.symbol_info(SYMBOL).point
@@ -430,7 +408,7 @@ def main():
     
     while True:
         try:
-            df = get_data()
+            df = get_data(HISTORY_BARS if STREAM is None else 10)
             if df is not None:
                 sig = signal_check(df)
                 if sig:
@@ -450,6 +428,76 @@ def main():
 if __name__ == "__main__":
     main()
 """
+        return python_script
+
+    @staticmethod
+    def runtime_source():
+        """
+        Source of the streaming signal path a generated bot runs (compile_rules, RuleStream and
+        the streaming indicator states), cut out of RUNTIME_MODULES with an AST pass: only the
+        top-level definitions reachable from RUNTIME_ROOTS are kept, RUNTIME_EXCLUDED methods
+        are dropped, and the modules' imports are replaced by one block of the absolute imports.
+        Raises ValueError when kept code imports another trading module, which the bot lacks.
+        """
+        import importlib
+
+        modules = []
+        for name in RUNTIME_MODULES:
+            source = inspect.getsource(importlib.import_module(f"{__package__}.{name}"))
+            modules.append((name, source.splitlines(), ast.parse(source)))
+
+        imports, definitions = [], {}
+        for name, lines, tree in modules:
+            for node in tree.body:
+                if isinstance(node, (ast.Import, ast.ImportFrom)):
+                    if isinstance(node, ast.Import) or not node.level:
+                        imports.append("\n".join(lines[node.lineno - 1:node.end_lineno]))
+                elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                    definitions[node.name] = node
+                elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                    targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                    for target in targets:
+                        if isinstance(target, ast.Name):
+                            definitions[target.id] = node
+
+        def kept_body(node):
+            excluded = RUNTIME_EXCLUDED.get(getattr(node, 'name', None), ())
+            return [child for child in ast.iter_child_nodes(node) if getattr(child, 'name', None) not in excluded]
+
+        def references(node):
+            names = set()
+            for child in kept_body(node):
+                names.update(n.id for n in ast.walk(child) if isinstance(n, ast.Name))
+            return names
+
+        kept, pending = set(), list(RUNTIME_ROOTS)
+        while pending:
+            node = definitions[pending.pop()]
+            if id(node) in kept:
+                continue
+            kept.add(id(node))
+            for child in kept_body(node):
+                for nested in ast.walk(child):
+                    if isinstance(nested, ast.ImportFrom) and nested.level:
+                        raise ValueError(f"{getattr(node, 'name', 'A runtime definition')} imports .{nested.module}, which generated bots do not embed")
+            pending.extend(name for name in references(node) if name in definitions)
+
+        def segment(lines, node):
+            """Source lines of a top-level node with its decorators and leading comments."""
+            start = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])]) - 1
+            while start > 0 and lines[start - 1].startswith('#'):
+                start -= 1
+            dropped = set()
+            for child in getattr(node, 'body', []):
+                if getattr(child, 'name', None) in RUNTIME_EXCLUDED.get(getattr(node, 'name', None), ()):
+                    first = min([child.lineno] + [d.lineno for d in child.decorator_list]) - 1
+                    dropped.update(range(first, child.end_lineno))
+            return "\n".join(lines[i] for i in range(start, node.end_lineno) if i not in dropped).rstrip()
+
+        parts = ["\n".join(dict.fromkeys(imports))]
+        for name, lines, tree in modules:
+            parts.extend(segment(lines, node) for node in tree.body if id(node) in kept)
+        return "\n\n\n".join(parts) + "\n"
     @staticmethod
     def generate_rnn_colab(robot_name, symbol, years, cloudinary_config):
         """
@@ -0,0 +1,345 @@
+"""
+Strategy Rule Compiler
+Turns a rules dict (rsi / ma / macd / bands / stoch) into one vectorized signal function, so the
+Backtester, the StrategyAnalyzer and the generated Python bots evaluate identical semantics.
+"""
+
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from .indicator_graph import IndicatorGraph
+from .streaming_indicators import StreamingBollingerBands, StreamingEMA, StreamingMACD, StreamingRSI, StreamingSMA, StreamingStochastic
+
+FAMILIES = ('rsi', 'ma', 'macd', 'bands', 'stoch')
+
+# Defaults applied to every family present in a rules dict; the MQL5 generator reads the same values
+DEFAULTS = {
+    'rsi': {'period': 14, 'buy': 30, 'sell': 70, 'mode': 'level'},
+    'ma': {'period': 50, 'type': 'MODE_SMA', 'slope_confirmation': False},
+    'macd': {},
+    'bands': {'period': 20, 'dev': 2.0, 'squeeze_detection': False},
+    'stoch': {'k_period': 5, 'd_period': 3, 'slowing': 3, 'buy': 20, 'sell': 80},
+}
+
+# Parameters that change the indicator series itself; the rest only move thresholds
+VARIANT_PARAMS = {
+    'rsi': ('period',),
+    'ma': ('period', 'type'),
+    'macd': (),
+    'bands': ('period', 'dev'),
+    'stoch': ('k_period', 'd_period', 'slowing'),
+}
+
+# Column names each family reads besides 'close' (and 'high' / 'low' where noted)
+FAMILY_COLUMNS = {
+    'rsi': ('rsi',),
+    'ma': ('ma',),
+    'macd': ('macd', 'macd_signal'),
+    'bands': ('bands_upper', 'bands_middle', 'bands_lower'),
+    'stoch': ('stoch_k', 'stoch_d'),
+}
+
+
+def rules_from_indicators(indicators, settings=None):
+    """
+    Rules dict for a list of indicator names (Robot.indicators), taking each family's parameters
+    from settings[f'{family}_settings'] when given (e.g. the build request payload).
+    """
+    settings = settings or {}
+    return {
+        family: dict(settings.get(f'{family}_settings') or {})
+        for family in FAMILIES if family in (indicators or [])
+    }
+
+
+def compile_rules(rules):
+    """Compiled signal function for a rules dict, memoized by the rules' canonical JSON."""
+    return _compile(json.dumps(rules or {}, sort_keys=True, default=str))
+
+
+@lru_cache(maxsize=256)
+def _compile(canonical_rules):
+    return CompiledRules(json.loads(canonical_rules))
+
+
+def indicator_columns(data, family, params, graph=None):
+    """
+    Indicator columns one rule family reads, keyed by column name (pandas Series). Pass the same
+    IndicatorGraph for every family and variant of a frame to compute shared intermediates once.
+    """
+    params = {**DEFAULTS.get(family, {}), **(params or {})}
+    graph = graph if graph is not None else IndicatorGraph(data)
+    if family == 'rsi':
+        return {'rsi': graph.indicator('rsi', params['period'])}
+    if family == 'ma':
+        return {'ma': graph.indicator('ema' if _is_ema(params['type']) else 'sma', params['period'])}
+    if family == 'macd':
+        macd, signal = graph.indicator('macd')
+        return {'macd': macd, 'macd_signal': signal}
+    if family == 'bands':
+        upper, middle, lower = graph.indicator('bands', params['period'], params['dev'])
+        return {'bands_upper': upper, 'bands_middle': middle, 'bands_lower': lower}
+    if family == 'stoch':
+        k, d = graph.indicator('stoch', params['k_period'], params['d_period'], params['slowing'])
+        return {'stoch_k': k, 'stoch_d': d}
+    return {}
+
+
+def batched_indicator_columns(data, variants):
+    """
+    Columns of many (family, params) variants of one frame at once. RSI, SMA and EMA variants
+    that differ only in period are computed by the multi-period kernels, one pass per kind;
+    kinds with a single period and the other families are left out. Returns {index: columns}
+    for the variants it computed.
+    """
+    # Sweep-only, so it stays out of the runtime embedded in generated bots
+    from .indicator_kernels import ema_matrix, rsi_matrix, sma_matrix
+
+    kinds = {}
+    for i, (family, params) in enumerate(variants):
+        params = {**DEFAULTS.get(family, {}), **(params or {})}
+        if family == 'rsi':
+            kinds.setdefault((rsi_matrix, 'rsi'), {})[i] = int(params['period'])
+        elif family == 'ma':
+            kernel = ema_matrix if _is_ema(params['type']) else sma_matrix
+            kinds.setdefault((kernel, 'ma'), {})[i] = int(params['period'])
+
+    columns = {}
+    for (kernel, name), periods in kinds.items():
+        distinct = sorted(set(periods.values()))
+        if len(distinct) < 2:
+            continue
+        matrix = kernel(data, distinct)
+        for i, period in periods.items():
+            columns[i] = {name: matrix[:, distinct.index(period)]}
+    return columns
+
+
+def indicator_state(family, params):
+    """Streaming counterpart of indicator_columns: update(bar) returns the same columns for one bar."""
+    params = {**DEFAULTS.get(family, {}), **(params or {})}
+    if family == 'rsi':
+        return _ColumnState(StreamingRSI(period=params['period']), ('rsi',))
+    if family == 'ma':
+        state = StreamingEMA if _is_ema(params['type']) else StreamingSMA
+        return _ColumnState(state(period=params['period']), ('ma',))
+    if family == 'macd':
+        return _ColumnState(StreamingMACD(), ('macd', 'macd_signal'))
+    if family == 'bands':
+        return _ColumnState(
+            StreamingBollingerBands(period=params['period'], std=params['dev']),
+            ('bands_upper', 'bands_middle', 'bands_lower')
+        )
+    if family == 'stoch':
+        return _ColumnState(
+            StreamingStochastic(k_period=params['k_period'], d_period=params['d_period'], slowing=params['slowing']),
+            ('stoch_k', 'stoch_d')
+        )
+    raise ValueError(f"Unknown indicator family '{family}'")
+
+
+class _ColumnState:
+    """A streaming indicator whose values are named like the family's indicator columns."""
+
+    def __init__(self, state, names):
+        self.state = state
+        self.names = names
+
+    def _columns(self, values):
+        return dict(zip(self.names, values if len(self.names) > 1 else (values,)))
+
+    @property
+    def current(self):
+        return self._columns(self.state.value)
+
+    def seed(self, data):
+        self.state.seed(data)
+        return self
+
+    def update(self, bar):
+        return self._columns(self.state.update(bar))
+
+
+def _is_ema(ma_type):
+    return str(ma_type).upper() in ('MODE_EMA', 'EMA')
+
+
+def _previous(values):
+    """values shifted one bar forward; bar 0 pairs with the last bar and is masked by the caller."""
+    return np.roll(values, 1)
+
+
+class CompiledRules:
+    """
+    params: the rules with every family's defaults filled in.
+    signals(columns) evaluates all active conditions over whole NumPy columns at once and returns
+    (buy, sell) boolean arrays: every family must agree, NaN (warm-up) never signals and bar 0
+    never signals because it has no previous bar.
+    """
+
+    def __init__(self, rules):
+        unknown = [family for family in rules if family not in FAMILIES]
+        if unknown:
+            raise ValueError(f"Unknown indicator families {unknown}, expected some of {FAMILIES}")
+        self.params = {family: {**DEFAULTS[family], **(rules[family] or {})} for family in FAMILIES if family in rules}
+        self.families = tuple(self.params)
+        self.conditions = [getattr(self, f'_{family}') for family in self.families]
+
+    @property
+    def columns(self):
+        """Every column signals() reads."""
+        names = ['close']
+        for family in self.families:
+            names.extend(FAMILY_COLUMNS[family])
+        if self.params.get('rsi', {}).get('mode') == 'divergence':
+            names.extend(['high', 'low'])
+        return names
+
+    @property
+    def warmup(self):
+        """Bars of history needed before a new bar can be evaluated exactly."""
+        periods = [2]
+        for family, params in self.params.items():
+            if family == 'rsi':
+                periods.append(params['period'] + 2)
+            elif family == 'ma':
+                # An EMA never fully forgets; 10 periods leaves a negligible residual weight
+                period = params['period'] * 10 if _is_ema(params['type']) else params['period']
+                periods.append(period + 1)
+            elif family == 'bands':
+                periods.append(params['period'] + 1)
+            elif family == 'stoch':
+                periods.append(params['k_period'] + params['slowing'] + params['d_period'])
+        return max(periods)
+
+    def indicator_columns(self, data, graph=None):
+        graph = graph if graph is not None else IndicatorGraph(data)
+        columns = {}
+        for family in self.families:
+            columns.update(indicator_columns(data, family, self.params[family], graph))
+        return columns
+
+    def signals(self, columns):
+        n = len(columns['close'])
+        if not self.families or n == 0:
+            return np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+
+        buy = np.ones(n, dtype=bool)
+        sell = np.ones(n, dtype=bool)
+        # NaN comparisons evaluate to False, matching the warm-up behaviour of the reference loop
+        for condition in self.conditions:
+            family_buy, family_sell = condition(columns)
+            buy &= family_buy
+            sell &= family_sell
+        buy[0] = False
+        sell[0] = False
+        return buy, sell
+
+    __call__ = signals
+
+    def evaluate(self, data):
+        """(buy, sell) over an OHLC DataFrame, computing the indicators first."""
+        columns = {name: data[name].to_numpy() for name in ('close', 'high', 'low') if name in data.columns}
+        columns.update({name: np.asarray(values) for name, values in self.indicator_columns(data).items()})
+        return self.signals(columns)
+
+    def last_signal(self, data):
+        """Live evaluation: 'buy', 'sell' or None for the most recent bar of `data`."""
+        buy, sell = self.evaluate(data)
+        if len(buy) and buy[-1]:
+            return 'buy'
+        if len(sell) and sell[-1]:
+            return 'sell'
+        return None
+
+    def stream(self, data=None):
+        """RuleStream over these rules, seeded with the OHLC history in `data` when given."""
+        return RuleStream(self, data)
+
+    def _rsi(self, columns):
+        params = self.params['rsi']
+        rsi = columns['rsi']
+        if params['mode'] == 'divergence':
+            prev_rsi = _previous(rsi)
+            low, high = columns['low'], columns['high']
+            return (
+                (rsi > prev_rsi) & (low < _previous(low)) & (rsi < 40),
+                (rsi < prev_rsi) & (high > _previous(high)) & (rsi > 60),
+            )
+        return rsi < params['buy'], rsi > params['sell']
+
+    def _ma(self, columns):
+        close, ma = columns['close'], columns['ma']
+        buy, sell = close > ma, close < ma
+        if self.params['ma']['slope_confirmation']:
+            prev_ma = _previous(ma)
+            buy &= ma > prev_ma
+            sell &= ma < prev_ma
+        return buy, sell
+
+    def _macd(self, columns):
+        macd, signal = columns['macd'], columns['macd_signal']
+        prev_macd, prev_signal = _previous(macd), _previous(signal)
+        return (
+            (macd > signal) & (prev_macd <= prev_signal),
+            (macd < signal) & (prev_macd >= prev_signal),
+        )
+
+    def _bands(self, columns):
+        close = columns['close']
+        buy, sell = close < columns['bands_lower'], close > columns['bands_upper']
+        if self.params['bands']['squeeze_detection']:
+            width = (columns['bands_upper'] - columns['bands_lower']) / columns['bands_middle']
+            squeezing = width <= _previous(width)
+            buy &= squeezing
+            sell &= squeezing
+        return buy, sell
+
+    def _stoch(self, columns):
+        params = self.params['stoch']
+        k, d = columns['stoch_k'], columns['stoch_d']
+        return (k < params['buy']) & (k > d), (k > params['sell']) & (k < d)
+
+
+class RuleStream:
+    """
+    Live counterpart of CompiledRules.last_signal for one robot. It keeps a streaming state per
+    family plus the previous bar's columns, so each new closed bar costs O(1) instead of a rolling
+    pass over the whole history. update(bar) runs the compiled conditions on just the previous and
+    the new bar, so the signal matches evaluate() on the full series for the same bar.
+    """
+
+    def __init__(self, compiled, data=None):
+        self.compiled = compiled
+        self.prices = [name for name in ('close', 'high', 'low') if name in compiled.columns]
+        self.states = [indicator_state(family, compiled.params[family]) for family in compiled.families]
+        self.previous = None
+        if data is not None and len(data):
+            self.seed(data)
+
+    def seed(self, data):
+        """Primes every state with the history in `data`; the last row becomes the previous bar."""
+        last = data.iloc[-1]
+        self.previous = {name: float(last[name]) for name in self.prices}
+        for state in self.states:
+            self.previous.update(state.seed(data).current)
+        return self
+
+    def update(self, bar):
+        """Feeds one closed bar; returns 'buy', 'sell' or None for it."""
+        current = {name: float(bar[name]) for name in self.prices}
+        for state in self.states:
+            current.update(state.update(bar))
+        previous, self.previous = self.previous, current
+        if previous is None:
+            # The first bar ever has no previous bar and never signals, as in signals()
+            return None
+
+        buy, sell = self.compiled.signals({name: np.array([previous[name], current[name]]) for name in current})
+        if buy[1]:
+            return 'buy'
+        if sell[1]:
+            return 'sell'
+        return None
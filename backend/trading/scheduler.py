@@ -0,0 +1,243 @@
+"""
+Budgeted Backtest Scheduler
+Runs backtests as resumable jobs on a fixed pool of worker threads: each job advances one chunk
+of bars at a time from its checkpoint, yields its worker after a CPU-time quantum and stops at
+its CPU budget, so concurrent robot builds share the CPU predictably.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+
+from .backtester import Backtester, IncrementalBacktest
+
+
+class BacktestJob:
+    """
+    One backtest advanced chunk_bars at a time through an IncrementalBacktest.
+
+    cpu_budget: seconds of thread CPU time the job may use in total; it then stops with status
+    BUDGET_EXHAUSTED and result() covers the bars tested so far. limit: only the first `limit`
+    bars are tested until extend() raises it (successive halving); the job is PAUSED meanwhile.
+    money: optional MoneyManager, applied to the finished ledger.
+    """
+
+    PENDING, RUNNING, PAUSED, DONE, BUDGET_EXHAUSTED, FAILED = (
+        'PENDING', 'RUNNING', 'PAUSED', 'DONE', 'BUDGET_EXHAUSTED', 'FAILED'
+    )
+    CHUNK_BARS = 5000
+
+    def __init__(self, data, rules, stops_factory=None, costs=None, money=None, cpu_budget=None,
+                 chunk_bars=None, limit=None, name=None):
+        self.data = data
+        self.rules = rules
+        self.money = money
+        self.cpu_budget = cpu_budget
+        self.chunk_bars = chunk_bars or self.CHUNK_BARS
+        self.limit = len(data) if limit is None else min(limit, len(data))
+        self.name = name
+        self.run = IncrementalBacktest(rules, stops_factory=stops_factory, costs=costs)
+        self.status = self.PENDING
+        self.cpu_time = 0.0
+        self.slices = 0
+        self.error = None
+        self._settled = threading.Event()
+
+    @classmethod
+    def from_backtester(cls, bt, **kwargs):
+        """Job equivalent of bt.run() (vectorized mode), stops re-bound to each chunk."""
+        stops_factory = (lambda frame: bt.stops.rebind(frame['time'])) if bt.stops is not None else None
+        return cls(bt.data, bt.rules, stops_factory=stops_factory, costs=bt.costs, money=bt.money, **kwargs)
+
+    @property
+    def position(self):
+        """Bars tested so far."""
+        return self.run.bars
+
+    def step(self):
+        """Tests the next chunk; returns the thread CPU seconds it took."""
+        started = time.thread_time()
+        end = min(self.position + self.chunk_bars, self.limit)
+        self.run.feed(self.data.iloc[self.position:end])
+        used = time.thread_time() - started
+        self.cpu_time += used
+        return used
+
+    def extend(self, limit):
+        """Allows testing up to `limit` bars; a paused job becomes runnable again."""
+        self.limit = min(limit, len(self.data))
+        if self.status == self.PAUSED and self.position < self.limit:
+            self.status = self.PENDING
+            self._settled.clear()
+
+    def _settle(self, status):
+        self.status = status
+        self._settled.set()
+
+    def wait(self, timeout=None):
+        return self._settled.wait(timeout)
+
+    def result(self):
+        """(trades, metrics) over the bars tested; metrics flag a run that stopped early."""
+        trades, metrics = self.run.result()
+        if self.money is not None:
+            self.money.apply(trades)
+            metrics = Backtester.compute_metrics(trades)
+        if self.position < len(self.data):
+            metrics = {**metrics, 'partial': True, 'bars_tested': self.position}
+        return trades, metrics
+
+
+class BacktestScheduler:
+    """
+    Fair-share scheduler over `workers` threads. Ready jobs are ordered by CPU time used so far,
+    so a new small job runs before a long one that already had its share; a worker runs a job's
+    chunks until it has used `quantum` CPU seconds, then pre-empts it back into the queue.
+    Pre-emption is cooperative: a chunk always finishes, so chunk_bars bounds the latency.
+    """
+
+    def __init__(self, workers=None, quantum=0.5):
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.quantum = quantum
+        self._queue = []
+        self._order = itertools.count()
+        self._lock = threading.Condition()
+        self._threads = []
+        self._closed = False
+
+    def _start(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"backtest-worker-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, job):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            if job.status in (job.FAILED, job.BUDGET_EXHAUSTED) or job.position >= job.limit:
+                # Nothing left to run until the job is extended
+                job._settled.set()
+                return job
+            self._start()
+            job._settled.clear()
+            job.status = job.PENDING
+            heapq.heappush(self._queue, (job.cpu_time, next(self._order), job))
+            self._lock.notify()
+        return job
+
+    def run(self, job, timeout=None):
+        """Submits a job and blocks until it is done, paused at its limit or out of budget."""
+        self.submit(job)
+        job.wait(timeout)
+        return job
+
+    def _next(self):
+        with self._lock:
+            while not self._queue and not self._closed:
+                self._lock.wait()
+            if self._closed:
+                return None
+            return heapq.heappop(self._queue)[2]
+
+    def _work(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            job.status = job.RUNNING
+            job.slices += 1
+            used = 0.0
+            try:
+                while job.position < job.limit and used < self.quantum:
+                    if job.cpu_budget is not None and job.cpu_time >= job.cpu_budget:
+                        break
+                    used += job.step()
+            except Exception as e:
+                job.error = str(e)
+                job._settle(job.FAILED)
+                continue
+
+            if job.position >= len(job.data):
+                job._settle(job.DONE)
+            elif job.cpu_budget is not None and job.cpu_time >= job.cpu_budget:
+                job._settle(job.BUDGET_EXHAUSTED)
+            elif job.position >= job.limit:
+                job._settle(job.PAUSED)
+            else:
+                # Quantum used up: back into the queue behind jobs that had less CPU so far
+                with self._lock:
+                    job.status = job.PENDING
+                    heapq.heappush(self._queue, (job.cpu_time, next(self._order), job))
+                    self._lock.notify()
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def successive_halving(self, data, candidates, min_bars=None, eta=3, metric='win_rate',
+                           min_trades=1, cpu_budget=None, stops_factory=None, costs=None):
+        """
+        Tests every rules dict in `candidates` on the first min_bars bars, keeps the best 1/eta
+        and resumes only those over eta times more bars, until one rung covers all of `data`.
+        Survivors continue from their checkpoints, so no bar is tested twice per candidate.
+        Returns {'rungs': [...], 'results': [{'rules', 'metrics'}] best first}.
+        """
+        n = len(data)
+        rungs = max(1, int(math.ceil(math.log(max(len(candidates), 1), eta)))) if len(candidates) > 1 else 1
+        min_bars = min_bars or max(-(-n // eta ** (rungs - 1)), 1)
+        jobs = [
+            BacktestJob(data, rules, stops_factory=stops_factory, costs=costs, cpu_budget=cpu_budget,
+                        limit=min_bars, name=str(i))
+            for i, rules in enumerate(candidates)
+        ]
+
+        def score(job):
+            metrics = job.result()[1]
+            if job.status in (job.FAILED, job.BUDGET_EXHAUSTED) or metrics.get('total_trades', 0) < min_trades:
+                return -math.inf
+            return metrics.get(metric) or 0
+
+        report = []
+        limit = min_bars
+        alive = jobs
+        while True:
+            for job in alive:
+                job.extend(limit)
+                self.submit(job)
+            for job in alive:
+                job.wait()
+            ranked = sorted(alive, key=score, reverse=True)
+            if limit >= n:
+                report.append({'bars': n, 'candidates': len(ranked), 'kept': len(ranked)})
+                alive = ranked
+                break
+            alive = ranked[:max(1, len(ranked) // eta)]
+            report.append({'bars': limit, 'candidates': len(ranked), 'kept': len(alive)})
+            # A lone survivor goes straight to the full history
+            limit = n if len(alive) == 1 else min(limit * eta, n)
+
+        results = []
+        for job in alive:
+            trades, metrics = job.result()
+            results.append({'rules': job.rules, 'metrics': metrics, 'status': job.status})
+        return {'rungs': report, 'results': results}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler():
+    """Process-wide scheduler shared by every build thread."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = BacktestScheduler()
+        return _default
@@ -3,6 +3,7 @@ import numpy as np
 import math
 from datetime import datetime, timedelta
 from .data_service import HistoricalDataService
+from .rule_compiler import compile_rules, rules_from_indicators
 
 class StrategyAnalyzer:
     """
@@ -16,6 +17,17 @@ class StrategyAnalyzer:
         self.session_pref = robot.session_preference
         self.symbol = robot.symbol
         self.indicators = robot.indicators # List from JSON
+        self.rules = self.robot_rules(robot)
+
+    @staticmethod
+    def robot_rules(robot):
+        """
+        Rules the robot was built with (kept in its backtest checkpoint), else defaults for its
+        indicator list; a plain 50-period MA trend context when neither is available.
+        """
+        checkpoint = getattr(robot, 'backtest_checkpoint', None) or {}
+        rules = checkpoint.get('rules') or rules_from_indicators(robot.indicators)
+        return rules or {'ma': {'period': 50}}
 
     def analyze(self):
         """
@@ -44,29 +56,7 @@ class StrategyAnalyzer:
         # Normalize Data (ensure session column exists)
         df = self.normalize_data(df)
         
-        # 2. Add technical indicators (using pandas_ta if available or custom)
-        # ... rest of analysis logic ...
-    
-    def normalize_data(self, df):
-        """Add session and time features"""
-        if df.empty: return df
-        df['hour'] = df['time'].dt.hour
-        df['day_of_week'] = df['time'].dt.dayofweek
-        
-        # Simple session marking (UTC assumed for simplicity)
-        # Asia: 0-8, London: 8-16, NY: 13-21
-        conditions = [
-            (df['hour'] >= 0) & (df['hour'] < 8),
-            (df['hour'] >= 8) & (df['hour'] < 16),
-            (df['hour'] >= 13) & (df['hour'] < 21)
-        ]
-        choices = ['ASIA', 'LONDON', 'NY']
-        df['session'] = np.select(conditions, choices, default='OTHER')
-        return df
-        
-        # 2. Add technical indicators (using pandas_ta if available or custom)
-        # This part assumes we have a way to calculate them. 
-        # For this prototype, we'll simulate indicator signals.
+        # 2. Add technical indicators (computed by the rule compiler in step 4)
         
         # 3. Calculate Weights
         now = datetime.now()
@@ -89,17 +79,11 @@ class StrategyAnalyzer:
             
         df['total_weight'] = df['recency_weight'] * df['session_weight']
         
-        # 4. Simulate finding "Trade-worthy moments"
-        # In a real engine, we'd check strict indicator rules here.
-        # Prototype: Find where Close < SMA (Buy Dip) or Close > SMA (Sell Top)
-        # Using a simplistic 'signal' logic for demonstration.
-        
-        # Let's calculate a simple SMA
-        df['SMA'] = df['close'].rolling(window=50).mean()
-        
-        # Identify "Bullish Context" rows (e.g., Price > SMA)
-        bullish_rows = df[df['close'] > df['SMA']]
-        bearish_rows = df[df['close'] < df['SMA']]
+        # 4. Find "Trade-worthy moments": bars where the robot's own rules signal,
+        # evaluated by the same compiled rules the backtester uses
+        buy, sell = compile_rules(self.rules).evaluate(df)
+        bullish_rows = df[buy]
+        bearish_rows = df[sell]
         
         current_price = df['close'].iloc[-1]
         
@@ -151,3 +135,20 @@ class StrategyAnalyzer:
             "confidence": round(confidence, 2),
             "expiry": (datetime.now() + timedelta(minutes=self.robot.max_entry_wait_minutes)).isoformat()
         }
+    
+    def normalize_data(self, df):
+        """Add session and time features"""
+        if df.empty: return df
+        df['hour'] = df['time'].dt.hour
+        df['day_of_week'] = df['time'].dt.dayofweek
+        
+        # Simple session marking (UTC assumed for simplicity)
+        # Asia: 0-8, London: 8-16, NY: 13-21
+        conditions = [
+            (df['hour'] >= 0) & (df['hour'] < 8),
+            (df['hour'] >= 8) & (df['hour'] < 16),
+            (df['hour'] >= 13) & (df['hour'] < 21)
+        ]
+        choices = ['ASIA', 'LONDON', 'NY']
+        df['session'] = np.select(conditions, choices, default='OTHER')
+        return df
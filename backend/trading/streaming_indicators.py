@@ -0,0 +1,371 @@
+"""
+Streaming Indicators
+Incremental counterparts of the IndicatorEngine series: each state takes one new bar and updates
+in constant (amortized) time, so a live robot does not redo a rolling pass over its history every
+bar. A state seeded with seed(history) then agrees with the batch function bar for bar.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+
+NAN = float('nan')
+
+
+def _ratio(a, b):
+    """a / b with NumPy semantics: inf or NaN instead of ZeroDivisionError."""
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class RollingMean:
+    """
+    Sum and mean of the last `period` values; NaN until the window is full and while it holds a
+    NaN, like pandas rolling(period). The running sum is recomputed exactly once per period, so
+    rounding errors never pile up and a push stays amortized O(1).
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.nans = 0
+        self._pushes = 0
+
+    def push(self, value):
+        if len(self.window) == self.period:
+            old = self.window[0]
+            if old != old:
+                self.nans -= 1
+            else:
+                self.total -= old
+        self.window.append(value)
+        if value != value:
+            self.nans += 1
+        else:
+            self.total += value
+        self._pushes += 1
+        if self._pushes >= self.period:
+            self.total = math.fsum(v for v in self.window if v == v)
+            self._pushes = 0
+        return self.mean
+
+    @property
+    def ready(self):
+        return len(self.window) == self.period and not self.nans
+
+    @property
+    def sum(self):
+        return self.total if self.ready else NAN
+
+    @property
+    def mean(self):
+        return self.total / self.period if self.ready else NAN
+
+
+class RollingMoments:
+    """
+    Mean and sample standard deviation (ddof=1) of the last `period` values. Sums are kept around
+    a reference value that is re-centred on the window at each exact recomputation, so the
+    variance keeps its precision at price levels far from zero.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.ref = None
+        self.s1 = 0.0
+        self.s2 = 0.0
+        self._pushes = 0
+
+    def push(self, value):
+        if self.ref is None:
+            self.ref = value
+        if len(self.window) == self.period:
+            d = self.window[0] - self.ref
+            self.s1 -= d
+            self.s2 -= d * d
+        self.window.append(value)
+        d = value - self.ref
+        self.s1 += d
+        self.s2 += d * d
+        self._pushes += 1
+        if self._pushes >= self.period:
+            self.ref = math.fsum(self.window) / len(self.window)
+            deviations = [v - self.ref for v in self.window]
+            self.s1 = math.fsum(deviations)
+            self.s2 = math.fsum(d * d for d in deviations)
+            self._pushes = 0
+
+    @property
+    def mean(self):
+        if len(self.window) < self.period:
+            return NAN
+        return self.ref + self.s1 / self.period
+
+    @property
+    def std(self):
+        if len(self.window) < self.period or self.period < 2:
+            return NAN
+        variance = (self.s2 - self.s1 * self.s1 / self.period) / (self.period - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class RollingExtreme:
+    """Highest (or lowest) of the last `period` values through a monotonic deque, amortized O(1)."""
+
+    def __init__(self, period, highest=True):
+        self.period = period
+        self.highest = highest
+        self.items = deque()
+        self.count = 0
+
+    def push(self, value):
+        items = self.items
+        if self.highest:
+            while items and items[-1][1] <= value:
+                items.pop()
+        else:
+            while items and items[-1][1] >= value:
+                items.pop()
+        items.append((self.count, value))
+        if items[0][0] <= self.count - self.period:
+            items.popleft()
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        return self.items[0][1] if self.count >= self.period else NAN
+
+
+class StreamingIndicator(ABC):
+    """
+    Base of the streaming states. update(bar) takes one bar (any mapping with 'close' and, where
+    the indicator needs them, 'high' / 'low': a dict, a DataFrame row or an MT5 rates record) and
+    returns the new value in the shape the IndicatorEngine function returns; `value` keeps it.
+
+    seed(data) primes a fresh state from an OHLC DataFrame. Window states replay only the last
+    `lookback` bars, which is everything still inside their windows; recursive ones (EMA, MACD)
+    take their last value from the batch function's own pandas recursion over the whole history.
+    """
+
+    value = NAN
+
+    @property
+    @abstractmethod
+    def lookback(self):
+        """Bars seed() replays: the longest window the state keeps."""
+
+    @abstractmethod
+    def update(self, bar):
+        """Feeds one closed bar and returns the indicator's value for it."""
+
+    def seed(self, data):
+        for bar in data.iloc[-self.lookback:].to_dict('records'):
+            self.update(bar)
+        return self
+
+    @classmethod
+    def from_history(cls, data, **params):
+        return cls(**params).seed(data)
+
+
+class StreamingSMA(StreamingIndicator):
+    def __init__(self, period=14):
+        self.period = period
+        self.mean = RollingMean(period)
+
+    @property
+    def lookback(self):
+        return self.period
+
+    def update(self, bar):
+        self.value = self.mean.push(float(bar['close']))
+        return self.value
+
+
+class StreamingEMA(StreamingIndicator):
+    """ewm(span=period, adjust=False): starts at the first value, then the usual recursion."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+
+    @property
+    def lookback(self):
+        return 1
+
+    def push(self, x):
+        if self.value != self.value:
+            self.value = x
+        elif self.value != x:
+            # Same operation order as pandas' ewma, which normalizes by the weight sum
+            old_weight = 1.0 - self.alpha
+            self.value = (old_weight * self.value + self.alpha * x) / (old_weight + self.alpha)
+        return self.value
+
+    def update(self, bar):
+        return self.push(float(bar['close']))
+
+    def seed(self, data):
+        if len(data):
+            # IndicatorEngine.calculate_ema, kept inline so generated bots need no batch engine
+            self.value = float(data['close'].ewm(span=self.period, adjust=False).mean().iloc[-1])
+        return self
+
+
+class StreamingRSI(StreamingIndicator):
+    def __init__(self, period=14):
+        self.period = period
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+        self.prev_close = None
+
+    @property
+    def lookback(self):
+        return self.period + 1
+
+    def update(self, bar):
+        close = float(bar['close'])
+        # The batch version's where() turns the first bar's NaN delta into a zero gain and loss
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        gain = self.gain.push(delta if delta > 0 else 0.0)
+        loss = self.loss.push(-delta if delta < 0 else 0.0)
+        self.value = 100 - 100 / (1 + _ratio(gain, loss))
+        self.prev_close = close
+        return self.value
+
+
+class StreamingMACD(StreamingIndicator):
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+        self.value = (NAN, NAN)
+
+    @property
+    def lookback(self):
+        return 1
+
+    def update(self, bar):
+        close = float(bar['close'])
+        macd = self.fast.push(close) - self.slow.push(close)
+        self.value = (macd, self.signal.push(macd))
+        return self.value
+
+    def seed(self, data):
+        if len(data):
+            self.fast.seed(data)
+            self.slow.seed(data)
+            # IndicatorEngine.calculate_macd's signal line, as in StreamingEMA.seed
+            close = data['close']
+            macd = close.ewm(span=self.fast.period, adjust=False).mean() - close.ewm(span=self.slow.period, adjust=False).mean()
+            self.signal.value = float(macd.ewm(span=self.signal.period, adjust=False).mean().iloc[-1])
+            self.value = (float(macd.iloc[-1]), self.signal.value)
+        return self
+
+
+class StreamingBollingerBands(StreamingIndicator):
+    def __init__(self, period=20, std=2):
+        self.period = period
+        self.std = std
+        self.moments = RollingMoments(period)
+        self.value = (NAN, NAN, NAN)
+
+    @property
+    def lookback(self):
+        return self.period
+
+    def update(self, bar):
+        self.moments.push(float(bar['close']))
+        sma, std_dev = self.moments.mean, self.moments.std
+        self.value = (sma + std_dev * self.std, sma, sma - std_dev * self.std)
+        return self.value
+
+
+class StreamingATR(StreamingIndicator):
+    def __init__(self, period=14):
+        self.period = period
+        self.mean = RollingMean(period)
+        self.prev_close = None
+
+    @property
+    def lookback(self):
+        return self.period + 1
+
+    def update(self, bar):
+        high, low = float(bar['high']), float(bar['low'])
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = float(bar['close'])
+        self.value = self.mean.push(true_range)
+        return self.value
+
+
+class StreamingStochastic(StreamingIndicator):
+    def __init__(self, k_period=14, d_period=3, slowing=1):
+        self.k_period = k_period
+        self.d_period = d_period
+        self.slowing = slowing
+        self.highest = RollingExtreme(k_period, highest=True)
+        self.lowest = RollingExtreme(k_period, highest=False)
+        self.numerator = RollingMean(slowing)
+        self.denominator = RollingMean(slowing)
+        self.d = RollingMean(d_period)
+        self.value = (NAN, NAN)
+
+    @property
+    def lookback(self):
+        return self.k_period + max(self.slowing, 1) + self.d_period - 2
+
+    def update(self, bar):
+        high_max = self.highest.push(float(bar['high']))
+        low_min = self.lowest.push(float(bar['low']))
+        distance, span = float(bar['close']) - low_min, high_max - low_min
+        if self.slowing > 1:
+            self.numerator.push(distance)
+            self.denominator.push(span)
+            distance, span = self.numerator.sum, self.denominator.sum
+        k = _ratio(100 * distance, span)
+        self.value = (k, self.d.push(k))
+        return self.value
+
+
+class StreamingADX(StreamingIndicator):
+    """Same simplified ADX as IndicatorEngine.calculate_adx; returns (adx, plus_di, minus_di)."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.atr = StreamingATR(period)
+        self.plus_dm = RollingMean(period)
+        self.minus_dm = RollingMean(period)
+        self.dx = RollingMean(period)
+        self.prev_high = None
+        self.prev_low = None
+        self.value = (NAN, NAN, NAN)
+
+    @property
+    def lookback(self):
+        return 2 * self.period
+
+    def update(self, bar):
+        high, low = float(bar['high']), float(bar['low'])
+        atr = self.atr.update(bar)
+        if self.prev_high is None:
+            # The first bar has no directional movement, as the NaN from diff() in the batch version
+            plus_dm = minus_dm = NAN
+        else:
+            plus_dm = max(high - self.prev_high, 0.0)
+            minus_dm = max(self.prev_low - low, 0.0)
+        self.prev_high, self.prev_low = high, low
+
+        plus_di = 100 * _ratio(self.plus_dm.push(plus_dm), atr)
+        minus_di = 100 * _ratio(self.minus_dm.push(minus_dm), atr)
+        dx = _ratio(100 * abs(plus_di - minus_di), plus_di + minus_di)
+        self.value = (self.dx.push(dx), plus_di, minus_di)
+        return self.value
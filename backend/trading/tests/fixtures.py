@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+
+
+def ohlc_frame(n=5000, seed=0, freq='h', start='2024-01-01'):
+    """Random-walk OHLC bars shaped like the frames HistoricalDataService returns."""
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        'time': pd.date_range(start, periods=n, freq=freq),
+        'open': np.r_[close[0], close[:-1]],
+        'high': close + rng.uniform(0, 0.0007, n),
+        'low': close - rng.uniform(0, 0.0007, n),
+        'close': close,
+        'tick_volume': 1,
+    })
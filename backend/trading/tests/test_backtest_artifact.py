@@ -0,0 +1,97 @@
+import io
+import unittest
+
+import numpy as np
+
+from trading.backtest_artifact import BacktestArtifact
+from trading.backtester import Backtester
+from trading.intrabar import IntrabarExitEngine
+from trading.money_management import MoneyManager
+from trading.trade_ledger import TRADE_DTYPE, TradeLedger
+
+from .fixtures import ohlc_frame
+
+
+def ledger(entry_time, exit_time, side, profit, closed):
+    return TradeLedger.from_columns(
+        entry_time=entry_time, exit_time=exit_time, side=side, profit=profit, closed=closed,
+        entry_price=np.ones(len(side)), exit_price=np.where(closed, 1.0, np.nan),
+    )
+
+
+class BacktestArtifactTests(unittest.TestCase):
+
+    def test_round_trip(self):
+        df = ohlc_frame(3000, seed=18).set_index('time', drop=False)
+        risk = {'sl': 40, 'tp': 80, 'lot': 0.1}
+        stops = IntrabarExitEngine.for_frame(df, 'EURUSD', risk, sub_bars=df.iloc[:0])
+        trades = Backtester(df, {'rsi': {'buy': 40, 'sell': 60}}, stops=stops, money=MoneyManager('EURUSD', risk)).run()
+        metrics = Backtester.compute_metrics(trades)
+        artifact = BacktestArtifact(trades, metrics)
+        blob = artifact.to_bytes()
+
+        restored = BacktestArtifact.from_bytes(blob)
+        self.assertEqual(restored.metrics, metrics)
+        self.assertEqual(BacktestArtifact.read_metrics(memoryview(blob)), metrics)
+        self.assertEqual((restored.trades.datetime_index, restored.trades.has_reasons), (True, True))
+        for field in TRADE_DTYPE.names:
+            np.testing.assert_array_equal(restored.trades.array[field], trades.array[field], err_msg=field)
+        np.testing.assert_array_equal(restored.equity_times, artifact.equity_times)
+        np.testing.assert_array_equal(restored.equity, artifact.equity)
+        # The equity curve is the running closed profit in exit order
+        self.assertAlmostEqual(restored.equity[-1], trades.closed()['profit'].sum())
+        self.assertTrue(np.all(np.diff(restored.equity_times) >= 0))
+
+    def test_reads_blobs_missing_newer_fields(self):
+        trades = Backtester(ohlc_frame(2000, seed=18), {'rsi': {}}).run()
+        with np.load(io.BytesIO(BacktestArtifact(trades).to_bytes())) as payload:
+            members = {name: payload[name] for name in payload.files if name not in ('trade_lots', 'trade_pnl')}
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **members)
+
+        restored = BacktestArtifact.from_bytes(buffer.getvalue())
+        np.testing.assert_array_equal(restored.trades.array['lots'], 0)
+        np.testing.assert_array_equal(restored.trades.array['profit'], trades.array['profit'])
+
+    def test_diff(self):
+        base = BacktestArtifact(
+            ledger([10, 30, 50], [20, 40, 60], [1, -1, 1], [1.0, -0.5, 0.5], [True, True, True]),
+            {'win_rate': 0.5, 'total_profit': 1.0, 'total_trades': 3},
+        )
+        other = BacktestArtifact(
+            ledger([10, 30, 50, 80], [20, 45, 70, 0], [1, 1, 1, -1], [1.0, 0.5, 2.0, 0.0], [True, True, True, False]),
+            {'win_rate': 0.75, 'total_profit': 3.5, 'total_trades': 4, 'sharpe': 1.2},
+        )
+        diff = base.diff(other)
+
+        self.assertEqual(diff['metrics'], {
+            'win_rate': {'base': 0.5, 'other': 0.75, 'delta': 0.25},
+            'total_profit': {'base': 1.0, 'other': 3.5, 'delta': 2.5},
+            'total_trades': {'base': 3, 'other': 4, 'delta': 1.0},
+            'sharpe': {'base': None, 'other': 1.2, 'delta': None},
+        })
+        # Entries at 10 match; 50 matches with another exit; 30 flipped side so it is not shared
+        self.assertEqual(diff['trades'], {
+            'base': 3, 'other': 4, 'common': 2, 'changed': 1, 'only_base': 1, 'only_other': 2,
+        })
+        # Equity: base 1, 0.5, 1 at 20/40/60; other 1, 1.5, 3.5 at 20/45/70
+        self.assertEqual(diff['equity'], {
+            'final': {'base': 1.0, 'other': 3.5}, 'max_gap': 2.5, 'max_gap_time': 70,
+        })
+
+        same = base.diff(base)
+        self.assertEqual(same['trades']['changed'], 0)
+        self.assertEqual((same['equity']['max_gap'], same['equity']['max_gap_time']), (0.0, None))
+        self.assertTrue(all(m['delta'] == 0 for m in same['metrics'].values()))
+
+    def test_diff_with_empty_run(self):
+        base = BacktestArtifact(ledger([10], [20], [1], [1.0], [True]), {'total_trades': 1})
+        empty = BacktestArtifact(TradeLedger(0), {'total_trades': 0})
+        diff = base.diff(empty)
+        self.assertEqual(diff['trades'], {'base': 1, 'other': 0, 'common': 0, 'changed': 0, 'only_base': 1, 'only_other': 0})
+        self.assertEqual(diff['equity']['max_gap'], -1.0)
+        self.assertEqual(diff['equity']['final'], {'base': 1.0, 'other': 0.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
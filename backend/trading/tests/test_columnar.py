@@ -0,0 +1,51 @@
+import json
+import unittest
+
+import numpy as np
+
+from trading.backtester import Backtester
+from trading.columnar import ColumnarFrame
+
+from .fixtures import ohlc_frame
+
+
+class ColumnarFrameTests(unittest.TestCase):
+
+    def setUp(self):
+        self.df = ohlc_frame(3000)[['time', 'open', 'high', 'low', 'close']]
+        self.frame = ColumnarFrame.from_frame(self.df, np.float32)
+
+    def test_iloc(self):
+        tail = self.frame.iloc[-10:]
+        self.assertIsInstance(tail, ColumnarFrame)
+        self.assertEqual(len(tail), 10)
+        self.assertEqual(tail.to_numpy('close').dtype, np.float32)
+        self.assertTrue(tail.index.equals(self.df.index[-10:]))
+        row = self.frame.iloc[5]
+        self.assertEqual(row['time'], self.df['time'].iloc[5])
+        self.assertAlmostEqual(row['close'], self.df['close'].iloc[5], places=6)
+
+    def test_float32_build_through_checkpoint(self):
+        cut = 2500
+        for rules in ({'rsi': {'buy': 40, 'sell': 60}}, {'macd': {}}, {'bands': {'period': 20, 'dev': 2}, 'stoch': {}}):
+            with self.subTest(rules=rules):
+                runs = {}
+                for name, data in (('float32', self.frame.iloc[:cut]), ('float64', self.df.iloc[:cut].copy())):
+                    bt = Backtester(data, rules)
+                    checkpoint = json.loads(json.dumps(bt.checkpoint(bt.run())))
+                    runs[name] = checkpoint, Backtester.resume(checkpoint, self.df.iloc[cut:])
+                (checkpoint32, (_, metrics32, _)), (checkpoint64, (_, metrics64, _)) = runs['float32'], runs['float64']
+                self.assertEqual(checkpoint32['last_time'], checkpoint64['last_time'])
+                self.assertEqual(checkpoint32['tail']['time'], checkpoint64['tail']['time'])
+                np.testing.assert_allclose(checkpoint32['tail']['close'], checkpoint64['tail']['close'], rtol=1e-6)
+                self.assertEqual(checkpoint32['totals']['total_trades'], checkpoint64['totals']['total_trades'])
+                self.assertEqual(metrics32['total_trades'], metrics64['total_trades'])
+                self.assertAlmostEqual(metrics32['win_rate'], metrics64['win_rate'], delta=1.0)
+
+    def test_reference_loop(self):
+        rules = {'rsi': {'buy': 40, 'sell': 60}}
+        self.assertEqual(len(Backtester(self.frame, rules, mode='reference').run()), len(Backtester(self.frame, rules).run()))
+
+
+if __name__ == '__main__':
+    unittest.main()
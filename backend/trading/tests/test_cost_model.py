@@ -0,0 +1,37 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from trading.cost_model import SESSIONS, TransactionCostModel
+
+
+class ExecutionCostTests(unittest.TestCase):
+
+    def test_units_and_sign(self):
+        # 1.2 pips of spread on a 5-digit quote; a long filled 0.3 pips above the requested ask
+        self.assertEqual(TransactionCostModel.execution_costs('EURUSD', 1, 1.10000, 1.10012, 1.10012, 1.10015), (1.2, 0.3))
+        # A short filled above the requested bid got a better price: negative slippage
+        self.assertEqual(TransactionCostModel.execution_costs('EURUSD', -1, 1.10000, 1.10012, 1.10000, 1.10003), (1.2, -0.3))
+        # JPY pairs quote 3 digits, so a pip is 0.01
+        self.assertEqual(TransactionCostModel.execution_costs('USDJPY', 1, 150.000, 150.015, 150.015, 150.015), (1.5, 0.0))
+
+    def test_model_from_recorded_executions(self):
+        rng = np.random.default_rng(0)
+        times = pd.date_range('2024-01-01', periods=24 * 40, freq='h')
+        ask = 1.1 + rng.uniform(0.00008, 0.00012, len(times))
+        filled = ask + rng.normal(0.00002, 0.00001, len(times))
+        samples = [
+            TransactionCostModel.execution_costs('EURUSD', 1, 1.1, a, a, f) for a, f in zip(ask, filled)
+        ]
+        spread, slippage = map(np.array, zip(*samples))
+        model = TransactionCostModel.from_executions('EURUSD', times, spread, slippage)
+        self.assertEqual(model.samples.sum(), len(times))
+        np.testing.assert_allclose(model.spread_mean, 1.0, atol=0.05)
+        np.testing.assert_allclose(model.slippage_mean, 0.2, atol=0.05)
+        # One fill pays half the spread plus the slippage, in price units
+        np.testing.assert_allclose(model.fill_costs(), np.full(len(SESSIONS), 0.00007), atol=0.00001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from trading.backtester import Backtester
+from trading.cross_validation import PurgedKFoldRunner
+from trading.rule_compiler import compile_rules
+
+from .fixtures import ohlc_frame
+
+RULES = {'rsi': {'buy': 40, 'sell': 60}}
+
+
+class PurgedKFoldTests(unittest.TestCase):
+
+    def setUp(self):
+        self.df = ohlc_frame(5000, seed=10)
+        self.trades = Backtester(self.df.copy(), RULES).run().array
+
+    def runner(self, grid=None, **kwargs):
+        grid = grid or {'rsi': {'buy': [40], 'sell': [60]}}
+        return PurgedKFoldRunner(self.df, grid, folds=5, workers=1, **kwargs)
+
+    def test_purge_and_embargo(self):
+        embargo = 30
+        runner = self.runner(embargo=embargo)
+        report = runner.run()
+        entry, exit_, closed = self.trades['entry_bar'], self.trades['exit_bar'], self.trades['closed']
+        purged = 0
+        for fold, (start, end) in zip(report['folds'], runner.split_folds()):
+            test = (entry >= start) & (entry < end)
+            # Overlapping the fold: still open at its start, or entered in it, or in the embargo after it
+            overlapping = ~((exit_ < start) | (entry >= end + embargo))
+            train = closed & ~test & ~overlapping
+            purged += int((closed & ~test & overlapping).sum())
+            self.assertEqual(fold['rules'], RULES)
+            self.assertEqual(fold['test_metrics'], Backtester.compute_metrics(self.trades[test]))
+            self.assertEqual(fold['train_metrics'], Backtester.compute_metrics(self.trades[train]))
+            self.assertEqual(fold['train_metrics']['total_trades'], int(train.sum()))
+        # The purge and embargo actually removed training trades
+        self.assertGreater(purged, 0)
+
+    def test_default_embargo_is_warmup(self):
+        self.assertEqual(self.runner().run()['embargo'], compile_rules(RULES).warmup)
+
+    def test_dispersion(self):
+        report = self.runner().run()
+        win_rates = np.array([fold['test_metrics']['win_rate'] for fold in report['folds']])
+        self.assertEqual(report['folds_traded'], 5)
+        dispersion = report['dispersion']['win_rate']
+        self.assertAlmostEqual(dispersion['mean'], win_rates.mean(), places=5)
+        self.assertAlmostEqual(dispersion['std'], win_rates.std(ddof=1), places=5)
+        self.assertEqual((dispersion['min'], dispersion['max']), (win_rates.min(), win_rates.max()))
+        self.assertEqual(report['win_rate'], dispersion['mean'])
+        self.assertTrue({'total_profit', 'sharpe', 'max_drawdown'} <= set(report['dispersion']))
+
+    def test_rules_picked_on_training_folds(self):
+        grid = {'rsi': {'buy': [30, 40, 45], 'sell': [55, 60, 70]}}
+        report = self.runner(grid).run()
+        for k, fold in enumerate(report['folds']):
+            # No other combination scored better on the fold's purged training trades
+            best = fold['train_metrics']['win_rate']
+            for buy in grid['rsi']['buy']:
+                for sell in grid['rsi']['sell']:
+                    single = self.runner({'rsi': {'buy': [buy], 'sell': [sell]}}).run()['folds'][k]
+                    self.assertLessEqual(single['train_metrics'].get('win_rate', 0), best)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from trading.indicator_engine import IndicatorCache, IndicatorEngine
+
+from .fixtures import ohlc_frame
+
+
+class IndicatorCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.df = ohlc_frame(1000, seed=24)
+        self.cache = IndicatorCache(max_bytes=2**20)
+        self.calls = 0
+
+    def sma(self, data, period):
+        def compute():
+            self.calls += 1
+            return data['close'].rolling(window=period).mean()
+        return self.cache.memoize(data, ('sma', period), compute)
+
+    def test_hits_and_misses(self):
+        first = self.sma(self.df, 20)
+        again = self.sma(self.df, 20)
+        self.sma(self.df, 50)
+        # An identical reload is a different object with the same prices
+        reload = self.sma(self.df.copy(), 20)
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+        stats = self.cache.stats()
+        self.assertEqual((stats['entries'], stats['hit_rate']), (2, 0.5))
+        self.assertEqual(stats['bytes'], 2 * first.nbytes)
+        pd.testing.assert_series_equal(again, first)
+        pd.testing.assert_series_equal(reload, first)
+
+    def test_evicts_least_recently_used(self):
+        size = self.df['close'].nbytes
+        self.cache.max_bytes = int(2.5 * size)
+        for period in (10, 20):
+            self.sma(self.df, period)
+        self.sma(self.df, 10)       # now the most recently used
+        self.sma(self.df, 30)       # over budget: 20 goes
+
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(self.cache.bytes, 2 * size)
+        self.assertEqual([key[1:] for key in self.cache.entries], [('sma', 10), ('sma', 30)])
+        calls = self.calls
+        self.sma(self.df, 10)
+        self.assertEqual(self.calls, calls)
+        self.sma(self.df, 20)
+        self.assertEqual(self.calls, calls + 1)
+
+        # A value larger than the whole budget is returned but never stored
+        self.cache.max_bytes = size - 1
+        self.cache.clear()
+        self.sma(self.df, 10)
+        self.assertEqual((len(self.cache.entries), self.cache.bytes), (0, 0))
+
+    def test_new_buffer_misses(self):
+        self.sma(self.df, 20)
+        # Same frame object, but its close column now points at a new buffer
+        self.df['close'] = self.df['close'] + 0.001
+        changed = self.sma(self.df, 20)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+        pd.testing.assert_series_equal(changed, self.df['close'].rolling(window=20).mean())
+
+        # Different prices in a new frame miss as well
+        other = self.df.copy()
+        other.loc[500, 'high'] += 0.01
+        self.sma(other, 20)
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_values_are_copies(self):
+        computed = self.sma(self.df, 20)
+        expected = computed.copy()
+        computed.iloc[-1] = -1.0
+
+        hit = self.sma(self.df, 20)
+        pd.testing.assert_series_equal(hit, expected)
+        hit.iloc[:] = np.nan
+        pd.testing.assert_series_equal(self.sma(self.df, 20), expected)
+
+        pair = self.cache.memoize(self.df, ('pair',), lambda: (self.df['open'] * 1, self.df['close'] * 1))
+        pair[0].iloc[0] = 0.0
+        self.assertEqual(self.cache.memoize(self.df, ('pair',), lambda: None)[0].iloc[0], self.df['open'].iloc[0])
+
+
+class MemoizedEngineTests(unittest.TestCase):
+
+    def setUp(self):
+        self.df = ohlc_frame(1000, seed=24)
+        self.cache = IndicatorCache(max_bytes=2**20)
+        patcher = mock.patch('trading.indicator_engine.INDICATOR_CACHE', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bound_arguments_share_a_key(self):
+        rsi = IndicatorEngine.calculate_rsi(self.df)
+        pd.testing.assert_series_equal(IndicatorEngine.calculate_rsi(self.df, 14), rsi)
+        pd.testing.assert_series_equal(IndicatorEngine.calculate_rsi(self.df, period=14), rsi)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+        self.assertEqual(list(self.cache.entries)[0][1:], ('calculate_rsi', ('period', 14)))
+
+        IndicatorEngine.calculate_rsi(self.df, 7)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_nested_calls_reuse_entries(self):
+        # calculate_adx calls calculate_atr through the cache
+        IndicatorEngine.calculate_atr(self.df, 14)
+        IndicatorEngine.calculate_adx(self.df, 14)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_tuple_results_are_copies(self):
+        macd, signal = IndicatorEngine.calculate_macd(self.df)
+        macd.iloc[:] = 0.0
+        again, _ = IndicatorEngine.calculate_macd(self.df)
+        self.assertNotEqual(again.abs().sum(), 0.0)
+        pd.testing.assert_series_equal(again, IndicatorEngine.calculate_macd.__wrapped__(self.df)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+
+import pandas as pd
+
+from trading.indicator_engine import IndicatorCache, IndicatorEngine
+from trading.indicator_graph import IndicatorGraph, parse_request
+
+from .fixtures import ohlc_frame
+
+REQUEST = "ema(12), macd(12,26,9), macd(5,35,5), bands(20,2), bollinger_bands(10,2.5), sma(20), rsi(14), rsi(7), atr(14), adx(14), stoch(14,3,3)"
+
+
+class CountingGraph(IndicatorGraph):
+    """Records every node actually computed."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.computed_keys = []
+
+    def _compute(self, key):
+        self.computed_keys.append(key)
+        return super()._compute(key)
+
+
+class IndicatorGraphTests(unittest.TestCase):
+
+    def setUp(self):
+        self.df = ohlc_frame(1500, seed=22)
+
+    def test_shared_nodes_computed_once(self):
+        graph = CountingGraph(self.df, cache=None)
+        graph.evaluate(REQUEST)
+        nodes = [key for key in IndicatorGraph.plan(REQUEST) if key[0] != 'col']
+
+        self.assertEqual(sorted(graph.computed_keys, key=repr), sorted(nodes, key=repr))
+        self.assertEqual(graph.computed, len(nodes))
+        # The EMA rule, MACD and bands share their EMAs / SMA, ADX the ATR, both RSIs the price diff
+        for shared in (('ema', ('col', 'close'), 12), ('sma', ('col', 'close'), 20), ('atr', 14), ('diff', ('col', 'close'))):
+            self.assertEqual(graph.computed_keys.count(shared), 1, shared)
+        self.assertGreater(graph.hits, 0)
+
+        graph.evaluate("adx(14), macd(12,26,9)")
+        self.assertEqual(graph.computed, len(nodes))
+
+    def test_matches_indicator_engine(self):
+        graph = IndicatorGraph(self.df, cache=None)
+        expected = {
+            'rsi(14)': IndicatorEngine.calculate_rsi(self.df, 14),
+            'rsi(7)': IndicatorEngine.calculate_rsi(self.df, 7),
+            'macd(12, 26, 9)': IndicatorEngine.calculate_macd(self.df, 12, 26, 9),
+            'macd(5, 35, 5)': IndicatorEngine.calculate_macd(self.df, 5, 35, 5),
+            'bands(20, 2)': IndicatorEngine.calculate_bollinger_bands(self.df, 20, 2),
+            'bands(10, 2.5)': IndicatorEngine.calculate_bollinger_bands(self.df, 10, 2.5),
+            'adx(14)': IndicatorEngine.calculate_adx(self.df, 14),
+            'atr(14)': IndicatorEngine.calculate_atr(self.df, 14),
+            'stoch(14, 3, 3)': IndicatorEngine.calculate_stochastic(self.df, 14, 3, 3),
+            'ema(12)': IndicatorEngine.calculate_ema(self.df, 12),
+            'sma(20)': IndicatorEngine.calculate_sma(self.df, 20),
+        }
+        results = graph.evaluate(REQUEST)
+        self.assertEqual(set(results), set(expected))
+        for label, values in expected.items():
+            values = values if isinstance(values, tuple) else (values,)
+            got = results[label] if isinstance(results[label], tuple) else (results[label],)
+            self.assertEqual(len(got), len(values), label)
+            for a, b in zip(got, values):
+                pd.testing.assert_series_equal(a, b, check_exact=True, check_names=False, obj=label)
+
+    def test_graphs_share_the_cache(self):
+        cache = IndicatorCache()
+        first = IndicatorGraph(self.df, cache=cache)
+        expected = first.indicator('adx', 14)
+        # A later graph over an identical reload reuses every node
+        second = IndicatorGraph(self.df.copy(), cache=cache)
+        for a, b in zip(second.indicator('adx', 14), expected):
+            pd.testing.assert_series_equal(a, b, check_exact=True)
+        self.assertEqual(second.computed, 0)
+        self.assertEqual(cache.misses, first.computed)
+
+    def test_parse_request(self):
+        self.assertEqual(
+            parse_request("rsi, macd(12, 26,9), Bollinger_Bands(20,2.5), stochastic(5)"),
+            [('rsi', ()), ('macd', (12, 26, 9)), ('bands', (20, 2.5)), ('stoch', (5,))],
+        )
+        self.assertEqual(IndicatorGraph.outputs('stoch', (5,)), IndicatorGraph.outputs('stoch', (5, 3, 1)))
+        for bad in ("rsi(14) macd", "vwap(20)"):
+            with self.subTest(bad=bad), self.assertRaises(ValueError):
+                parse_request(bad)
+        with self.assertRaises(ValueError):
+            IndicatorGraph.outputs('rsi', (14, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
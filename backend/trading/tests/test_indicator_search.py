@@ -0,0 +1,73 @@
+import unittest
+
+from trading.backtester import Backtester
+from trading.indicator_search import IndicatorSubsetSearch
+
+from .fixtures import ohlc_frame
+
+GRIDS = {
+    'rsi': {'period': [7, 14], 'buy': [30, 40], 'sell': [60, 70]},
+    'ma': {'period': [20, 50]},
+}
+
+
+class IndicatorSearchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.df = ohlc_frame(3000, seed=9)
+
+    def search(self, **kwargs):
+        return IndicatorSubsetSearch(self.df, GRIDS, families=('rsi', 'ma'), max_indicators=2, **kwargs)
+
+    def exhaustive(self, search):
+        """Every candidate through the full backtester, ranked like run() ranks them."""
+        results = []
+        for rules in search.candidates():
+            metrics = Backtester.compute_metrics(Backtester(self.df.copy(), rules).run())
+            if metrics.get('total_trades', 0) >= search.min_trades:
+                results.append({'rules': rules, 'metrics': metrics})
+        results.sort(key=lambda r: r['metrics'].get(search.metric) or 0, reverse=True)
+        return results
+
+    def test_pruned_search_keeps_the_winner(self):
+        search = self.search()
+        report = search.run()
+        expected = self.exhaustive(search)
+
+        self.assertEqual(report['evaluated'], 8 + 2 + 16)
+        self.assertGreater(report['aborted'].get('dominated', 0), 0)
+        self.assertEqual(report['results'][0], expected[0])
+        # Every completed candidate is exact, not just the winner
+        exact = {str(r['rules']): r['metrics'] for r in expected}
+        for result in report['results']:
+            self.assertEqual(result['metrics'], exact[str(result['rules'])])
+
+    def test_trades_abort(self):
+        report = self.search(min_trades=10_000).run()
+        self.assertEqual(report['aborted'], {'trades': report['evaluated']})
+        self.assertEqual(report['results'], [])
+
+    def test_drawdown_abort(self):
+        search = self.search(max_drawdown=0.002)
+        report = search.run()
+        self.assertGreater(report['aborted'].get('drawdown', 0), 0)
+        for result in report['results']:
+            self.assertLessEqual(result['metrics']['max_drawdown'], 0.002)
+        # Aborted candidates really went past the limit
+        drawdowns = {str(r['rules']): r['metrics']['max_drawdown'] for r in self.exhaustive(search)}
+        kept = {str(r['rules']) for r in report['results']}
+        for rules, drawdown in drawdowns.items():
+            if rules not in kept and drawdown <= 0.002:
+                self.fail(f"{rules} was dropped with drawdown {drawdown}")
+
+    def test_dominated_abort(self):
+        search = self.search()
+        metrics, reason = search.evaluate({'rsi': {'period': 14, 'buy': 30, 'sell': 70}}, best=100.0)
+        self.assertEqual((metrics, reason), (None, 'dominated'))
+        metrics, reason = search.evaluate({'rsi': {'period': 14, 'buy': 30, 'sell': 70}}, best=None)
+        self.assertIsNone(reason)
+        self.assertEqual(metrics, Backtester.compute_metrics(Backtester(self.df.copy(), {'rsi': {'period': 14, 'buy': 30, 'sell': 70}}).run()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from trading.intrabar import IntrabarExitEngine
+
+
+class IntrabarCoverageTests(unittest.TestCase):
+    """SL/TP resolution on a frame that stored M1 history only partly covers."""
+
+    def setUp(self):
+        times = pd.date_range('2024-01-01', periods=10, freq='h')
+        self.frame = pd.DataFrame({
+            'time': times, 'open': 1.0, 'high': 1.0005, 'low': 0.9995, 'close': 1.0,
+        })
+        self.frame.loc[3, 'low'] = 0.990
+        # M1 data starts at bar 6, like a week of yfinance M1 under a multi-month build
+        m1_times = pd.date_range(times[6], periods=240, freq='min')
+        self.m1 = pd.DataFrame({
+            'time': m1_times, 'open': 1.0, 'high': 1.0005, 'low': 0.9995, 'close': 1.0,
+        })
+        self.m1.loc[90, 'high'] = 1.002
+        self.risk = {'sl': 100, 'tp': 100}
+
+    def engine(self):
+        return IntrabarExitEngine.for_frame(self.frame, 'EURUSD', self.risk, sub_bars=self.m1)
+
+    def test_coverage(self):
+        coverage = self.engine().coverage
+        self.assertEqual(coverage['bars'], 10)
+        self.assertEqual(coverage['covered_bars'], 4)
+        self.assertEqual(coverage['m1_bars'], 240)
+        self.assertEqual(coverage['coverage_pct'], 40.0)
+
+    def test_stop_before_m1_data_starts(self):
+        # Opened at the close of bar 1, stopped out in bar 3, hours before the first M1 bar
+        exit_bar, price, reason = self.engine().first_exit(1, 1, 1.0)
+        self.assertEqual((exit_bar, reason), (3, 'sl'))
+        self.assertAlmostEqual(price, 0.999)
+
+    def test_trade_spanning_into_m1_data(self):
+        # Bars 2-5 resolve on the frame, bars 6+ on M1 sub-bars
+        self.frame.loc[3, 'low'] = 0.9995
+        exit_bar, price, reason = self.engine().first_exit(1, 1, 1.0)
+        self.assertEqual((exit_bar, reason), (7, 'tp'))
+        self.assertAlmostEqual(price, 1.001)
+
+    def test_signal_exit_before_stop(self):
+        self.assertIsNone(self.engine().first_exit(1, 1, 1.0, until=2))
+
+    def test_without_m1_history(self):
+        engine = IntrabarExitEngine.for_frame(self.frame, 'EURUSD', self.risk, sub_bars=pd.DataFrame())
+        self.assertEqual(engine.coverage['covered_bars'], 0)
+        self.assertEqual(engine.first_exit(1, 1, 1.0)[:1], (3,))
+        np.testing.assert_array_equal(engine.times, engine.bar_times)
+
+
+if __name__ == '__main__':
+    unittest.main()
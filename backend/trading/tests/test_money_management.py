@@ -0,0 +1,70 @@
+import json
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from trading.money_management import FALLBACK_SPECS, MoneyManager, SymbolSpecs
+
+
+class FakeTerminal:
+    """mt5.symbol_info / account_info of a terminal logged into a EUR account."""
+
+    def __init__(self):
+        self.symbols = {
+            'XAUUSD': SimpleNamespace(
+                trade_contract_size=10.0, trade_tick_size=0.01, trade_tick_value=0.092, point=0.01,
+                currency_base='XAU', currency_profit='USD', volume_min=0.1, volume_max=20.0,
+                volume_step=0.1, bid=2400.0,
+            ),
+        }
+
+    def symbol_info(self, symbol):
+        return self.symbols.get(symbol)
+
+    def account_info(self):
+        return SimpleNamespace(currency='EUR')
+
+
+class SymbolSpecsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = Path(self.tmp.name) / 'symbol_specs.json'
+
+    def test_fallback_without_cache(self):
+        with open(FALLBACK_SPECS) as f:
+            fallback = json.load(f)['XAUUSD']
+        self.assertEqual(SymbolSpecs(self.cache).get('XAUUSD'), fallback)
+
+    def test_cached_spec_overrides_fallback(self):
+        with open(self.cache, 'w') as f:
+            json.dump({'XAUUSD': {**SymbolSpecs(self.cache).get('XAUUSD'), 'contract_size': 10}}, f)
+        spec = SymbolSpecs(self.cache).get('XAUUSD')
+        self.assertEqual(spec['contract_size'], 10)
+        money = MoneyManager('XAUUSD', {'lot': 1}, spec=spec)
+        self.assertAlmostEqual(float(money.value_per_lot(1.0)), 10.0)
+        # Symbols the cache lacks still come from symbol_specs.json
+        self.assertEqual(SymbolSpecs(self.cache).get('EURUSD')['contract_size'], 100000)
+
+    def test_refresh_from_mt5(self):
+        connector = types.ModuleType('trading.mt5_connector')
+        connector.mt5 = FakeTerminal()
+        with mock.patch.dict(sys.modules, {'trading.mt5_connector': connector}):
+            updated = SymbolSpecs(self.cache).refresh_from_mt5(['XAUUSD', 'MISSING'])
+        self.assertEqual(list(updated), ['XAUUSD'])
+
+        spec = SymbolSpecs(self.cache).get('XAUUSD')
+        self.assertEqual((spec['contract_size'], spec['volume_step'], spec['account_currency']), (10.0, 0.1, 'EUR'))
+        money = MoneyManager('XAUUSD', {'lot': 0.1}, spec=spec)
+        self.assertEqual(money.account_currency, 'EUR')
+        # Through tick_value, as the profit currency is not the account's
+        self.assertAlmostEqual(float(money.value_per_lot(1.0)), 9.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from trading.backtester import Backtester
+from trading.monte_carlo import MonteCarloAnalyzer
+
+from .fixtures import ohlc_frame
+
+
+class MonteCarloTests(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.profits = rng.normal(0.2, 1.0, 60)
+
+    def test_max_drawdowns(self):
+        pnl = np.array([
+            [1, 2, -4, 1, -2, 5],    # equity 1 3 -1 0 -2 3: peak 3, trough -2
+            [-1, -2, 3, 0, 0, 0],    # below the zero start straight away
+            [1, 1, 1, 1, 1, 1],      # never draws down
+        ], dtype=np.float64)
+        np.testing.assert_array_equal(MonteCarloAnalyzer.max_drawdowns(pnl), [5, 3, 0])
+
+    def test_seeded_bootstrap(self):
+        paths, balance = 500, 5.0
+        report = MonteCarloAnalyzer(self.profits, paths=paths, initial_balance=balance, ruin_fraction=0.5, seed=3).run()
+        self.assertEqual(report, MonteCarloAnalyzer(self.profits, paths=paths, initial_balance=balance, ruin_fraction=0.5, seed=3).run())
+
+        # The same draws made by hand
+        pnl = self.profits[np.random.default_rng(3).integers(0, len(self.profits), size=(paths, len(self.profits)))]
+        drawdowns = MonteCarloAnalyzer.max_drawdowns(pnl)
+        historical = MonteCarloAnalyzer.max_drawdowns(self.profits[None, :])[0]
+        for p in MonteCarloAnalyzer.PERCENTILES:
+            self.assertAlmostEqual(report['max_drawdown_percentiles'][f'p{p}'], np.percentile(drawdowns, p), places=5)
+            self.assertAlmostEqual(report['final_pnl_percentiles'][f'p{p}'], np.percentile(pnl.sum(axis=1), p), places=5)
+        self.assertEqual(report['ruin_level'], 2.5)
+        self.assertEqual(report['ruin_probability'], round((drawdowns >= 2.5).mean(), 4))
+        self.assertEqual(report['prob_worse_drawdown'], round((drawdowns > historical).mean(), 4))
+        self.assertEqual(report['prob_loss'], round((pnl.sum(axis=1) < 0).mean(), 4))
+        self.assertGreater(report['ruin_probability'], 0)
+        self.assertLess(report['ruin_probability'], 1)
+
+        # Without a balance there is no ruin estimate
+        self.assertNotIn('ruin_probability', MonteCarloAnalyzer(self.profits, paths=paths, seed=3).run())
+
+    def test_blocks_do_not_change_the_result(self):
+        expected = MonteCarloAnalyzer(self.profits, paths=300, seed=5).run()
+        with mock.patch.object(MonteCarloAnalyzer, 'BLOCK_ELEMENTS', 7 * len(self.profits)):
+            self.assertEqual(MonteCarloAnalyzer(self.profits, paths=300, seed=5).run(), expected)
+
+    def test_shuffle_keeps_total_pnl(self):
+        analyzer = MonteCarloAnalyzer(self.profits, paths=200, method='shuffle', seed=1)
+        pnl = analyzer._sample(200)
+        np.testing.assert_allclose(pnl.sum(axis=1), self.profits.sum())
+        np.testing.assert_array_equal(np.sort(pnl, axis=1), np.broadcast_to(np.sort(self.profits), pnl.shape))
+
+        report = analyzer.run()
+        self.assertEqual(len(set(report['final_pnl_percentiles'].values())), 1)
+        self.assertAlmostEqual(report['final_pnl_percentiles']['p50'], self.profits.sum(), places=5)
+        # Orderings differ, so drawdowns spread around the historical one
+        self.assertLess(report['max_drawdown_percentiles']['p5'], report['max_drawdown_percentiles']['p95'])
+
+    def test_accepts_ledgers_and_trade_lists(self):
+        trades = Backtester(ohlc_frame(2000, seed=7), {'rsi': {'buy': 40, 'sell': 60}}).run()
+        from_ledger = MonteCarloAnalyzer(trades, paths=100, seed=2)
+        np.testing.assert_array_equal(from_ledger.profits, trades.profits())
+        from_list = MonteCarloAnalyzer([{'profit': p} for p in trades.profits()] + [{'open': True}], paths=100, seed=2)
+        self.assertEqual(from_list.run(), from_ledger.run())
+        self.assertEqual(MonteCarloAnalyzer([], paths=100).run(), {'paths': 0, 'trades': 0})
+        with self.assertRaises(ValueError):
+            MonteCarloAnalyzer(self.profits, method='jackknife')
+
+
+if __name__ == '__main__':
+    unittest.main()
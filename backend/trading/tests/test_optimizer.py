@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from trading.optimizer import ParameterOptimizer, StudyStore
+
+from .fixtures import ohlc_frame
+
+SPACE = {'rsi': {'period': [7, 14, 21], 'buy': [25, 30, 35], 'sell': [65, 70, 75]}}
+
+
+class StudyResumeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(StudyStore, 'default_dir', staticmethod(lambda: self.tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def optimize(self, data, trials):
+        return ParameterOptimizer(data, SPACE, trials=trials, workers=1, study='eurusd', symbol='EURUSD').run()
+
+    def test_resumes_on_the_same_data(self):
+        data = ohlc_frame(3000)
+        self.assertEqual(self.optimize(data, 6)['resumed'], 0)
+        report = self.optimize(data.copy(), 10)
+        self.assertEqual((report['resumed'], report['trials'], report['study']), (6, 10, 'eurusd'))
+
+    def test_other_data_with_the_same_bar_count_starts_its_own_study(self):
+        self.optimize(ohlc_frame(3000), 6)
+        report = self.optimize(ohlc_frame(3000, seed=1, start='2023-01-01'), 6)
+        self.assertEqual(report['resumed'], 0)
+        self.assertNotEqual(report['study'], 'eurusd')
+        # The original study is untouched and still resumes
+        self.assertEqual(self.optimize(ohlc_frame(3000), 6)['resumed'], 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+
+import numpy as np
+
+from trading.backtester import Backtester, IncrementalBacktest
+from trading.columnar import tolerance_report
+from trading.cost_model import TransactionCostModel
+from trading.indicator_engine import IndicatorEngine
+from trading.indicator_kernels import ema_matrix, rsi_matrix, sma_matrix
+from trading.intrabar import IntrabarExitEngine
+
+from .fixtures import ohlc_frame
+
+RULES = [
+    {'rsi': {'buy': 40, 'sell': 60}},
+    {'rsi': {'buy': 45, 'sell': 55, 'period': 7}, 'ma': {'period': 20}},
+    {'ma': {'period': 30, 'type': 'MODE_EMA'}},
+    {'macd': {}},
+    {'macd': {}, 'rsi': {'buy': 50, 'sell': 50}},
+]
+
+
+class VectorizedParityTests(unittest.TestCase):
+    """The vectorized engine trades exactly like the original bar-by-bar loop."""
+
+    def test_matches_reference_loop(self):
+        df = ohlc_frame(3000)
+        for rules in RULES:
+            with self.subTest(rules=rules):
+                vectorized = Backtester(df.copy(), rules).run()
+                reference = Backtester(df.copy(), rules, mode='reference').run()
+                self.assertGreater(len(reference), 0)
+                self.assertEqual(list(vectorized), reference)
+                self.assertEqual(Backtester.compute_metrics(vectorized), Backtester.compute_metrics(reference))
+
+
+class ChunkedParityTests(unittest.TestCase):
+    """run_chunks / IncrementalBacktest over consecutive frames match one run over all bars."""
+
+    def setUp(self):
+        self.df = ohlc_frame(6000, seed=4)
+        rng = np.random.default_rng(4)
+        times = self.df['time'].to_numpy()[::5]
+        self.costs = TransactionCostModel.from_executions(
+            'EURUSD', times, rng.uniform(0.5, 2.0, len(times)), rng.normal(0.1, 0.3, len(times))
+        )
+        risk = {'sl': 40, 'tp': 80}
+        self.stops_factory = lambda frame: IntrabarExitEngine.for_frame(frame, 'EURUSD', risk, sub_bars=frame.iloc[:0])
+
+    def chunks(self, sizes):
+        start = 0
+        for size in sizes:
+            yield self.df.iloc[start:start + size]
+            start += size
+        yield self.df.iloc[start:]
+
+    def assertSameTrades(self, full, chunked):
+        a, b = full.array, chunked.array
+        self.assertEqual(len(a), len(b))
+        for field in ('entry_bar', 'exit_bar', 'entry_time', 'exit_time', 'side', 'closed', 'exit_reason'):
+            np.testing.assert_array_equal(a[field], b[field], err_msg=field)
+        for field in ('entry_price', 'exit_price', 'profit', 'cost'):
+            np.testing.assert_allclose(a[field], b[field], rtol=1e-9, atol=1e-12, err_msg=field)
+
+    def test_run_chunks(self):
+        for rules in RULES + [{'bands': {'period': 20, 'dev': 2}, 'stoch': {}}]:
+            for stops in (False, True):
+                with self.subTest(rules=rules, stops=stops):
+                    stops_factory = self.stops_factory if stops else None
+                    frame = self.df.copy()
+                    full = Backtester(frame, rules, stops=stops_factory(frame) if stops else None, costs=self.costs).run()
+                    chunked, metrics = Backtester.run_chunks(
+                        self.chunks([1500, 1, 999, 2000]), rules, stops_factory=stops_factory, costs=self.costs
+                    )
+                    self.assertSameTrades(full, chunked)
+                    self.assertEqual(metrics, Backtester.compute_metrics(full))
+
+    def test_incremental_reads_between_feeds(self):
+        rules = RULES[1]
+        run = IncrementalBacktest(rules, costs=self.costs)
+        fed = 0
+        for chunk in self.chunks([2000, 700, 1300]):
+            run.feed(chunk)
+            fed += len(chunk)
+            full = Backtester(self.df.iloc[:fed].copy(), rules, costs=self.costs).run()
+            self.assertSameTrades(full, run.trades())
+
+
+class KernelParityTests(unittest.TestCase):
+    """The multi-period kernels agree with IndicatorEngine column by column."""
+
+    def test_matches_engine(self):
+        df = ohlc_frame(5000, seed=5)
+        periods = [2, 5, 14, 30, 200]
+        for kernel, single in ((sma_matrix, IndicatorEngine.calculate_sma),
+                               (ema_matrix, IndicatorEngine.calculate_ema),
+                               (rsi_matrix, IndicatorEngine.calculate_rsi)):
+            matrix = kernel(df, periods)
+            self.assertEqual(matrix.shape, (len(df), len(periods)))
+            for j, period in enumerate(periods):
+                with self.subTest(kernel=kernel.__name__, period=period):
+                    expected = single(df, period).to_numpy()
+                    np.testing.assert_allclose(matrix[:, j], expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+class Float32ToleranceTests(unittest.TestCase):
+    """float32 runs stay within the documented FLOAT32_TOLERANCE of float64."""
+
+    def test_within_tolerance(self):
+        df = ohlc_frame(5000, seed=6)
+        for rules in RULES + [{'bands': {'period': 20, 'dev': 2}, 'stoch': {}}]:
+            with self.subTest(rules=rules):
+                report = tolerance_report(df, rules)
+                self.assertTrue(report['ok'], report['measured'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+
+import numpy as np
+
+from trading.money_management import MoneyManager
+from trading.portfolio import PortfolioBacktester
+
+from .fixtures import ohlc_frame
+
+RULES = {'rsi': {'buy': 45, 'sell': 55}}
+
+
+def scaled(frame, factor, noise=0.0, seed=0):
+    """frame's bars times `factor`, optionally with independent noise on the closes."""
+    frame = frame.copy()
+    rng = np.random.default_rng(seed)
+    shift = np.cumsum(rng.normal(0, noise, len(frame))) if noise else 0.0
+    for column in ('open', 'high', 'low', 'close'):
+        frame[column] = (frame[column] + shift) * factor
+    return frame
+
+
+class PortfolioTests(unittest.TestCase):
+
+    def setUp(self):
+        eurusd = ohlc_frame(2000, seed=1)
+        self.frames = {
+            'EURUSD': eurusd,
+            # Moves with EURUSD, so the correlation gate has something to block
+            'GBPUSD': scaled(eurusd, 1.17, noise=0.0001, seed=2),
+            'XAUUSD': scaled(ohlc_frame(2000, seed=3), 2000),
+        }
+
+    def portfolio(self, **kwargs):
+        kwargs = {'workers': 1, 'max_concurrent_positions': 2, 'correlation_window': 100, **kwargs}
+        return PortfolioBacktester(self.frames, RULES, **kwargs)
+
+    def candidates(self, portfolio):
+        """Every per-symbol trade as (entry_time, exit_time, symbol, side), in entry order."""
+        rows = []
+        for symbol, trades in portfolio.symbol_trades().items():
+            arr = trades.array
+            exits = np.where(arr['closed'], arr['exit_time'], np.iinfo(np.int64).max)
+            rows.extend(zip(arr['entry_time'].tolist(), exits.tolist(), [symbol] * len(arr), arr['side'].tolist()))
+        return sorted(rows, key=lambda row: row[0])
+
+    def test_guardrails_in_entry_order(self):
+        portfolio = self.portfolio(max_correlation_exposure=0.5)
+        result = portfolio.run()
+        corr = portfolio.correlations()
+        corr_times = corr.index.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+        # Greedy replay: each candidate, in entry order, sees the trades accepted before it
+        accepted, skipped_for = [], {'cap': 0, 'correlation': 0}
+        for entry, exit_, symbol, side in self.candidates(portfolio):
+            held = [trade for trade in accepted if trade[1] > entry]
+            if len(held) >= 2:
+                skipped_for['cap'] += 1
+                continue
+            row = np.searchsorted(corr_times, entry, side='right') - 1
+            rhos = [corr[(symbol, other)].iat[row] for _, _, other, _ in held if other != symbol] if row >= 0 else []
+            sides = [other_side for _, _, other, other_side in held if other != symbol]
+            if any(rho * side * other_side > 0.5 for rho, other_side in zip(rhos, sides) if rho == rho):
+                skipped_for['correlation'] += 1
+                continue
+            accepted.append((entry, exit_, symbol, side))
+
+        trades = result['trades'].array
+        self.assertEqual(trades['entry_time'].tolist(), [trade[0] for trade in accepted])
+        self.assertEqual(result['symbols'], [trade[2] for trade in accepted])
+        self.assertEqual(result['skipped'], sum(skipped_for.values()))
+        self.assertGreater(skipped_for['cap'], 0)
+        self.assertGreater(skipped_for['correlation'], 0)
+
+        uncapped = self.portfolio(max_concurrent_positions=100).run()
+        self.assertEqual(uncapped['skipped'], 0)
+
+    def test_trailing_correlation(self):
+        full = self.portfolio().correlations()
+        cut = 1200
+        self.frames = {symbol: frame.iloc[:cut] for symbol, frame in self.frames.items()}
+        truncated = self.portfolio().correlations()
+        # Bars up to the cut do not depend on what comes after it
+        np.testing.assert_allclose(truncated.to_numpy(), full.iloc[:cut].to_numpy(), equal_nan=True)
+        self.assertTrue(np.isnan(full[('EURUSD', 'GBPUSD')].iloc[:99]).all())
+        self.assertGreater(full[('EURUSD', 'GBPUSD')].iloc[-1], 0.9)
+
+    def test_account_currency(self):
+        result = self.portfolio(max_concurrent_positions=100).run()
+        net = {symbol: metrics['net_pnl'] for symbol, metrics in result['per_symbol'].items()}
+        self.assertAlmostEqual(result['metrics']['total_profit'], sum(net.values()), places=1)
+        self.assertAlmostEqual(result['equity_curve'].iloc[-1], sum(net.values()), places=1)
+        self.assertEqual(result['metrics']['account_currency'], 'USD')
+        # An XAUUSD point is worth a contract of 100 ounces, not a price difference
+        xau = result['per_symbol']['XAUUSD']
+        money = MoneyManager('XAUUSD')
+        self.assertAlmostEqual(xau['net_pnl'], float(money.value_per_lot(xau['total_profit'])) * money.lot, places=1)
+
+    def test_pool_matches_single_process(self):
+        single = self.portfolio(max_correlation_exposure=0.5).run()
+        pooled = self.portfolio(max_correlation_exposure=0.5, workers=3).run()
+        for field in single['trades'].array.dtype.names:
+            np.testing.assert_array_equal(single['trades'].array[field], pooled['trades'].array[field], err_msg=field)
+        self.assertEqual(single['symbols'], pooled['symbols'])
+        self.assertEqual(single['metrics'], pooled['metrics'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from trading.backtester import Backtester
+from trading.cost_model import TransactionCostModel
+from trading.intrabar import IntrabarExitEngine
+from trading.money_management import MoneyManager
+from trading.result_cache import BacktestResultCache
+from trading.scheduler import BacktestScheduler
+
+from .fixtures import ohlc_frame
+
+RULES = {'rsi': {'buy': 40, 'sell': 60}}
+
+
+class ResultCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = BacktestResultCache(self.tmp.name)
+        self.df = ohlc_frame(3000, seed=8)
+        self.risk = {'sl': 40, 'tp': 80, 'lot': 0.1}
+
+    def backtester(self, rules=RULES, stops=False, costs=None, money=None):
+        frame = self.df.copy()
+        engine = IntrabarExitEngine.for_frame(frame, 'EURUSD', self.risk, sub_bars=frame.iloc[:0]) if stops else None
+        return Backtester(frame, rules, stops=engine, costs=costs, money=money)
+
+    def test_round_trip(self):
+        trades, metrics = self.cache.run(self.backtester(stops=True, money=MoneyManager('EURUSD', self.risk)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+
+        cached, cached_metrics = self.cache.run(self.backtester(stops=True, money=MoneyManager('EURUSD', self.risk)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(cached_metrics, metrics)
+        self.assertEqual((cached.datetime_index, cached.has_reasons), (trades.datetime_index, trades.has_reasons))
+        for field in trades.array.dtype.names:
+            np.testing.assert_array_equal(cached.array[field], trades.array[field], err_msg=field)
+
+        # Another instance over the same directory keeps its own counters
+        other = BacktestResultCache(self.tmp.name)
+        self.assertIsNone(other.get('0' * 64))
+        self.assertEqual((other.hits, other.misses), (0, 1))
+
+    def test_key_inputs(self):
+        costs = TransactionCostModel.from_executions(
+            'EURUSD', self.df['time'].to_numpy()[::10], np.full(300, 1.0), np.full(300, 0.2)
+        )
+        base = self.backtester()
+        key = self.cache.key(base.data, base.rules)
+        variants = {
+            'rules': self.cache.key(base.data, {'rsi': {'buy': 41, 'sell': 60}}),
+            'data': self.cache.key(self.df.iloc[:-1], base.rules),
+            'stops': self.cache.key(base.data, base.rules, stops=self.backtester(stops=True).stops),
+            'costs': self.cache.key(base.data, base.rules, costs=costs),
+            'money': self.cache.key(base.data, base.rules, money=MoneyManager('EURUSD', self.risk)),
+            'lot': self.cache.key(base.data, base.rules, money=MoneyManager('EURUSD', {**self.risk, 'lot': 0.2})),
+        }
+        # Canonical rules: key order does not matter
+        self.assertEqual(
+            self.cache.key(self.df, {'rsi': {'sell': 60, 'buy': 40}, 'ma': {'period': 20}}),
+            self.cache.key(self.df.copy(), {'ma': {'period': 20}, 'rsi': {'buy': 40, 'sell': 60}}),
+        )
+        self.assertEqual(len(set(variants.values()) | {key}), len(variants) + 1, variants)
+
+    def test_evicts_least_recently_used(self):
+        keys = []
+        for i, buy in enumerate((30, 35, 40)):
+            bt = self.backtester({'rsi': {'buy': buy, 'sell': 60}})
+            self.cache.run(bt)
+            keys.append(self.cache.key(bt.data, bt.rules))
+            os.utime(self.cache._path(keys[-1]), (1000 + i, 1000 + i))
+        sizes = [self.cache._path(k).stat().st_size for k in keys]
+
+        # Reading the oldest entry makes it the most recently used
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.cache.max_bytes = sizes[0] + sizes[2]
+        self.cache.evict()
+        self.assertEqual([self.cache._path(k).exists() for k in keys], [True, False, True])
+
+        self.cache.max_bytes = 1
+        self.cache.evict()
+        self.assertEqual(list(self.cache.cache_dir.glob('*.npz')), [])
+
+    def test_partial_results_are_not_cached(self):
+        scheduler = BacktestScheduler(workers=1)
+        self.addCleanup(scheduler.shutdown)
+        # Longer than one chunk, so a tiny budget stops the job after its first chunk
+        data = ohlc_frame(12000, seed=8)
+        key = self.cache.key(data, RULES)
+
+        trades, metrics = self.cache.run(Backtester(data.copy(), RULES), scheduler=scheduler, cpu_budget=1e-9)
+        self.assertTrue(metrics['partial'])
+        self.assertFalse(self.cache._path(key).exists())
+
+        trades, metrics = self.cache.run(Backtester(data.copy(), RULES), scheduler=scheduler)
+        self.assertNotIn('partial', metrics)
+        self.assertTrue(self.cache._path(key).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import unittest
+
+import numpy as np
+
+from trading.backtester import Backtester
+from trading.cost_model import TransactionCostModel
+from trading.intrabar import IntrabarExitEngine
+from trading.money_management import MoneyManager
+from trading.trade_ledger import TradeLedger
+
+from .fixtures import ohlc_frame
+
+RULES = [
+    {'rsi': {'buy': 40, 'sell': 60}},
+    {'rsi': {'buy': 45, 'sell': 55}, 'ma': {'period': 20}},
+    {'macd': {}},
+    {'bands': {'period': 20, 'dev': 2}, 'stoch': {}},
+]
+
+
+def resumed(df, rules, cuts, stops_factory=None, costs=None, risk=None):
+    """The trades of a run checkpointed at each cut and resumed over the next bars, merged."""
+    first = df.iloc[:cuts[0]].copy()
+    money = MoneyManager('EURUSD', risk) if risk else None
+    bt = Backtester(first, rules, stops=stops_factory(first) if stops_factory else None, costs=costs, money=money)
+    parts = [bt.run()]
+    checkpoint = json.loads(json.dumps(bt.checkpoint(parts[0])))
+    metrics = None
+    for start, end in zip(cuts, cuts[1:] + [len(df)]):
+        if risk:
+            money = MoneyManager('EURUSD', risk, initial_equity=checkpoint['totals']['equity'])
+        trades, metrics, checkpoint = Backtester.resume(
+            checkpoint, df.iloc[start:end], stops_factory=stops_factory, costs=costs, money=money
+        )
+        checkpoint = json.loads(json.dumps(checkpoint))
+        arr = trades.array
+        if len(arr) and arr['carried'][0]:
+            # The carried position closes the previous part's open trade
+            previous = parts[-1].array
+            arr['entry_time'][0] = previous['entry_time'][-1]
+            arr['carried'][0] = False
+            parts[-1] = parts[-1][:-1]
+        parts.append(trades)
+    return TradeLedger.concat(parts), metrics
+
+
+class ResumeParityTests(unittest.TestCase):
+    """Checkpoint + resume over appended bars reproduces a single run over all of them."""
+
+    def setUp(self):
+        self.df = ohlc_frame(6000)
+        rng = np.random.default_rng(1)
+        times = self.df['time'].to_numpy()[::7]
+        self.costs = TransactionCostModel.from_executions(
+            'EURUSD', times, rng.uniform(0.5, 2.0, len(times)), rng.normal(0.1, 0.3, len(times))
+        )
+        self.risk = {'sl': 40, 'tp': 80, 'lot': 0.1}
+        m1 = self.df.iloc[-2000:]
+        self.stops_factory = lambda frame: IntrabarExitEngine.for_frame(frame, 'EURUSD', self.risk, sub_bars=m1)
+
+    def assertSameRun(self, full, full_metrics, merged, metrics, money=False):
+        a, b = full.array, merged.array
+        self.assertEqual(len(a), len(b))
+        for field in ('entry_time', 'exit_time', 'side', 'closed'):
+            np.testing.assert_array_equal(a[field], b[field], err_msg=field)
+        for field in ('entry_price', 'exit_price', 'profit') + (('lots', 'pnl') if money else ()):
+            np.testing.assert_allclose(a[field], b[field], rtol=1e-9, atol=1e-12, err_msg=field)
+        for key, value in metrics.items():
+            self.assertAlmostEqual(value, full_metrics[key], places=2, msg=key)
+
+    def run_both(self, rules, risk=None, cuts=(3000, 3500, 3501), stops=True):
+        stops_factory = self.stops_factory if stops else None
+        frame = self.df.copy()
+        money = MoneyManager('EURUSD', risk) if risk else None
+        bt = Backtester(frame, rules, stops=stops_factory(frame) if stops else None, costs=self.costs, money=money)
+        full = bt.run()
+        merged, metrics = resumed(self.df, rules, list(cuts), stops_factory, self.costs, risk)
+        return full, Backtester.compute_metrics(full), merged, metrics
+
+    def test_plain(self):
+        for rules in RULES:
+            with self.subTest(rules=rules):
+                full, full_metrics, merged, metrics = self.run_both(rules, stops=False)
+                self.assertSameRun(full, full_metrics, merged, metrics)
+
+    def test_with_stops_and_costs(self):
+        for rules in RULES:
+            with self.subTest(rules=rules):
+                full, full_metrics, merged, metrics = self.run_both(rules)
+                self.assertSameRun(full, full_metrics, merged, metrics)
+
+    def test_with_money_management(self):
+        for risk in ({'sl': 40, 'lot': 0.1}, {'sl': 40, 'risk_percent': 1.0}):
+            for rules in RULES[:2]:
+                with self.subTest(rules=rules, risk=risk):
+                    full, full_metrics, merged, metrics = self.run_both(rules, risk)
+                    self.assertSameRun(full, full_metrics, merged, metrics, money=True)
+                    self.assertAlmostEqual(metrics['net_pnl'], full_metrics['net_pnl'], places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
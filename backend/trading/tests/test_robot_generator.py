@@ -0,0 +1,98 @@
+import ast
+import sys
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from trading.robot_generator import RobotGenerator
+from trading.rule_compiler import compile_rules
+
+from .fixtures import ohlc_frame
+
+RULES = [
+    {'rsi': {'buy': 40, 'sell': 60}},
+    {'ma': {'period': 30, 'type': 'MODE_EMA', 'slope_confirmation': True}},
+    {'macd': {}},
+    {'bands': {'period': 20, 'dev': 1.5, 'squeeze_detection': True}, 'rsi': {'buy': 45, 'sell': 55}},
+    {'stoch': {'buy': 30, 'sell': 70}, 'ma': {'period': 20}},
+]
+
+
+class FakeTerminal:
+    """The slice of the MetaTrader5 module a generated bot calls, serving bars of a frame."""
+
+    TIMEFRAME_H1 = 16385
+
+    def __init__(self, frame):
+        rates = np.zeros(len(frame), dtype=[
+            ('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+            ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8'),
+        ])
+        rates['time'] = frame['time'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+        for name in ('open', 'high', 'low', 'close'):
+            rates[name] = frame[name].to_numpy()
+        self.rates = rates
+        self.closed = 0
+
+    def copy_rates_from_pos(self, symbol, timeframe, start, count):
+        # start=1 skips the forming bar, which here is the bar right after the closed ones
+        return self.rates[max(0, self.closed - count):self.closed]
+
+    def module(self):
+        fake = types.ModuleType('MetaTrader5')
+        for name in dir(self):
+            if name.isupper() or name == 'copy_rates_from_pos':
+                setattr(fake, name, getattr(self, name))
+        return fake
+
+
+class GeneratedBotTests(unittest.TestCase):
+
+    def load(self, rules, terminal):
+        code = RobotGenerator.generate_python('Bot_1', 'EURUSD', 'H1', rules, {'lot': 0.01}, 1, 'pw', 'server')
+        namespace = {'__name__': 'generated_bot'}
+        with mock.patch.dict(sys.modules, {'MetaTrader5': terminal.module()}):
+            exec(compile(code, 'generated_bot.py', 'exec'), namespace)
+        return code, namespace
+
+    def test_runtime_is_the_streaming_path_only(self):
+        source = RobotGenerator.runtime_source()
+        for name in ('class RuleStream', 'class StreamingRSI', 'def compile_rules'):
+            self.assertIn(name, source)
+        names = set()
+        for node in ast.walk(ast.parse(source)):
+            if isinstance(node, ast.ImportFrom):
+                self.assertEqual(node.level, 0, ast.unparse(node))
+            names.add(getattr(node, 'id', None) or getattr(node, 'attr', None) or getattr(node, 'name', None))
+        for name in ('IndicatorCache', 'IndicatorGraph', 'IndicatorEngine', 'hashlib', 'batched_indicator_columns', 'evaluate'):
+            self.assertNotIn(name, names)
+
+    def test_signals_match_the_backtest(self):
+        frame = ohlc_frame(1200, seed=3)
+        for rules in RULES:
+            with self.subTest(rules=rules):
+                terminal = FakeTerminal(frame)
+                code, bot = self.load(rules, terminal)
+                history = bot['HISTORY_BARS']
+                terminal.closed = history + 50
+                seed_start = terminal.closed - history
+
+                signals = {}
+                while terminal.closed <= len(frame):
+                    df = bot['get_data'](history if bot['STREAM'] is None else 10)
+                    signals[terminal.closed - 1] = bot['signal_check'](df)
+                    terminal.closed += 1
+
+                buy, sell = compile_rules(rules).evaluate(frame.iloc[seed_start:].reset_index(drop=True))
+                expected = {
+                    bar: 'buy' if buy[bar - seed_start] else ('sell' if sell[bar - seed_start] else None)
+                    for bar in signals
+                }
+                self.assertEqual(signals, expected)
+                self.assertTrue(any(signals.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+from trading.backtester import Backtester
+from trading.cost_model import TransactionCostModel
+from trading.intrabar import IntrabarExitEngine
+from trading.money_management import MoneyManager
+from trading.scheduler import BacktestJob, BacktestScheduler
+
+from .fixtures import ohlc_frame
+
+
+class SchedulerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.df = ohlc_frame(6000, seed=7)
+        rng = np.random.default_rng(7)
+        times = self.df['time'].to_numpy()[::5]
+        self.costs = TransactionCostModel.from_executions(
+            'EURUSD', times, rng.uniform(0.5, 2.0, len(times)), rng.normal(0.1, 0.3, len(times))
+        )
+        # A quantum far below one chunk's CPU time pre-empts the job after every chunk
+        self.scheduler = BacktestScheduler(workers=1, quantum=1e-9)
+        self.addCleanup(self.scheduler.shutdown)
+
+    def backtester(self, rules, risk=None):
+        frame = self.df.copy()
+        risk = risk or {'sl': 40, 'tp': 80, 'lot': 0.1}
+        stops = IntrabarExitEngine.for_frame(frame, 'EURUSD', risk, sub_bars=frame.iloc[:0])
+        return Backtester(frame, rules, stops=stops, costs=self.costs, money=MoneyManager('EURUSD', risk))
+
+    def test_preempted_jobs_match_a_single_run(self):
+        rules = [{'rsi': {'buy': 40, 'sell': 60}}, {'macd': {}, 'ma': {'period': 20}}]
+        jobs = [BacktestJob.from_backtester(self.backtester(r), chunk_bars=700) for r in rules]
+        for job in jobs:
+            self.scheduler.submit(job)
+        for job, r in zip(jobs, rules):
+            with self.subTest(rules=r):
+                self.assertTrue(job.wait(60))
+                self.assertEqual(job.status, job.DONE)
+                # Interleaved: one slice per chunk
+                self.assertEqual(job.slices, -(-len(self.df) // 700))
+                trades, metrics = job.result()
+                expected = self.backtester(r).run()
+                for field in ('entry_bar', 'exit_bar', 'side', 'closed', 'exit_reason'):
+                    np.testing.assert_array_equal(trades.array[field], expected.array[field], err_msg=field)
+                for field in ('entry_price', 'exit_price', 'profit', 'cost', 'lots', 'pnl'):
+                    np.testing.assert_allclose(trades.array[field], expected.array[field], rtol=1e-9, atol=1e-12, err_msg=field)
+                self.assertEqual(metrics, Backtester.compute_metrics(expected))
+
+    def test_cpu_budget_cut_off(self):
+        job = BacktestJob.from_backtester(self.backtester({'rsi': {}}), chunk_bars=1000, cpu_budget=1e-9)
+        self.scheduler.run(job, timeout=60)
+        self.assertEqual(job.status, job.BUDGET_EXHAUSTED)
+        trades, metrics = job.result()
+        self.assertTrue(metrics['partial'])
+        self.assertEqual(metrics['bars_tested'], 1000)
+        self.assertLess(trades.array['entry_bar'].max(initial=0), 1000)
+        # Out of budget stays out of budget
+        self.scheduler.submit(job)
+        self.assertEqual(job.position, 1000)
+
+    def test_successive_halving(self):
+        df = self.df.iloc[:3000]
+        candidates = [{'rsi': {'buy': buy, 'sell': 100 - buy}} for buy in (20, 25, 30, 35, 40, 42, 45, 47, 49)]
+        report = self.scheduler.successive_halving(df, candidates, eta=3)
+
+        self.assertEqual(report['rungs'], [
+            {'bars': 1000, 'candidates': 9, 'kept': 3},
+            {'bars': 3000, 'candidates': 3, 'kept': 3},
+        ])
+
+        def win_rate(rules, bars):
+            metrics = Backtester.compute_metrics(Backtester(df.iloc[:bars].copy(), rules).run())
+            return metrics.get('win_rate', 0) if metrics.get('total_trades', 0) else -np.inf
+
+        first_rung = sorted(candidates, key=lambda rules: win_rate(rules, 1000), reverse=True)[:3]
+        survivors = [result['rules'] for result in report['results']]
+        self.assertCountEqual(survivors, first_rung)
+        self.assertEqual(survivors, sorted(first_rung, key=lambda rules: win_rate(rules, 3000), reverse=True))
+        for result in report['results']:
+            self.assertEqual(result['status'], BacktestJob.DONE)
+            self.assertEqual(result['metrics'], Backtester.compute_metrics(Backtester(df.copy(), result['rules']).run()))
+
+
+if __name__ == '__main__':
+    unittest.main()
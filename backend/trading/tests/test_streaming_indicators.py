@@ -0,0 +1,91 @@
+import unittest
+
+import numpy as np
+
+from trading.indicator_engine import IndicatorEngine
+from trading.rule_compiler import compile_rules
+from trading.streaming_indicators import (
+    StreamingADX, StreamingATR, StreamingBollingerBands, StreamingEMA, StreamingIndicator,
+    StreamingMACD, StreamingRSI, StreamingSMA, StreamingStochastic,
+)
+
+from .fixtures import ohlc_frame
+
+# (streaming state, batch function, parameters, absolute tolerance)
+INDICATORS = [
+    (StreamingSMA, IndicatorEngine.calculate_sma, {'period': 20}, 1e-12),
+    (StreamingEMA, IndicatorEngine.calculate_ema, {'period': 20}, 1e-12),
+    (StreamingRSI, IndicatorEngine.calculate_rsi, {'period': 14}, 1e-8),
+    (StreamingMACD, IndicatorEngine.calculate_macd, {'fast': 12, 'slow': 26, 'signal': 9}, 1e-12),
+    (StreamingBollingerBands, IndicatorEngine.calculate_bollinger_bands, {'period': 20, 'std': 2}, 1e-7),
+    (StreamingATR, IndicatorEngine.calculate_atr, {'period': 14}, 1e-12),
+    (StreamingStochastic, IndicatorEngine.calculate_stochastic, {'k_period': 5, 'd_period': 3, 'slowing': 3}, 1e-8),
+    (StreamingADX, IndicatorEngine.calculate_adx, {'period': 14}, 1e-8),
+]
+
+
+def as_columns(values):
+    return [np.asarray(column, dtype=float) for column in (values if isinstance(values, tuple) else (values,))]
+
+
+class StreamingParityTests(unittest.TestCase):
+    """A streaming state, fresh or seeded with history, matches the batch series bar for bar."""
+
+    def setUp(self):
+        self.df = ohlc_frame(1500)
+
+    def assertSeries(self, streamed, batch, atol, offset=0):
+        streamed = [np.array(column) for column in zip(*[value if isinstance(value, tuple) else (value,) for value in streamed])]
+        for got, expected in zip(streamed, as_columns(batch)):
+            np.testing.assert_allclose(got, expected[offset:], rtol=0, atol=atol, equal_nan=True)
+
+    def test_from_first_bar(self):
+        bars = self.df.to_dict('records')
+        for state, batch, params, atol in INDICATORS:
+            with self.subTest(state=state.__name__):
+                stream = state(**params)
+                self.assertSeries([stream.update(bar) for bar in bars], batch(self.df, **params), atol)
+
+    def test_seeded_with_history(self):
+        cut = 1000
+        bars = self.df.iloc[cut:].to_dict('records')
+        for state, batch, params, atol in INDICATORS:
+            with self.subTest(state=state.__name__):
+                stream = state.from_history(self.df.iloc[:cut], **params)
+                self.assertSeries([stream.update(bar) for bar in bars], batch(self.df, **params), atol, offset=cut)
+
+    def test_base_is_abstract(self):
+        with self.assertRaises(TypeError):
+            StreamingIndicator()
+
+        class Partial(StreamingIndicator):
+            def update(self, bar):
+                return NotImplemented
+
+        with self.assertRaises(TypeError):
+            Partial()
+
+
+class RuleStreamTests(unittest.TestCase):
+
+    def test_matches_evaluate(self):
+        df = ohlc_frame(1500, seed=2)
+        cut = 800
+        for rules in (
+            {'rsi': {'buy': 40, 'sell': 60}},
+            {'ma': {'period': 30, 'type': 'MODE_EMA', 'slope_confirmation': True}},
+            {'macd': {}, 'stoch': {'buy': 40, 'sell': 60}},
+            {'bands': {'period': 20, 'dev': 1.5}},
+        ):
+            with self.subTest(rules=rules):
+                compiled = compile_rules(rules)
+                stream = compiled.stream(df.iloc[:cut])
+                signals = [stream.update(bar) for bar in df.iloc[cut:].to_dict('records')]
+                buy, sell = compiled.evaluate(df)
+                expected = ['buy' if b else ('sell' if s else None) for b, s in zip(buy[cut:], sell[cut:])]
+                self.assertEqual(signals, expected)
+                self.assertTrue(any(signals))
+
+
+if __name__ == '__main__':
+    unittest.main()
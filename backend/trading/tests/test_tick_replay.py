@@ -0,0 +1,164 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from trading.tick_replay import TickReplayEngine, TickStore
+from trading.trade_ledger import EXIT_REASONS
+
+HOUR = 3600 * 1_000_000_000
+POINT = 0.0001
+
+
+def tick_time(tick, per_bar=3):
+    """Time of the tick-th tick when per_bar ticks are evenly spaced inside consecutive H1 bars."""
+    return tick // per_bar * HOUR + tick % per_bar * (HOUR // per_bar)
+
+
+class TickReplayTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def store(self, bid, ask, per_bar=3):
+        store = TickStore('EURUSD', root=tempfile.mkdtemp(dir=self.tmp.name))
+        store.append(tick_time(np.arange(len(bid)), per_bar), bid, ask)
+        return store
+
+    def replay(self, store, buy, sell, **kwargs):
+        """Runs the engine with the given per-bar signals instead of compiled rules."""
+        compiled = mock.Mock()
+        compiled.evaluate.return_value = (np.asarray(buy, dtype=bool), np.asarray(sell, dtype=bool))
+        with mock.patch('trading.tick_replay.compile_rules', return_value=compiled):
+            engine = TickReplayEngine(store, {}, timeframe='H1', point=POINT, **kwargs)
+            return engine, engine.run()
+
+    def test_aggregate_across_chunks(self):
+        rng = np.random.default_rng(15)
+        # Irregular tick counts per bar, including bars longer than several chunks
+        times = np.sort(np.concatenate([rng.integers(0, 6 * HOUR, 200), np.full(40, 2 * HOUR + 5)]))
+        bid = 1.1 + rng.normal(0, 0.001, len(times))
+        expected = pd.DataFrame({'id': times // HOUR, 'bid': bid}).groupby('id')['bid'].agg(['first', 'max', 'min', 'last'])
+
+        for chunk in (7, 16, len(times)):
+            with self.subTest(chunk=chunk), mock.patch.object(TickReplayEngine, 'CHUNK_TICKS', chunk):
+                bars = TickReplayEngine._aggregate(times, bid, HOUR)
+                self.assertEqual(len(bars), len(expected))
+                np.testing.assert_array_equal(bars['time'].to_numpy().astype(np.int64), expected.index.to_numpy() * HOUR)
+                np.testing.assert_array_equal(bars[['open', 'high', 'low', 'close']].to_numpy(), expected.to_numpy())
+
+    def test_longs_fill_at_ask_shorts_at_bid(self):
+        bid = 1.1 + np.arange(24) * 0.0001
+        ask = bid + 0.0002
+        store = self.store(bid, ask)
+        buy = [1, 0, 0, 0, 0, 1, 0, 0]
+        sell = [0, 0, 1, 1, 0, 0, 0, 0]
+        _, ledger = self.replay(store, buy, sell)
+        trades = ledger.array
+        times = store.columns()['time']
+
+        # Long on bar 0 fills at the ask of the next bar's first tick and exits at the bid on bar 2's close
+        # signal; the short from bar 3 enters at the bid and covers at the ask after bar 5
+        np.testing.assert_array_equal(trades['entry_bar'], [0, 3])
+        np.testing.assert_array_equal(trades['exit_bar'], [2, 5])
+        np.testing.assert_array_equal(trades['side'], [1, -1])
+        np.testing.assert_array_equal(trades['entry_time'], times[[3, 12]])
+        np.testing.assert_array_equal(trades['exit_time'], times[[9, 18]])
+        np.testing.assert_array_equal(trades['entry_price'], [ask[3], bid[12]])
+        np.testing.assert_array_equal(trades['exit_price'], [bid[9], ask[18]])
+        np.testing.assert_allclose(trades['profit'], [bid[9] - ask[3], bid[12] - ask[18]])
+        np.testing.assert_allclose(trades['cost'], [0.0002, 0.0002])
+        self.assertEqual([EXIT_REASONS[r] for r in trades['exit_reason']], ['signal', 'signal'])
+
+        # Latency moves the fill to the first tick at least that long after the bar closes
+        _, late = self.replay(store, buy, sell, latency_ms=1000 * 1000)
+        np.testing.assert_array_equal(late.array['entry_time'], times[[4, 13]])
+        np.testing.assert_array_equal(late.array['entry_price'], [ask[4], bid[13]])
+
+    def test_deviation_rejects(self):
+        bid = np.full(12, 1.1)
+        bid[3:] += 5 * POINT
+        store = self.store(bid, bid + 0.0002)
+        buy, sell = [1, 0, 0, 0], [0, 0, 1, 0]
+
+        # The long's fill moved 5 points from the quote at the signal; the later short fills unmoved
+        engine, ledger = self.replay(store, buy, sell, deviation=3)
+        self.assertEqual(engine.stats['rejected'], 1)
+        np.testing.assert_array_equal(ledger.array['entry_bar'], [2])
+        np.testing.assert_array_equal(ledger.array['side'], [-1])
+
+        engine, ledger = self.replay(store, buy, sell, deviation=6)
+        self.assertEqual(engine.stats['rejected'], 0)
+        np.testing.assert_array_equal(ledger.array['side'], [1])
+        self.assertAlmostEqual(ledger.array['entry_price'][0], 1.1007)
+
+        engine, ledger = self.replay(store, buy, sell)
+        self.assertEqual(engine.stats['rejected'], 0)
+        self.assertEqual(len(ledger.array), 1)
+
+    def test_long_stops_trigger_on_the_bid(self):
+        bid = np.full(9, 1.1)
+        ask = bid + 0.0004
+        # Entry at ask 1.1004: TP 1.1014 / SL 1.0994. The ask touches the TP but a long closes at the bid
+        bid[4], ask[4] = 1.1010, 1.1014
+        bid[5], ask[5] = 1.0993, 1.0997
+        _, ledger = self.replay(self.store(bid, ask), [1, 0, 0], [0, 0, 0], sl_points=10, tp_points=10)
+        trade = ledger.array[0]
+        self.assertEqual(EXIT_REASONS[trade['exit_reason']], 'sl')
+        self.assertEqual((trade['exit_bar'], trade['exit_price']), (1, 1.0993))
+        self.assertEqual(trade['exit_time'], tick_time(5))
+
+    def test_short_stops_trigger_on_the_ask(self):
+        bid = np.full(9, 1.1)
+        ask = bid + 0.0004
+        # Entry at bid 1.1000: TP 1.0990 / SL 1.1010. The bid touches the TP but a short closes at the ask
+        bid[4], ask[4] = 1.0990, 1.0994
+        bid[5], ask[5] = 1.1007, 1.1011
+        _, ledger = self.replay(self.store(bid, ask), [0, 0, 0], [1, 0, 0], sl_points=10, tp_points=10)
+        trade = ledger.array[0]
+        self.assertEqual(EXIT_REASONS[trade['exit_reason']], 'sl')
+        self.assertEqual((trade['exit_bar'], trade['exit_price']), (1, 1.1011))
+        self.assertEqual(trade['exit_time'], tick_time(5))
+
+        # Once the ask reaches it, the short takes profit
+        ask[5] = 1.0990
+        _, ledger = self.replay(self.store(bid, ask), [0, 0, 0], [1, 0, 0], sl_points=10, tp_points=10)
+        self.assertEqual(EXIT_REASONS[ledger.array[0]['exit_reason']], 'tp')
+        self.assertEqual(ledger.array[0]['exit_price'], 1.0990)
+
+
+class TickStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = TickStore('eurusd', root=self.tmp.name)
+
+    def test_round_trip(self):
+        times = pd.date_range('2024-01-01', periods=5, freq='s').to_numpy()
+        self.assertEqual(self.store.append(times, np.arange(5.0), np.arange(5.0) + 0.5), 5)
+        self.assertEqual(self.store.append(times[-1:] + np.timedelta64(1, 's'), [5.0], [5.5]), 1)
+        columns = self.store.columns()
+        self.assertEqual(len(self.store), 6)
+        np.testing.assert_array_equal(columns['time'][:5], times.astype('datetime64[ns]').astype(np.int64))
+        np.testing.assert_array_equal(columns['ask'], np.arange(6.0) + 0.5)
+        self.assertEqual(self.store.dir.name, 'EURUSD')
+
+    def test_rejects_non_increasing_times(self):
+        self.store.append([100, 200, 200, 300], [1.0] * 4, [1.1] * 4)
+        with self.assertRaises(ValueError):
+            self.store.append([400, 350], [1.0] * 2, [1.1] * 2)
+        # Starting at or before the last stored tick would duplicate or reorder stored ticks
+        for start in (300, 250):
+            with self.subTest(start=start), self.assertRaises(ValueError):
+                self.store.append([start, 500], [1.0] * 2, [1.1] * 2)
+        # Nothing from a rejected batch was written
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(self.store.last_time(), 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from trading.backtester import Backtester
+from trading.rule_compiler import compile_rules
+from trading.trade_ledger import TradeLedger
+from trading.walk_forward import WalkForwardRunner
+
+from .fixtures import ohlc_frame
+
+GRID = {'rsi': {'buy': [30, 40, 45], 'sell': [55, 60, 70]}}
+
+
+class WalkForwardTests(unittest.TestCase):
+
+    def setUp(self):
+        self.df = ohlc_frame(7000, seed=11)
+        self.runner = WalkForwardRunner(self.df, GRID, windows=4, in_sample_ratio=3, workers=1)
+        self.report = self.runner.run()
+
+    def window_trades(self, rules, start, end):
+        """The rules' trades on bars [start, end), with indicators warmed up on the full series."""
+        columns = {name: np.asarray(values) for name, values in compile_rules(rules).indicator_columns(self.df).items()}
+        columns['close'] = self.df['close'].to_numpy()
+        return Backtester.run_arrays({k: v[start:end] for k, v in columns.items()}, rules, index=np.arange(start, end))
+
+    def test_windows_do_not_overlap(self):
+        windows = self.runner.split_windows()
+        self.assertEqual(windows[-1]['end'], len(self.df))
+        for k, window in enumerate(windows):
+            self.assertLess(window['start'], window['split'])
+            self.assertLess(window['split'], window['end'])
+            self.assertEqual(window['split'] - window['start'], 3 * (window['end'] - window['split']))
+            if k:
+                # Out-of-sample blocks tile the tail of the history back to back
+                self.assertEqual(window['split'], windows[k - 1]['end'])
+        for window in self.report['windows']:
+            in_sample = pd.to_datetime(window['in_sample'])
+            out_of_sample = pd.to_datetime(window['out_of_sample'])
+            self.assertLess(in_sample[1], out_of_sample[0])
+
+    def test_rules_picked_in_sample(self):
+        for window, bounds in zip(self.report['windows'], self.runner.split_windows()):
+            scores = [
+                Backtester.compute_metrics(self.window_trades(rules, bounds['start'], bounds['split'])).get('win_rate', 0)
+                for rules in self.runner.sweep.combinations()
+            ]
+            self.assertEqual(window['in_sample_metrics']['win_rate'], max(scores))
+
+    def test_out_of_sample_aggregate(self):
+        parts = []
+        for window, bounds in zip(self.report['windows'], self.runner.split_windows()):
+            trades = self.window_trades(window['rules'], bounds['split'], bounds['end'])
+            self.assertEqual(window['out_of_sample_metrics'], Backtester.compute_metrics(trades))
+            # Entry times are positions in the full history
+            entries = trades.array['entry_time']
+            self.assertTrue(((entries >= bounds['split']) & (entries < bounds['end'])).all())
+            parts.append(trades)
+        self.assertEqual(self.report['out_of_sample'], Backtester.compute_metrics(TradeLedger.concat(parts)))
+        self.assertEqual(
+            self.report['out_of_sample']['total_trades'],
+            sum(w['out_of_sample_metrics']['total_trades'] for w in self.report['windows'])
+        )
+
+    def test_pool_matches_inline(self):
+        pooled = WalkForwardRunner(self.df, GRID, windows=4, in_sample_ratio=3, workers=2).run()
+        self.assertEqual(pooled, self.report)
+
+
+if __name__ == '__main__':
+    unittest.main()
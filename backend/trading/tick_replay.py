@@ -0,0 +1,287 @@
+"""
+Tick-Level Bid/Ask Replay
+Replays stored ticks through the compiled strategy with the fills a live MT5 market order gets:
+buys at the ask and sells at the bid of the first tick after the signal, with SL/TP checked on
+every tick in between.
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .intrabar import IntrabarExitEngine
+from .rule_compiler import compile_rules
+from .trade_ledger import EXIT_REASONS, TradeLedger
+
+TIMEFRAME_SECONDS = {
+    'M1': 60, 'M5': 300, 'M15': 900, 'M30': 1800,
+    'H1': 3600, 'H4': 14400, 'D1': 86400,
+}
+TICK_COLUMNS = (('time', np.int64), ('bid', np.float64), ('ask', np.float64))
+
+
+class TickStore:
+    """
+    Append-only tick storage for one symbol: one raw little-endian file per column
+    (time as int64 ns, bid, ask) under trading_data/ticks/<SYMBOL>/, read back with np.memmap so
+    replaying tens of millions of ticks never loads them all into memory.
+    """
+
+    def __init__(self, symbol, root=None):
+        self.symbol = symbol.upper()
+        self.root = Path(root) if root else self.default_dir()
+        self.dir = self.root / self.symbol
+
+    @staticmethod
+    def default_dir():
+        try:
+            from django.conf import settings
+            base_dir = Path(settings.BASE_DIR)
+        except Exception:
+            base_dir = Path(__file__).resolve().parent.parent
+        return base_dir / "trading_data" / "ticks"
+
+    def _path(self, column):
+        return self.dir / f"{column}.bin"
+
+    def __len__(self):
+        path = self._path('time')
+        return path.stat().st_size // 8 if path.exists() else 0
+
+    def columns(self):
+        """{'time', 'bid', 'ask'} read-only memmaps (empty arrays when nothing is stored)."""
+        n = len(self)
+        if n == 0:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in TICK_COLUMNS}
+        return {
+            name: np.memmap(self._path(name), dtype=dtype, mode='r', shape=(n,))
+            for name, dtype in TICK_COLUMNS
+        }
+
+    def last_time(self):
+        n = len(self)
+        if n == 0:
+            return None
+        return int(np.memmap(self._path('time'), dtype=np.int64, mode='r', offset=(n - 1) * 8, shape=(1,))[0])
+
+    def append(self, times, bid, ask):
+        """
+        Appends ticks (times as datetime64-compatible values or int64 ns). They must be sorted and
+        start after the last stored tick. Returns the number of ticks written.
+        """
+        times = np.asarray(times)
+        times = times.astype('datetime64[ns]').astype(np.int64) if times.dtype.kind == 'M' else times.astype(np.int64)
+        if len(times) == 0:
+            return 0
+        if np.any(np.diff(times) < 0):
+            raise ValueError("Ticks must be sorted by time")
+        last = self.last_time()
+        if last is not None and times[0] <= last:
+            raise ValueError("Ticks overlap the stored range; only newer ticks can be appended")
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for (name, dtype), values in zip(TICK_COLUMNS, (times, bid, ask)):
+            with open(self._path(name), "ab") as f:
+                f.write(np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<')).tobytes())
+        return len(times)
+
+    def import_mt5(self, date_from, date_to):
+        """Downloads ticks from the connected MT5 terminal and appends the ones not stored yet."""
+        from .mt5_connector import mt5
+
+        if mt5 is None:
+            raise RuntimeError("MT5 library not found")
+        ticks = mt5.copy_ticks_range(self.symbol, date_from, date_to, mt5.COPY_TICKS_INFO)
+        if ticks is None or len(ticks) == 0:
+            return 0
+        times = ticks['time_msc'].astype(np.int64) * 1_000_000
+        last = self.last_time()
+        keep = times > last if last is not None else slice(None)
+        return self.append(times[keep], ticks['bid'][keep], ticks['ask'][keep])
+
+    def sync_mt5(self, days=7):
+        """
+        import_mt5() up to now, from the last stored tick or `days` back, whichever is later.
+        Needs a terminal already logged in (e.g. UserMT5Manager.connect()).
+        """
+        date_to = datetime.now(timezone.utc)
+        date_from = date_to - timedelta(days=days)
+        last = self.last_time()
+        if last is not None:
+            date_from = max(date_from, datetime.fromtimestamp(last / 1e9, timezone.utc))
+        return self.import_mt5(date_from, date_to)
+
+
+class TickReplayEngine:
+    """
+    Builds bid bars for `timeframe` from the ticks, evaluates the compiled rules at each bar close
+    and fills on ticks:
+      - market orders fill at the first tick at least latency_ms after the bar closes, longs at
+        the ask and shorts at the bid; positions close on the opposite side of the quote
+      - like ORDER_FILLING_IOC with a deviation, an entry whose fill moved more than deviation
+        points from the quote at the signal is cancelled instead of filled (deviation=None
+        accepts every fill)
+      - SL/TP (points, as in risk_settings) are checked on every tick while the position is
+        open: long stops trigger on the bid, short stops on the ask, filling at that tick's price
+
+    Returns a TradeLedger with tick times, bar positions in bars() and exit reasons. Profits are
+    already net of the spread crossed at the fills; 'cost' reports that spread (half per fill).
+    """
+
+    CHUNK_TICKS = 5_000_000
+
+    def __init__(self, store, rules, timeframe='H1', sl_points=None, tp_points=None, point=None,
+                 latency_ms=0, deviation=None):
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Unknown timeframe '{timeframe}', expected one of {tuple(TIMEFRAME_SECONDS)}")
+        self.store = store
+        self.rules = rules
+        self.timeframe = timeframe
+        self.point = point or IntrabarExitEngine.default_point(store.symbol)
+        self.sl_dist = float(sl_points or 0) * self.point
+        self.tp_dist = float(tp_points or 0) * self.point
+        self.latency_ns = int(latency_ms * 1_000_000)
+        self.deviation = None if deviation is None else float(deviation) * self.point
+        self.ticks = store.columns()
+        self._bars = None
+        self.stats = {}
+
+    def bars(self):
+        """Bid OHLC bars aggregated from the ticks one chunk at a time (cached)."""
+        if self._bars is None:
+            self._bars = self._aggregate(self.ticks['time'], self.ticks['bid'], TIMEFRAME_SECONDS[self.timeframe] * 1_000_000_000)
+        return self._bars
+
+    @classmethod
+    def _aggregate(cls, times, bid, span):
+        parts = []
+        for lo in range(0, len(times), cls.CHUNK_TICKS):
+            t = np.asarray(times[lo:lo + cls.CHUNK_TICKS])
+            b = np.asarray(bid[lo:lo + cls.CHUNK_TICKS])
+            ids = t // span
+            first = np.concatenate([[0], np.flatnonzero(np.diff(ids)) + 1])
+            last = np.append(first[1:] - 1, len(t) - 1)
+            part = [ids[first], b[first], np.maximum.reduceat(b, first), np.minimum.reduceat(b, first), b[last]]
+            if parts and parts[-1][0][-1] == part[0][0]:
+                # The first bar of this chunk continues the last bar of the previous one
+                prev = parts[-1]
+                prev[2][-1] = max(prev[2][-1], part[2][0])
+                prev[3][-1] = min(prev[3][-1], part[3][0])
+                prev[4][-1] = part[4][0]
+                part = [col[1:] for col in part]
+            if len(part[0]):
+                parts.append(part)
+
+        if not parts:
+            return pd.DataFrame(columns=['time', 'open', 'high', 'low', 'close'])
+        ids, opens, highs, lows, closes = (np.concatenate(cols) for cols in zip(*parts))
+        return pd.DataFrame({
+            'time': (ids * span).astype('datetime64[ns]'),
+            'open': opens, 'high': highs, 'low': lows, 'close': closes,
+        })
+
+    def run(self):
+        bars = self.bars()
+        times, bid, ask = self.ticks['time'], self.ticks['bid'], self.ticks['ask']
+        n_ticks = len(times)
+        if len(bars) == 0:
+            self.stats = {'ticks': n_ticks, 'bars': 0, 'rejected': 0}
+            return TradeLedger(0, datetime_index=True, has_reasons=True)
+
+        buy, sell = compile_rules(self.rules).evaluate(bars)
+        bar_starts = bars['time'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        span = TIMEFRAME_SECONDS[self.timeframe] * 1_000_000_000
+        # Tick that fills an order placed at each bar's close
+        fill_tick = np.searchsorted(times, bar_starts + span + self.latency_ns, side='left')
+
+        any_bars = np.flatnonzero(buy | sell)
+        buy_bars = np.flatnonzero(buy)
+        sell_bars = np.flatnonzero(sell)
+
+        rows = []
+        rejected = 0
+        start = 0
+        while True:
+            k = np.searchsorted(any_bars, start)
+            if k == len(any_bars):
+                break
+            entry = any_bars[k]
+            t_in = fill_tick[entry]
+            if t_in >= n_ticks:
+                break
+            side = 1 if buy[entry] else -1
+            entry_price = ask[t_in] if side == 1 else bid[t_in]
+            if self.deviation is not None and t_in > 0:
+                quoted = ask[t_in - 1] if side == 1 else bid[t_in - 1]
+                if abs(entry_price - quoted) > self.deviation:
+                    rejected += 1
+                    start = entry + 1
+                    continue
+
+            exit_bars = sell_bars if side == 1 else buy_bars
+            j = np.searchsorted(exit_bars, entry + 1)
+            exit_ = exit_bars[j] if j < len(exit_bars) else -1
+            t_out = fill_tick[exit_] if exit_ >= 0 else n_ticks
+            reason = 'signal'
+
+            hit = self._first_stop(side, entry_price, t_in + 1, t_out)
+            if hit is not None:
+                t_out, reason = hit
+                exit_ = int(np.searchsorted(bar_starts, times[t_out], side='right') - 1)
+
+            if t_out >= n_ticks:
+                rows.append((entry, -1, times[t_in], 0, entry_price, np.nan, side, False, '', (ask[t_in] - bid[t_in]) / 2))
+                break
+            exit_price = bid[t_out] if side == 1 else ask[t_out]
+            rows.append((
+                entry, exit_, times[t_in], times[t_out], entry_price, exit_price, side, True, reason,
+                (ask[t_in] - bid[t_in] + ask[t_out] - bid[t_out]) / 2
+            ))
+            start = exit_ + 1
+
+        self.stats = {'ticks': n_ticks, 'bars': len(bars), 'rejected': rejected}
+        return self._ledger(rows)
+
+    def _first_stop(self, side, entry_price, lo, hi):
+        """(tick, reason) of the first SL/TP trigger in ticks [lo, hi), scanned in chunks."""
+        if self.sl_dist <= 0 and self.tp_dist <= 0:
+            return None
+        quote = self.ticks['bid'] if side == 1 else self.ticks['ask']
+        sl_level = entry_price - side * self.sl_dist
+        tp_level = entry_price + side * self.tp_dist
+        hi = min(hi, len(quote))
+        for block in range(lo, hi, self.CHUNK_TICKS):
+            prices = np.asarray(quote[block:min(block + self.CHUNK_TICKS, hi)])
+            sl_hit = (prices - sl_level) * side <= 0 if self.sl_dist > 0 else np.zeros(len(prices), dtype=bool)
+            tp_hit = (prices - tp_level) * side >= 0 if self.tp_dist > 0 else np.zeros(len(prices), dtype=bool)
+            hit = sl_hit | tp_hit
+            if hit.any():
+                i = int(np.argmax(hit))
+                return block + i, 'sl' if sl_hit[i] else 'tp'
+        return None
+
+    @staticmethod
+    def _ledger(rows):
+        if not rows:
+            return TradeLedger(0, datetime_index=True, has_reasons=True)
+        entry_bar, exit_bar, entry_time, exit_time, entry_price, exit_price, side, closed, reason, cost = (
+            np.asarray(col) for col in zip(*rows)
+        )
+        closed = closed.astype(bool)
+        return TradeLedger.from_columns(
+            datetime_index=True,
+            has_reasons=True,
+            entry_bar=entry_bar,
+            exit_bar=exit_bar,
+            entry_time=entry_time,
+            exit_time=exit_time,
+            entry_price=entry_price,
+            exit_price=exit_price,
+            side=side,
+            profit=np.where(closed, (exit_price - entry_price) * side, 0.0),
+            cost=cost,
+            closed=closed,
+            exit_reason=[EXIT_REASONS.index(r) for r in reason]
+        )
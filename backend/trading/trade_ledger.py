@@ -0,0 +1,211 @@
+"""
+Structured Trade Ledger
+Columnar storage for backtest trades: the engine fills preallocated NumPy fields and
+metrics, caches and reports read the same buffers instead of per-trade dicts.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Times are int64: nanoseconds for timestamp indexes, the raw label for positional ones.
+# profit is in price units; lots / pnl (account currency) stay zero unless a MoneyManager sized the run
+TRADE_DTYPE = np.dtype([
+    ('entry_bar', 'i8'),
+    ('exit_bar', 'i8'),
+    ('entry_time', 'i8'),
+    ('exit_time', 'i8'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('side', 'i1'),
+    ('profit', 'f8'),
+    ('cost', 'f8'),
+    ('closed', '?'),
+    ('exit_reason', 'i1'),
+    ('carried', '?'),
+    ('lots', 'f8'),
+    ('pnl', 'f8'),
+])
+
+EXIT_REASONS = ('', 'signal', 'sl', 'tp')
+
+
+class TradeLedger:
+    """
+    `array` is the valid slice of the underlying buffer (a view, not a copy).
+    Indexing or iterating yields the legacy trade dicts, so code written against the old
+    list-of-dicts output keeps working; hot paths should read the columns instead.
+
+    datetime_index: times are nanoseconds and read back as pd.Timestamp.
+    has_reasons: exits were resolved with SL/TP simulation, so dicts carry 'exit_reason'.
+    """
+
+    def __init__(self, capacity=0, datetime_index=False, has_reasons=False):
+        self._buffer = np.zeros(capacity, dtype=TRADE_DTYPE)
+        self.size = 0
+        self.datetime_index = datetime_index
+        self.has_reasons = has_reasons
+
+    @property
+    def array(self):
+        return self._buffer[:self.size]
+
+    @classmethod
+    def from_array(cls, array, datetime_index=False, has_reasons=False):
+        ledger = cls(0, datetime_index, has_reasons)
+        ledger._buffer = array
+        ledger.size = len(array)
+        return ledger
+
+    @classmethod
+    def from_columns(cls, datetime_index=False, has_reasons=False, **columns):
+        """Builds a ledger from whole columns at once (fields left out stay zero)."""
+        n = len(next(iter(columns.values()))) if columns else 0
+        ledger = cls(n, datetime_index, has_reasons)
+        ledger.size = n
+        arr = ledger.array
+        for name, values in columns.items():
+            arr[name] = values
+        return ledger
+
+    @classmethod
+    def from_dicts(cls, trades):
+        """Packs a legacy trades list (e.g. from the reference loop)."""
+        datetime_index = any(_is_datetime(t['entry_time']) for t in trades[:1])
+        ledger = cls(len(trades), datetime_index, any('exit_reason' in t for t in trades))
+        for t in trades:
+            closed = 'profit' in t
+            ledger.append(
+                -1, -1,
+                _time_int(t['entry_time']),
+                _time_int(t['exit_time']) if closed else 0,
+                t['entry_price'],
+                t['exit_price'] if closed else np.nan,
+                1 if t['type'] == 'buy' else -1,
+                t['profit'] if closed else 0.0,
+                closed,
+                t.get('exit_reason') or '',
+                t.get('carried', False),
+                t.get('cost', 0.0)
+            )
+        return ledger
+
+    @classmethod
+    def coerce(cls, trades):
+        return trades if isinstance(trades, cls) else cls.from_dicts(trades)
+
+    @classmethod
+    def concat(cls, ledgers):
+        ledgers = [l for l in ledgers if l is not None]
+        if not ledgers:
+            return cls()
+        return cls.from_array(
+            np.concatenate([l.array for l in ledgers]),
+            datetime_index=any(l.datetime_index for l in ledgers),
+            has_reasons=any(l.has_reasons for l in ledgers)
+        )
+
+    def append(self, entry_bar, exit_bar, entry_time, exit_time, entry_price, exit_price,
+               side, profit, closed, reason='', carried=False, cost=0.0):
+        if self.size == len(self._buffer):
+            self._grow(max(16, 2 * self.size))
+        self._buffer[self.size] = (
+            entry_bar, exit_bar, entry_time, exit_time, entry_price, exit_price,
+            side, profit, cost, closed, EXIT_REASONS.index(reason or ''), carried, 0.0, 0.0
+        )
+        self.size += 1
+
+    def _grow(self, capacity):
+        buffer = np.zeros(capacity, dtype=TRADE_DTYPE)
+        buffer[:self.size] = self._buffer[:self.size]
+        self._buffer = buffer
+
+    def closed(self):
+        arr = self.array
+        return arr[arr['closed']]
+
+    def profits(self):
+        """Closed-trade P&L in execution order."""
+        return self.closed()['profit']
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return TradeLedger.from_array(self.array[i], self.datetime_index, self.has_reasons)
+        return self._to_dict(self.array[i])
+
+    def __iter__(self):
+        for row in self.array:
+            yield self._to_dict(row)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def time_value(self, value):
+        """A stored int64 time as the index label it came from."""
+        return pd.Timestamp(int(value)) if self.datetime_index else int(value)
+
+    def _to_dict(self, row):
+        trade = {
+            'entry_time': self.time_value(row['entry_time']),
+            'entry_price': row['entry_price'],
+            'type': 'buy' if row['side'] == 1 else 'sell'
+        }
+        if row['closed']:
+            trade['exit_time'] = self.time_value(row['exit_time'])
+            trade['exit_price'] = row['exit_price']
+            trade['profit'] = row['profit']
+            if self.has_reasons:
+                trade['exit_reason'] = EXIT_REASONS[row['exit_reason']]
+        if row['carried']:
+            trade['carried'] = True
+        return trade
+
+    def to_columns(self):
+        """JSON-ready columnar form for API responses (one list per field, None while open)."""
+        arr = self.array
+        closed = arr['closed'].tolist()
+        if self.datetime_index:
+            entry_time = [str(pd.Timestamp(v)) for v in arr['entry_time'].tolist()]
+            exit_time = [str(pd.Timestamp(v)) for v in arr['exit_time'].tolist()]
+        else:
+            entry_time = arr['entry_time'].tolist()
+            exit_time = arr['exit_time'].tolist()
+
+        def open_as_none(values):
+            return [v if c else None for v, c in zip(values, closed)]
+
+        return {
+            'entry_time': entry_time,
+            'exit_time': open_as_none(exit_time),
+            'type': ['buy' if s == 1 else 'sell' for s in arr['side'].tolist()],
+            'entry_price': arr['entry_price'].tolist(),
+            'exit_price': open_as_none(arr['exit_price'].tolist()),
+            'profit': open_as_none(arr['profit'].tolist()),
+            'cost': arr['cost'].tolist(),
+            'lots': arr['lots'].tolist(),
+            'pnl': open_as_none(arr['pnl'].tolist()),
+            'exit_reason': open_as_none([EXIT_REASONS[r] for r in arr['exit_reason'].tolist()]),
+        }
+
+def index_times(index):
+    """int64 view of an index for the ledger time fields, and whether it holds timestamps."""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.values.astype('datetime64[ns]').astype(np.int64), True
+    values = np.asarray(index)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64), True
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int64), False
+    return np.arange(len(values), dtype=np.int64), False
+
+
+def _is_datetime(value):
+    return isinstance(value, (pd.Timestamp, np.datetime64)) or hasattr(value, 'isoformat')
+
+
+def _time_int(value):
+    if _is_datetime(value):
+        return pd.Timestamp(value).value
+    return int(value)